@@ -0,0 +1,30 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.10;
+
+import {ERC20} from "../openzeppelin-contracts/contracts/token/ERC20/ERC20.sol";
+
+/**
+ * Local stand-in for WETH9, to test the router's native ETH paths without a mainnet fork
+ */
+contract MockWETH is ERC20 {
+    event Deposit(address indexed dst, uint256 wad);
+    event Withdrawal(address indexed src, uint256 wad);
+
+    constructor() ERC20("Wrapped Ether", "WETH") {}
+
+    receive() external payable {
+        deposit();
+    }
+
+    function deposit() public payable {
+        _mint(msg.sender, msg.value);
+        emit Deposit(msg.sender, msg.value);
+    }
+
+    function withdraw(uint256 wad) external {
+        _burn(msg.sender, wad);
+        // Like WETH9, forward only the call stipend
+        payable(msg.sender).transfer(wad);
+        emit Withdrawal(msg.sender, wad);
+    }
+}
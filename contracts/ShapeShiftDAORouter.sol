@@ -5,8 +5,10 @@ import {IERC20} from "../openzeppelin-contracts/contracts/token/ERC20/IERC20.sol
 import {SafeERC20} from "../openzeppelin-contracts/contracts/token/ERC20/utils/SafeERC20.sol";
 import {Math} from "../openzeppelin-contracts/contracts/utils/math/Math.sol";
 import {Ownable} from "../openzeppelin-contracts/contracts/access/Ownable.sol";
+import {ECDSA} from "../openzeppelin-contracts/contracts/utils/cryptography/ECDSA.sol";
 
 import {RegistryAPI, VaultAPI} from "../interfaces/YearnAPI.sol";
+import {WETHAPI} from "../interfaces/WETHAPI.sol";
 
 /**
  * Adapted from the Yearn BaseRouter for Shapeshift's use case of a router that forward native vault tokens
@@ -15,6 +17,9 @@ import {RegistryAPI, VaultAPI} from "../interfaces/YearnAPI.sol";
 contract ShapeShiftDAORouter is Ownable {
     RegistryAPI public registry;
 
+    // Wrapped native token that `depositETH` and `withdrawETH` wrap and unwrap through
+    WETHAPI public immutable weth;
+
     // ERC20 Unlimited Approvals (short-circuits VaultAPI.transferFrom)
     uint256 constant UNLIMITED_APPROVAL = type(uint256).max;
 
@@ -25,9 +30,132 @@ contract ShapeShiftDAORouter is Ownable {
     uint256 constant MIGRATE_EVERYTHING = type(uint256).max;
     uint256 constant MAX_VAULT_ID = type(uint256).max;
 
-    constructor(address yearnRegistry) {
+    // EIP-712 type hashes of signed intents
+    bytes32 constant DOMAIN_TYPEHASH =
+        keccak256(
+            "EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+        );
+    bytes32 constant INTENT_TYPEHASH =
+        keccak256(
+            "Intent(uint8 kind,address account,address token,address recipient,uint256 amount,uint256 nonce,uint256 deadline)"
+        );
+
+    // Router action an `Intent` authorizes
+    enum IntentKind {
+        Deposit,
+        Withdraw,
+        Migrate
+    }
+
+    // Deposit, withdraw or migrate signed by `account`, for anyone to execute through `executeIntents`
+    // NOTE: `recipient` is unused by migrations, which always credit `account`
+    struct Intent {
+        IntentKind kind;
+        address account;
+        address token;
+        address recipient;
+        uint256 amount;
+        uint256 nonce;
+        uint256 deadline;
+    }
+
+    // Order in which `withdrawWithStrategy` visits the vaults an account holds shares in
+    enum WithdrawStrategy {
+        OldestFirst,
+        NewestFirst,
+        // Greedy by position value, which touches the fewest vaults that cover the requested amount
+        LargestFirst
+    }
+
+    // A vault an account holds shares in, as looked up by `_positions`
+    struct Position {
+        uint256 vaultId;
+        VaultAPI vault;
+        // The vault's cached `10**decimals`, or 0 if it is not cached
+        uint256 unit;
+        // The account's share balance
+        uint256 shares;
+        // The value of the shares in token base units; only set for `WithdrawStrategy.LargestFirst`
+        uint256 value;
+    }
+
+    // Vault registry entry cached by the router, packed into a single storage slot
+    struct CachedVault {
+        VaultAPI vault;
+        // `10**vault.decimals()`, or 0 if it does not fit (vault decimals never change)
+        uint96 unit;
+    }
+
+    // Signed `VaultAPI.permit` approving this contract to use a vault's shares
+    struct VaultPermit {
+        uint256 vaultId;
+        uint256 amount;
+        uint256 deadline;
+        bytes signature;
+    }
+
+    // Metadata of a range of vaults, as parallel arrays indexed by vault id minus the first vault id
+    struct VaultInfos {
+        VaultAPI[] vaults;
+        uint256[] decimals;
+        uint256[] pricePerShare;
+        uint256[] totalAssets;
+        uint256[] depositLimit;
+        uint256[] maxAvailableShares;
+    }
+
+    // Router-side copy of each registry's vault list per token, appended to by `syncVaults`
+    // NOTE: Keyed by registry so that `setRegistry` never serves the vaults of a previous registry
+    mapping(RegistryAPI => mapping(address => CachedVault[]))
+        internal _cachedVaults;
+
+    // Intent nonces each account has used or cancelled; nonces can be used in any order
+    mapping(address => mapping(uint256 => bool)) public usedNonces;
+
+    // Emitted for every vault deposit made through the router, including the deposit leg of a migration
+    event Deposit(
+        address indexed token,
+        VaultAPI indexed vault,
+        address indexed recipient,
+        address depositor,
+        uint256 amount,
+        uint256 shares
+    );
+
+    // Emitted for every vault a withdrawal redeems shares from, including the withdraw legs of a migration
+    event Withdraw(
+        address indexed token,
+        VaultAPI indexed vault,
+        address indexed withdrawer,
+        address recipient,
+        uint256 amount,
+        uint256 shares
+    );
+
+    // Emitted once per migration, with the tokens moved into and the shares minted by the latest vault
+    event Migrate(
+        address indexed token,
+        VaultAPI indexed vault,
+        address indexed migrator,
+        uint256 amount,
+        uint256 shares
+    );
+
+    // Emitted for every intent executed through `executeIntents`
+    event IntentExecuted(address indexed account, uint256 indexed nonce);
+
+    constructor(address yearnRegistry, address wrappedNative) {
         // Recommended to use `v2.registry.ychad.eth`
         registry = RegistryAPI(yearnRegistry);
+        // WETH9 on mainnet: 0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2
+        weth = WETHAPI(wrappedNative);
+    }
+
+    /**
+     * @notice Only accepts the native token that `weth` sends back while unwrapping for `withdrawETH`.
+     */
+    receive() external payable {
+        require(_msgSender() == address(weth), "not weth");
     }
 
     /**
@@ -63,6 +191,43 @@ contract ShapeShiftDAORouter is Ownable {
         return registry.latestVault(token);
     }
 
+    /**
+     * @notice Number of vaults for a token currently held in the router's vault cache.
+     * @dev Vault ids at or past this number are read from the live registry until `syncVaults` is called.
+     * @param token Which ERC20 token to count the cached vaults of
+     * @return The number of cached vaults for the specified token.
+     */
+    function numCachedVaults(address token) external view returns (uint256) {
+        return _cachedVaults[registry][token].length;
+    }
+
+    /**
+     * @notice Appends the vaults the registry has added for a token since the last sync to the router's
+     * vault cache, along with their decimals. Anyone can call this.
+     * @dev The registry only ever appends vaults, so existing cache entries never need to be updated.
+     * @param token Which ERC20 token to sync the vaults of
+     * @return The number of vaults appended to the cache.
+     */
+    function syncVaults(address token) external returns (uint256) {
+        RegistryAPI _registry = registry;
+        CachedVault[] storage cached = _cachedVaults[_registry][token];
+
+        uint256 firstVaultId = cached.length;
+        uint256 _numVaults = _registry.numVaults(token);
+        for (uint256 i = firstVaultId; i < _numVaults; i++) {
+            VaultAPI vault = _registry.vaults(token, i);
+            uint256 unit = 10**vault.decimals();
+            cached.push(
+                CachedVault({
+                    vault: vault,
+                    unit: unit > type(uint96).max ? 0 : uint96(unit)
+                })
+            );
+        }
+
+        return _numVaults - firstVaultId;
+    }
+
     /**
      * @notice Gets the balance of an account across all the vaults for a token.
      * @param token Which ERC20 token to pull vault balances for
@@ -75,7 +240,7 @@ contract ShapeShiftDAORouter is Ownable {
         view
         returns (uint256)
     {
-        return this.totalVaultBalance(token, account, 0, MAX_VAULT_ID);
+        return _totalVaultBalance(token, account, 0, MAX_VAULT_ID);
     }
 
     /**
@@ -92,17 +257,150 @@ contract ShapeShiftDAORouter is Ownable {
         address account,
         uint256 firstVaultId,
         uint256 lastVaultId
-    ) external view returns (uint256 balance) {
+    ) external view returns (uint256) {
+        return _totalVaultBalance(token, account, firstVaultId, lastVaultId);
+    }
+
+    /**
+     * @notice Gets the balances of many accounts across all the vaults for many tokens.
+     * @dev Each vault's `pricePerShare` and `decimals` are read once per call instead of once per account.
+     * @param tokens Which ERC20 tokens to pull vault balances for
+     * @param accounts The addresses of the accounts to pull the balances for
+     * @return balances `balances[i][j]` is the current value, in base units of `tokens[i]`, of the shares held
+       by `accounts[j]` across all the vaults for `tokens[i]`.
+     */
+    function totalVaultBalances(
+        address[] calldata tokens,
+        address[] calldata accounts
+    ) external view returns (uint256[][] memory balances) {
+        RegistryAPI _registry = registry;
+        balances = new uint256[][](tokens.length);
+        for (uint256 i = 0; i < tokens.length; i++)
+            balances[i] = _tokenBalances(_registry, tokens[i], accounts);
+    }
+
+    function _tokenBalances(
+        RegistryAPI _registry,
+        address token,
+        address[] calldata accounts
+    ) internal view returns (uint256[] memory balances) {
+        balances = new uint256[](accounts.length);
+
+        CachedVault[] storage cached = _cachedVaults[_registry][token];
+        uint256 _numVaults = _registry.numVaults(token);
+        for (uint256 i = 0; i < _numVaults; i++) {
+            (VaultAPI vault, uint256 unit) = _vault(_registry, cached, token, i);
+            uint256 pricePerShare = vault.pricePerShare();
+            unit = _unit(vault, unit);
+
+            for (uint256 j = 0; j < accounts.length; j++)
+                balances[j] +=
+                    (vault.balanceOf(accounts[j]) * pricePerShare) /
+                    unit;
+        }
+    }
+
+    /**
+     * @notice Gets the per-vault balances of many accounts across all the vaults for a token.
+     * @dev Each vault's `pricePerShare` and `decimals` are read once per call instead of once per account.
+     * @param token Which ERC20 token to pull vault balances for
+     * @param accounts The addresses of the accounts to pull the balances for
+     * @return _vaults The vaults for the specified token, in vault id order
+     * @return balances `balances[i][j]` is the current value, in token base units, of the shares of `_vaults[i]`
+       held by `accounts[j]`.
+     */
+    function vaultBalances(address token, address[] calldata accounts)
+        external
+        view
+        returns (VaultAPI[] memory _vaults, uint256[][] memory balances)
+    {
+        RegistryAPI _registry = registry;
+        CachedVault[] storage cached = _cachedVaults[_registry][token];
+        uint256 _numVaults = _registry.numVaults(token);
+        _vaults = new VaultAPI[](_numVaults);
+        balances = new uint256[][](_numVaults);
+
+        for (uint256 i = 0; i < _numVaults; i++) {
+            (VaultAPI vault, uint256 unit) = _vault(
+                _registry,
+                cached,
+                token,
+                i
+            );
+            uint256 pricePerShare = vault.pricePerShare();
+            unit = _unit(vault, unit);
+
+            _vaults[i] = vault;
+            balances[i] = new uint256[](accounts.length);
+            for (uint256 j = 0; j < accounts.length; j++)
+                balances[i][j] =
+                    (vault.balanceOf(accounts[j]) * pricePerShare) /
+                    unit;
+        }
+    }
+
+    /**
+     * @notice Gets the balance of an account across the vaults for a token, stopping early to stay within a gas budget.
+     * @dev Always includes at least one vault, so that repeated calls make progress. Call again from
+     * `nextVaultId` until it equals `numVaults(token)`, adding up the partial balances.
+     * @param token Which ERC20 token to pull vault balances for
+     * @param account The address of the account to pull the balances for
+     * @param firstVaultId First vault id to include; 0 to start at the beginning
+     * @param minGasLeft Stop before including another vault once `gasleft()` falls below this
+     * @return balance The current value, in token base units, of the shares held by the specified
+       account across the included vaults
+     * @return nextVaultId The first vault id not included; `numVaults(token)` when every vault was included.
+     */
+    function totalVaultBalancePaginated(
+        address token,
+        address account,
+        uint256 firstVaultId,
+        uint256 minGasLeft
+    ) external view returns (uint256 balance, uint256 nextVaultId) {
+        RegistryAPI _registry = registry;
+        CachedVault[] storage cached = _cachedVaults[_registry][token];
+        uint256 _numVaults = _registry.numVaults(token);
+        for (
+            nextVaultId = firstVaultId;
+            nextVaultId < _numVaults;
+            nextVaultId++
+        ) {
+            if (nextVaultId > firstVaultId && gasleft() < minGasLeft) break;
+
+            (VaultAPI vault, uint256 unit) = _vault(
+                _registry,
+                cached,
+                token,
+                nextVaultId
+            );
+            balance +=
+                (vault.balanceOf(account) * vault.pricePerShare()) /
+                _unit(vault, unit);
+        }
+    }
+
+    function _totalVaultBalance(
+        address token,
+        address account,
+        uint256 firstVaultId,
+        uint256 lastVaultId
+    ) internal view returns (uint256 balance) {
         require(firstVaultId <= lastVaultId);
+        RegistryAPI _registry = registry;
 
-        uint256 _lastVaultId = lastVaultId;
-        if (_lastVaultId == MAX_VAULT_ID)
-            _lastVaultId = registry.numVaults(address(token)) - 1;
+        if (lastVaultId == MAX_VAULT_ID)
+            lastVaultId = _registry.numVaults(address(token)) - 1;
 
-        for (uint256 i = firstVaultId; i <= _lastVaultId; i++) {
-            VaultAPI vault = registry.vaults(token, i);
+        CachedVault[] storage cached = _cachedVaults[_registry][token];
+        for (uint256 i = firstVaultId; i <= lastVaultId; i++) {
+            (VaultAPI vault, uint256 unit) = _vault(
+                _registry,
+                cached,
+                token,
+                i
+            );
             uint256 vaultTokenBalance = (vault.balanceOf(account) *
-                vault.pricePerShare()) / 10**vault.decimals();
+                vault.pricePerShare()) / _unit(vault, unit);
             balance += vaultTokenBalance;
         }
     }
@@ -112,7 +410,7 @@ contract ShapeShiftDAORouter is Ownable {
      * @return assets The sum of all the assets managed by the vaults for the specified token.
      */
     function totalAssets(address token) external view returns (uint256) {
-        return this.totalAssets(token, 0, MAX_VAULT_ID);
+        return _totalAssets(token, 0, MAX_VAULT_ID);
     }
 
     /**
@@ -125,19 +423,359 @@ contract ShapeShiftDAORouter is Ownable {
         address token,
         uint256 firstVaultId,
         uint256 lastVaultId
-    ) external view returns (uint256 assets) {
+    ) external view returns (uint256) {
+        return _totalAssets(token, firstVaultId, lastVaultId);
+    }
+
+    /**
+     * @notice Returns the combined TVL of the vaults for a token, stopping early to stay within a gas budget.
+     * @dev Always includes at least one vault, so that repeated calls make progress. Call again from
+     * `nextVaultId` until it equals `numVaults(token)`, adding up the partial sums.
+     * @param firstVaultId First vault id to include; 0 to start at the beginning
+     * @param minGasLeft Stop before including another vault once `gasleft()` falls below this
+     * @return assets The sum of the assets managed by the included vaults
+     * @return nextVaultId The first vault id not included; `numVaults(token)` when every vault was included.
+     */
+    function totalAssetsPaginated(
+        address token,
+        uint256 firstVaultId,
+        uint256 minGasLeft
+    ) external view returns (uint256 assets, uint256 nextVaultId) {
+        RegistryAPI _registry = registry;
+        CachedVault[] storage cached = _cachedVaults[_registry][token];
+        uint256 _numVaults = _registry.numVaults(token);
+        for (
+            nextVaultId = firstVaultId;
+            nextVaultId < _numVaults;
+            nextVaultId++
+        ) {
+            if (nextVaultId > firstVaultId && gasleft() < minGasLeft) break;
+
+            (VaultAPI vault, ) = _vault(_registry, cached, token, nextVaultId);
+            assets += vault.totalAssets();
+        }
+    }
+
+    function _totalAssets(
+        address token,
+        uint256 firstVaultId,
+        uint256 lastVaultId
+    ) internal view returns (uint256 assets) {
         require(firstVaultId <= lastVaultId);
+        RegistryAPI _registry = registry;
 
-        uint256 _lastVaultId = lastVaultId;
-        if (_lastVaultId == MAX_VAULT_ID)
-            _lastVaultId = registry.numVaults(address(token)) - 1;
+        if (lastVaultId == MAX_VAULT_ID)
+            lastVaultId = _registry.numVaults(address(token)) - 1;
 
-        for (uint256 i = firstVaultId; i <= _lastVaultId; i++) {
-            VaultAPI vault = registry.vaults(token, i);
+        CachedVault[] storage cached = _cachedVaults[_registry][token];
+        for (uint256 i = firstVaultId; i <= lastVaultId; i++) {
+            (VaultAPI vault, ) = _vault(_registry, cached, token, i);
             assets += vault.totalAssets();
         }
     }
 
+    /**
+     * @notice Gets the metadata of all the vaults for a token, for rendering a token's vault list in one call.
+     * @param token Which ERC20 token to pull vault metadata for
+     * @return The vaults for the specified token with their `decimals`, `pricePerShare`, `totalAssets`,
+       `depositLimit` and `maxAvailableShares`, in vault id order.
+     */
+    function vaultInfos(address token)
+        external
+        view
+        returns (VaultInfos memory)
+    {
+        return _vaultInfos(token, 0, MAX_VAULT_ID);
+    }
+
+    /**
+     * @notice Gets the metadata of certain vaults for a token.
+     * @param token Which ERC20 token to pull vault metadata for
+     * @param firstVaultId First vault id to include; 0 to start at the beginning
+     * @param lastVaultId Last vault id to include; `MAX_VAULT_ID` to include all vaults
+     * @return The specified vaults with their `decimals`, `pricePerShare`, `totalAssets`, `depositLimit` and
+       `maxAvailableShares`, in vault id order.
+     */
+    function vaultInfos(
+        address token,
+        uint256 firstVaultId,
+        uint256 lastVaultId
+    ) external view returns (VaultInfos memory) {
+        return _vaultInfos(token, firstVaultId, lastVaultId);
+    }
+
+    function _vaultInfos(
+        address token,
+        uint256 firstVaultId,
+        uint256 lastVaultId
+    ) internal view returns (VaultInfos memory infos) {
+        require(firstVaultId <= lastVaultId);
+        RegistryAPI _registry = registry;
+
+        if (lastVaultId == MAX_VAULT_ID)
+            lastVaultId = _registry.numVaults(token) - 1;
+
+        uint256 count = lastVaultId + 1 - firstVaultId;
+        infos.vaults = new VaultAPI[](count);
+        infos.decimals = new uint256[](count);
+        infos.pricePerShare = new uint256[](count);
+        infos.totalAssets = new uint256[](count);
+        infos.depositLimit = new uint256[](count);
+        infos.maxAvailableShares = new uint256[](count);
+
+        CachedVault[] storage cached = _cachedVaults[_registry][token];
+        for (uint256 i = 0; i < count; i++) {
+            (VaultAPI vault, ) = _vault(
+                _registry,
+                cached,
+                token,
+                firstVaultId + i
+            );
+            infos.vaults[i] = vault;
+            infos.decimals[i] = vault.decimals();
+            infos.pricePerShare[i] = vault.pricePerShare();
+            infos.totalAssets[i] = vault.totalAssets();
+            infos.depositLimit[i] = vault.depositLimit();
+            infos.maxAvailableShares[i] = vault.maxAvailableShares();
+        }
+    }
+
+    /**
+     * @notice Gets the ids of the vaults for a token in which an account holds shares.
+     * @dev Intended to be computed off-chain and passed to the `vaultIds` overload of `withdraw`.
+     * @param token Which ERC20 token to look up the vaults of
+     * @param account The address of the account to look up the positions of
+     * @return vaultIds The ids of the vaults in which the account has a non-zero share balance, in ascending order.
+     */
+    function positions(address token, address account)
+        external
+        view
+        returns (uint256[] memory vaultIds)
+    {
+        Position[] memory held = _positions(
+            token,
+            account,
+            WithdrawStrategy.OldestFirst
+        );
+        vaultIds = new uint256[](held.length);
+        for (uint256 i = 0; i < held.length; i++) vaultIds[i] = held[i].vaultId;
+    }
+
+    /**
+     * @notice Gets the vaults for a token in which an account holds shares, in the order of a strategy.
+     * @dev Returns each vault's address, cached unit and the account's share balance along with its id, so that
+     * `withdrawWithStrategy` does not look them up again.
+     * @param token Which ERC20 token to look up the vaults of
+     * @param account The address of the account to look up the positions of
+     * @param strategy The order to return the positions in
+     * @return held The positions of the account, one per vault in which it has a non-zero share balance.
+     */
+    function _positions(
+        address token,
+        address account,
+        WithdrawStrategy strategy
+    ) internal view returns (Position[] memory held) {
+        RegistryAPI _registry = registry;
+        CachedVault[] storage cached = _cachedVaults[_registry][token];
+        uint256 _numVaults = _registry.numVaults(token);
+
+        Position[] memory candidates = new Position[](_numVaults);
+        uint256 count;
+        for (uint256 i = 0; i < _numVaults; i++) {
+            uint256 vaultId = strategy == WithdrawStrategy.NewestFirst
+                ? _numVaults - 1 - i
+                : i;
+            (VaultAPI vault, uint256 unit) = _vault(
+                _registry,
+                cached,
+                token,
+                vaultId
+            );
+            uint256 shares = vault.balanceOf(account);
+            if (shares == 0) continue;
+
+            candidates[count] = Position(vaultId, vault, unit, shares, 0);
+            if (strategy == WithdrawStrategy.LargestFirst)
+                candidates[count].value =
+                    (shares * vault.pricePerShare()) /
+                    _unit(vault, unit);
+            count++;
+        }
+
+        if (strategy == WithdrawStrategy.LargestFirst)
+            _sortByValueDescending(candidates, count);
+
+        held = new Position[](count);
+        for (uint256 i = 0; i < count; i++) held[i] = candidates[i];
+    }
+
+    /**
+     * @notice Sorts the first `count` positions by their value, largest first.
+     * @dev Insertion sort, as accounts only hold a handful of positions. Stable, so ties stay oldest first.
+     * @param held The positions to sort in place
+     * @param count The number of entries to sort
+     */
+    function _sortByValueDescending(Position[] memory held, uint256 count)
+        internal
+        pure
+    {
+        for (uint256 i = 1; i < count; i++) {
+            Position memory position = held[i];
+            uint256 j = i;
+            for (; j > 0 && held[j - 1].value < position.value; j--)
+                held[j] = held[j - 1];
+            held[j] = position;
+        }
+    }
+
+    /**
+     * @notice Estimates the outcome of depositing tokens, without moving any funds.
+     * @dev Vaults revert deposits that would take them over their deposit limit, so depositing more than
+     * `depositable` will fail.
+     * @param token Address of the ERC20 token being deposited
+     * @param amount Amount of tokens to deposit
+     * @param vaultId Vault id to deposit into; pass `MAX_VAULT_ID` to deposit into the latest vault
+     * @return shares Estimated vault shares that depositing `amount` would mint
+     * @return depositable The most tokens the vault currently accepts, up to `amount`.
+     */
+    function previewDeposit(
+        address token,
+        uint256 amount,
+        uint256 vaultId
+    ) external view returns (uint256 shares, uint256 depositable) {
+        RegistryAPI _registry = registry;
+        if (vaultId == MAX_VAULT_ID) vaultId = _registry.numVaults(token) - 1;
+        (VaultAPI vault, uint256 unit) = _vault(
+            _registry,
+            _cachedVaults[_registry][token],
+            token,
+            vaultId
+        );
+
+        shares = (amount * _unit(vault, unit)) / vault.pricePerShare();
+        depositable = Math.min(amount, _depositHeadroom(vault));
+    }
+
+    /**
+     * @notice Estimates the outcome of `withdraw` for an account, without moving any funds.
+     * @dev Replays the allocation of `withdraw`, including `maxAvailableShares` and the allowance `account` has
+     * given to this contract.
+     * @param token Address of the ERC20 token to withdraw from vaults
+     * @param account Address that would withdraw
+     * @param amount Maximum number of tokens to withdraw from all vaults. If `WITHDRAW_EVERYTHING`, just withdraw everything.
+     * @param firstVaultId First vault id to pull from; 0 to start at the the beginning
+     * @param lastVaultId Last vault id to pull from; `MAX_VAULT_ID` to withdraw from all vaults
+     * @return shares Shares that would be redeemed from each vault, starting at `firstVaultId`
+     * @return withdrawn Estimated number of tokens that would be received.
+     */
+    function previewWithdraw(
+        address token,
+        address account,
+        uint256 amount,
+        uint256 firstVaultId,
+        uint256 lastVaultId
+    ) external view returns (uint256[] memory shares, uint256 withdrawn) {
+        return
+            _previewWithdraw(token, account, amount, firstVaultId, lastVaultId);
+    }
+
+    /**
+     * @notice Estimates the outcome of `migrate` for an account, without moving any funds.
+     * @dev Replays the deposit limit clamp of `migrate` and the allocation of `withdraw`.
+     * @param token Address of the ERC20 token to migrate the vaults of
+     * @param account Address that would migrate
+     * @param amount Maximum number of tokens to migrate from all vaults. If `MIGRATE_EVERYTHING`, just migrate everything.
+     * @param firstVaultId First vault id to migrate from; 0 to start at the the beginning
+     * @param lastVaultId Last vault id to migrate from; `MAX_VAULT_ID` to migrate from all vaults
+     * @return shares Shares that would be redeemed from each vault, starting at `firstVaultId`
+     * @return migrated Estimated number of tokens that would be moved to the latest vault
+     * @return newShares Estimated number of shares of the latest vault that would be minted.
+     */
+    function previewMigrate(
+        address token,
+        address account,
+        uint256 amount,
+        uint256 firstVaultId,
+        uint256 lastVaultId
+    )
+        external
+        view
+        returns (
+            uint256[] memory shares,
+            uint256 migrated,
+            uint256 newShares
+        )
+    {
+        RegistryAPI _registry = registry;
+        uint256 latestVaultId = _registry.numVaults(token) - 1;
+        if (amount == 0 || latestVaultId == 0) return (shares, 0, 0);
+
+        (VaultAPI _latestVault, uint256 unit) = _vault(
+            _registry,
+            _cachedVaults[_registry][token],
+            token,
+            latestVaultId
+        );
+        (shares, migrated) = _previewWithdraw(
+            token,
+            account,
+            Math.min(amount, _depositHeadroom(_latestVault)),
+            firstVaultId,
+            Math.min(lastVaultId, latestVaultId - 1)
+        );
+        newShares =
+            (migrated * _unit(_latestVault, unit)) /
+            _latestVault.pricePerShare();
+    }
+
+    /**
+     * @notice Replays the vault range loop of `_withdraw` using the current vault state.
+     * @return shares Shares that would be redeemed from each vault, starting at `firstVaultId`
+     * @return withdrawn Estimated number of tokens that would be received.
+     */
+    function _previewWithdraw(
+        address token,
+        address account,
+        uint256 amount,
+        uint256 firstVaultId,
+        uint256 lastVaultId
+    ) internal view returns (uint256[] memory shares, uint256 withdrawn) {
+        require(firstVaultId <= lastVaultId);
+        RegistryAPI _registry = registry;
+
+        if (lastVaultId == MAX_VAULT_ID)
+            lastVaultId = _registry.numVaults(token) - 1;
+
+        CachedVault[] storage cached = _cachedVaults[_registry][token];
+        shares = new uint256[](lastVaultId + 1 - firstVaultId);
+        for (
+            uint256 i = firstVaultId;
+            withdrawn + 1 < amount && i <= lastVaultId;
+            i++
+        ) {
+            (VaultAPI vault, uint256 unit) = _vault(
+                _registry,
+                cached,
+                token,
+                i
+            );
+            uint256 vaultShares = _withdrawableShares(
+                vault,
+                unit,
+                account,
+                amount == WITHDRAW_EVERYTHING
+                    ? WITHDRAW_EVERYTHING
+                    : amount - withdrawn
+            );
+            if (vaultShares == 0) continue;
+
+            shares[i - firstVaultId] = vaultShares;
+            withdrawn +=
+                (vaultShares * vault.pricePerShare()) /
+                _unit(vault, unit);
+        }
+    }
+
     /**
      * @notice Called to deposit the caller's tokens into the most-current vault, crediting the minted shares to recipient.
      * @dev The caller must approve this contract to utilize the specified ERC20 or this call will revert.
@@ -180,6 +818,37 @@ contract ShapeShiftDAORouter is Ownable {
             _deposit(IERC20(token), _msgSender(), recipient, amount, vaultId);
     }
 
+    /**
+     * @notice Called to deposit the native token sent with the call into the most-current `weth` vault, crediting
+     * the minted shares to recipient.
+     * @dev Wraps the call value into `weth` first, so no separate wrap or approve transaction is needed. Any value
+     * over the vault's deposit limit is refunded to the caller; reverts if the vault is already at its limit.
+     * @param recipient Address to receive the issued vault tokens
+     * @return shares Total vault shares received by recipient
+     */
+    function depositETH(address recipient)
+        external
+        payable
+        returns (uint256 shares)
+    {
+        // Only wrap what the vault takes, so that no `weth` is left behind in this contract
+        uint256 headroom = _depositHeadroom(
+            registry.latestVault(address(weth))
+        );
+        require(headroom > 0, "deposit limit reached");
+        uint256 amount = Math.min(msg.value, headroom);
+        weth.deposit{value: amount}();
+        shares = _deposit(
+            IERC20(address(weth)),
+            address(this),
+            _msgSender(),
+            recipient,
+            amount,
+            MAX_VAULT_ID
+        );
+        if (msg.value > amount) _sendETH(_msgSender(), msg.value - amount);
+    }
+
     /**
      * @notice Called to deposit depositor's tokens into a specific vault, crediting the minted shares to recipient.
      * @dev Depositor must approve this contract to utilize the specified ERC20 or this call will revert.
@@ -196,6 +865,30 @@ contract ShapeShiftDAORouter is Ownable {
         address recipient,
         uint256 amount,
         uint256 vaultId
+    ) internal returns (uint256) {
+        return _deposit(token, depositor, depositor, recipient, amount, vaultId);
+    }
+
+    /**
+     * @notice Called to deposit depositor's tokens into a specific vault on behalf of an account, crediting the
+     * minted shares to recipient.
+     * @dev Lets deposits of funds this contract holds (e.g. wrapped `depositETH` value) name the caller in the
+     * `Deposit` event rather than this contract.
+     * @param token Address of the ERC20 token being deposited
+     * @param depositor Address to pull deposited funds from, or this contract if it already holds them. SECURITY SENSITIVE.
+     * @param account Address the deposit is made for, recorded as the `Deposit` event's depositor
+     * @param recipient Address to receive the issued vault tokens
+     * @param amount Amount of tokens to deposit; tokens that cannot be deposited will be refunded. If `DEPOSIT_EVERYTHING`, just deposit everything.
+     * @param vaultId Vault id to deposit into; pass `MAX_VAULT_ID` to deposit into the latest vault
+     * @return shares Total vault shares received by recipient
+     */
+    function _deposit(
+        IERC20 token,
+        address depositor,
+        address account,
+        address recipient,
+        uint256 amount,
+        uint256 vaultId
     ) internal returns (uint256 shares) {
         bool pullFunds = depositor != address(this);
 
@@ -203,9 +896,17 @@ contract ShapeShiftDAORouter is Ownable {
         if (vaultId == MAX_VAULT_ID) {
             vault = registry.latestVault(address(token));
         } else {
-            vault = registry.vaults(address(token), vaultId);
+            RegistryAPI _registry = registry;
+            (vault, ) = _vault(
+                _registry,
+                _cachedVaults[_registry][address(token)],
+                address(token),
+                vaultId
+            );
         }
 
+        // NOTE: Tokens built on OpenZeppelin's ERC20 before v4.5 decrease even an UNLIMITED_APPROVAL allowance on
+        //       every transfer, so check the remaining allowance rather than remembering that a vault was approved
         if (token.allowance(address(this), address(vault)) < amount) {
             SafeERC20.safeApprove(token, address(vault), 0); // Avoid issues with some tokens requiring 0
             SafeERC20.safeApprove(token, address(vault), UNLIMITED_APPROVAL); // Vaults are trusted
@@ -219,52 +920,168 @@ contract ShapeShiftDAORouter is Ownable {
 
             shares = vault.deposit(amount, recipient);
 
-            uint256 afterWithdrawBal = token.balanceOf(address(this));
-            if (afterWithdrawBal > beforeBal)
-                SafeERC20.safeTransfer(
-                    token,
-                    depositor,
-                    afterWithdrawBal - beforeBal
-                );
-        } else {
-            shares = vault.deposit(amount, recipient);
-        }
+            uint256 afterWithdrawBal = token.balanceOf(address(this));
+            if (afterWithdrawBal > beforeBal) {
+                SafeERC20.safeTransfer(
+                    token,
+                    depositor,
+                    afterWithdrawBal - beforeBal
+                );
+                amount -= afterWithdrawBal - beforeBal;
+            }
+        } else {
+            shares = vault.deposit(amount, recipient);
+        }
+
+        emit Deposit(address(token), vault, recipient, account, amount, shares);
+    }
+
+    /**
+     * @notice Called to redeem the all of the caller's shares from underlying vault(s), with the proceeds distributed to recipient.
+     * @dev The caller must approve this contract to use their vault shares or this call will revert.
+     * @param token Address of the ERC20 token to withdraw from vaults
+     * @param recipient Address to receive the withdrawn tokens
+     * @return The number of tokens received by recipient.
+     */
+    function withdraw(address token, address recipient)
+        external
+        returns (uint256)
+    {
+        return
+            _withdraw(
+                IERC20(token),
+                _msgSender(),
+                recipient,
+                WITHDRAW_EVERYTHING,
+                0,
+                MAX_VAULT_ID
+            );
+    }
+
+    /**
+     * @notice Called to redeem the caller's shares from underlying vault(s), with the proceeds distributed to recipient.
+     * @dev The caller must approve this contract to use their vault shares or this call will revert.
+     * @param token Address of the ERC20 token to withdraw from vaults
+     * @param recipient Address to receive the withdrawn tokens
+     * @param amount Maximum number of tokens to withdraw from all vaults; actual withdrawal may be less. If `WITHDRAW_EVERYTHING`, just withdraw everything.
+     * @return The number of tokens received by recipient.
+     */
+    function withdraw(
+        address token,
+        address recipient,
+        uint256 amount
+    ) external returns (uint256) {
+        return
+            _withdraw(
+                IERC20(token),
+                _msgSender(),
+                recipient,
+                amount,
+                0,
+                MAX_VAULT_ID
+            );
+    }
+
+    /**
+     * @notice Called to redeem the caller's shares from underlying vault(s), with the proceeds distributed to recipient.
+     * @dev The caller must approve this contract to use their vault shares or this call will revert.
+     * @param token Address of the ERC20 token to withdraw from vaults
+     * @param recipient Address to receive the withdrawn tokens
+     * @param amount Maximum number of tokens to withdraw from all vaults; actual withdrawal may be less. If `WITHDRAW_EVERYTHING`, just withdraw everything.
+     * @param firstVaultId First vault id to pull from; 0 to start at the the beginning
+     * @param lastVaultId Last vault id to pull from; `MAX_VAULT_ID` to withdraw from all vaults
+     * @return The number of tokens received by recipient.
+     */
+    function withdraw(
+        address token,
+        address recipient,
+        uint256 amount,
+        uint256 firstVaultId,
+        uint256 lastVaultId
+    ) external returns (uint256) {
+        return
+            _withdraw(
+                IERC20(token),
+                _msgSender(),
+                recipient,
+                amount,
+                firstVaultId,
+                lastVaultId
+            );
+    }
+
+    /**
+     * @notice Called to redeem the caller's shares from the `weth` vault(s), with the proceeds unwrapped and sent to
+     * recipient as the native token.
+     * @dev The caller must approve this contract to use their vault shares or this call will revert.
+     * @param recipient Address to receive the withdrawn native token
+     * @param amount Maximum number of tokens to withdraw from all vaults; actual withdrawal may be less. If `WITHDRAW_EVERYTHING`, just withdraw everything.
+     * @return withdrawn The amount of the native token received by recipient.
+     */
+    function withdrawETH(address payable recipient, uint256 amount)
+        external
+        returns (uint256 withdrawn)
+    {
+        withdrawn = _withdraw(
+            IERC20(address(weth)),
+            _msgSender(),
+            address(this),
+            amount,
+            0,
+            MAX_VAULT_ID
+        );
+        weth.withdraw(withdrawn);
+        _sendETH(recipient, withdrawn);
     }
 
     /**
-     * @notice Called to redeem the all of the caller's shares from underlying vault(s), with the proceeds distributed to recipient.
+     * @notice Called to redeem the caller's shares from the vaults they hold positions in, in the order of a strategy,
+     * with the proceeds distributed to recipient.
      * @dev The caller must approve this contract to use their vault shares or this call will revert.
+     * The positions are looked up and ordered in this call, so no off-chain `positions` lookup is needed.
      * @param token Address of the ERC20 token to withdraw from vaults
      * @param recipient Address to receive the withdrawn tokens
+     * @param amount Maximum number of tokens to withdraw from all vaults; actual withdrawal may be less. If `WITHDRAW_EVERYTHING`, just withdraw everything.
+     * @param strategy The order to pull from the caller's positions in
      * @return The number of tokens received by recipient.
      */
-    function withdraw(address token, address recipient)
-        external
-        returns (uint256)
-    {
-        return
-            _withdraw(
+    function withdrawWithStrategy(
+        address token,
+        address recipient,
+        uint256 amount,
+        WithdrawStrategy strategy
+    ) external returns (uint256 withdrawn) {
+        // Reuse the vaults and share balances that ordering the positions already looked up
+        Position[] memory held = _positions(token, _msgSender(), strategy);
+        for (uint256 i = 0; withdrawn + 1 < amount && i < held.length; i++)
+            withdrawn += _withdrawFromVault(
                 IERC20(token),
+                held[i].vault,
+                held[i].unit,
                 _msgSender(),
+                held[i].shares,
                 recipient,
-                WITHDRAW_EVERYTHING,
-                0,
-                MAX_VAULT_ID
+                amount == WITHDRAW_EVERYTHING
+                    ? WITHDRAW_EVERYTHING
+                    : amount - withdrawn
             );
     }
 
     /**
-     * @notice Called to redeem the caller's shares from underlying vault(s), with the proceeds distributed to recipient.
+     * @notice Called to redeem the caller's shares from the specified vaults only, with the proceeds distributed to recipient.
      * @dev The caller must approve this contract to use their vault shares or this call will revert.
+     * Use `positions` to find the vaults the caller holds shares in, so that empty vaults are never visited.
      * @param token Address of the ERC20 token to withdraw from vaults
      * @param recipient Address to receive the withdrawn tokens
      * @param amount Maximum number of tokens to withdraw from all vaults; actual withdrawal may be less. If `WITHDRAW_EVERYTHING`, just withdraw everything.
+     * @param vaultIds Ids of the vaults to pull from, in the order to pull from them
      * @return The number of tokens received by recipient.
      */
     function withdraw(
         address token,
         address recipient,
-        uint256 amount
+        uint256 amount,
+        uint256[] calldata vaultIds
     ) external returns (uint256) {
         return
             _withdraw(
@@ -272,36 +1089,36 @@ contract ShapeShiftDAORouter is Ownable {
                 _msgSender(),
                 recipient,
                 amount,
-                0,
-                MAX_VAULT_ID
+                vaultIds
             );
     }
 
     /**
-     * @notice Called to redeem the caller's shares from underlying vault(s), with the proceeds distributed to recipient.
-     * @dev The caller must approve this contract to use their vault shares or this call will revert.
+     * @notice Called to redeem the caller's shares from underlying vault(s), with the proceeds distributed to recipient,
+     * approving this contract to use the shares with signed permits instead of a separate `approve` transaction.
+     * @dev Permits for vaults in which this contract's allowance already covers the permitted amount are skipped,
+     * so a permit that was front-run does not make the withdrawal revert.
      * @param token Address of the ERC20 token to withdraw from vaults
      * @param recipient Address to receive the withdrawn tokens
      * @param amount Maximum number of tokens to withdraw from all vaults; actual withdrawal may be less. If `WITHDRAW_EVERYTHING`, just withdraw everything.
-     * @param firstVaultId First vault id to pull from; 0 to start at the the beginning
-     * @param lastVaultId Last vault id to pull from; `MAX_VAULT_ID` to withdraw from all vaults
+     * @param permits Permits signed by the caller for the vaults to pull from
      * @return The number of tokens received by recipient.
      */
-    function withdraw(
+    function withdrawWithPermit(
         address token,
         address recipient,
         uint256 amount,
-        uint256 firstVaultId,
-        uint256 lastVaultId
+        VaultPermit[] calldata permits
     ) external returns (uint256) {
+        _permit(token, _msgSender(), permits);
         return
             _withdraw(
                 IERC20(token),
                 _msgSender(),
                 recipient,
                 amount,
-                firstVaultId,
-                lastVaultId
+                0,
+                MAX_VAULT_ID
             );
     }
 
@@ -325,63 +1142,228 @@ contract ShapeShiftDAORouter is Ownable {
         uint256 lastVaultId
     ) internal returns (uint256 withdrawn) {
         require(firstVaultId <= lastVaultId);
+        RegistryAPI _registry = registry;
 
-        uint256 _lastVaultId = lastVaultId;
-        if (_lastVaultId == MAX_VAULT_ID)
-            _lastVaultId = registry.numVaults(address(token)) - 1;
+        if (lastVaultId == MAX_VAULT_ID)
+            lastVaultId = _registry.numVaults(address(token)) - 1;
 
+        CachedVault[] storage cached = _cachedVaults[_registry][address(token)];
         for (
             uint256 i = firstVaultId;
-            withdrawn + 1 < amount && i <= _lastVaultId;
+            withdrawn + 1 < amount && i <= lastVaultId;
             i++
         ) {
-            VaultAPI vault = registry.vaults(address(token), i);
+            (VaultAPI vault, uint256 unit) = _vault(
+                _registry,
+                cached,
+                address(token),
+                i
+            );
+            withdrawn += _withdrawFromVault(
+                token,
+                vault,
+                unit,
+                withdrawer,
+                recipient,
+                amount == WITHDRAW_EVERYTHING
+                    ? WITHDRAW_EVERYTHING
+                    : amount - withdrawn
+            );
+        }
+    }
 
-            uint256 availableShares = Math.min(
-                vault.balanceOf(withdrawer),
-                vault.maxAvailableShares()
+    /**
+     * @notice Called to redeem withdrawer's shares from the specified vaults only, with the proceeds distributed to recipient.
+     * @dev Withdrawer must approve this contract to use their vault shares or this call will revert.
+     * @param token Address of the ERC20 token to withdraw from vaults
+     * @param withdrawer Address to pull the vault shares from. SECURITY SENSITIVE.
+     * @param recipient Address to receive the withdrawn tokens
+     * @param amount Maximum number of tokens to withdraw from all vaults; actual withdrawal may be less. If `WITHDRAW_EVERYTHING`, just withdraw everything.
+     * @param vaultIds Ids of the vaults to pull from, in the order to pull from them
+     * @return withdrawn The number of tokens received by recipient.
+     */
+    function _withdraw(
+        IERC20 token,
+        address withdrawer,
+        address recipient,
+        uint256 amount,
+        uint256[] memory vaultIds
+    ) internal returns (uint256 withdrawn) {
+        RegistryAPI _registry = registry;
+        CachedVault[] storage cached = _cachedVaults[_registry][address(token)];
+        for (
+            uint256 i = 0;
+            withdrawn + 1 < amount && i < vaultIds.length;
+            i++
+        ) {
+            (VaultAPI vault, uint256 unit) = _vault(
+                _registry,
+                cached,
+                address(token),
+                vaultIds[i]
             );
-            // Restrict by the allowance that `withdrawer` has given to this contract
-            availableShares = Math.min(
-                availableShares,
-                vault.allowance(withdrawer, address(this))
+            withdrawn += _withdrawFromVault(
+                token,
+                vault,
+                unit,
+                withdrawer,
+                recipient,
+                amount == WITHDRAW_EVERYTHING
+                    ? WITHDRAW_EVERYTHING
+                    : amount - withdrawn
             );
-            if (availableShares == 0) continue;
-
-            uint256 maxShares;
-            if (amount != WITHDRAW_EVERYTHING) {
-                // Compute amount to withdraw fully to satisfy the request
-                uint256 estimatedShares = ((amount - withdrawn) *
-                    10**vault.decimals()) / vault.pricePerShare();
-
-                // Limit amount to withdraw to the maximum made available to this contract
-                // NOTE: Avoid corner case where `estimatedShares` isn't precise enough
-                // NOTE: If `0 < estimatedShares < 1` but `availableShares > 1`, this will withdraw more than necessary
-                maxShares = Math.min(availableShares, estimatedShares);
-            } else {
-                maxShares = availableShares;
-            }
+        }
+    }
+
+    /**
+     * @notice Computes how many of withdrawer's shares of a vault a withdrawal would redeem.
+     * @param vault The vault to redeem shares from
+     * @param unit The vault's cached `10**decimals`, or 0 if it is not cached
+     * @param withdrawer Address to pull the vault shares from
+     * @param amount Maximum number of tokens to withdraw from the vault. If `WITHDRAW_EVERYTHING`, just withdraw everything.
+     * @return The number of shares to redeem.
+     */
+    function _withdrawableShares(
+        VaultAPI vault,
+        uint256 unit,
+        address withdrawer,
+        uint256 amount
+    ) internal view returns (uint256) {
+        return
+            _withdrawableShares(
+                vault,
+                unit,
+                withdrawer,
+                vault.balanceOf(withdrawer),
+                amount
+            );
+    }
+
+    /**
+     * @notice Computes how many of withdrawer's shares of a vault a withdrawal would redeem, given their share balance.
+     * @param vault The vault to redeem shares from
+     * @param unit The vault's cached `10**decimals`, or 0 if it is not cached
+     * @param withdrawer Address to pull the vault shares from
+     * @param shares Withdrawer's share balance of the vault
+     * @param amount Maximum number of tokens to withdraw from the vault. If `WITHDRAW_EVERYTHING`, just withdraw everything.
+     * @return The number of shares to redeem.
+     */
+    function _withdrawableShares(
+        VaultAPI vault,
+        uint256 unit,
+        address withdrawer,
+        uint256 shares,
+        uint256 amount
+    ) internal view returns (uint256) {
+        uint256 availableShares = Math.min(shares, vault.maxAvailableShares());
+        // Restrict by the allowance that `withdrawer` has given to this contract
+        availableShares = Math.min(
+            availableShares,
+            vault.allowance(withdrawer, address(this))
+        );
+        if (availableShares == 0 || amount == WITHDRAW_EVERYTHING)
+            return availableShares;
 
-            uint256 beforeBal = vault.balanceOf(address(this));
+        // Compute amount to withdraw fully to satisfy the request
+        uint256 estimatedShares = (amount * _unit(vault, unit)) /
+            vault.pricePerShare();
 
-            SafeERC20.safeTransferFrom(
+        // Limit amount to withdraw to the maximum made available to this contract
+        // NOTE: Avoid corner case where `estimatedShares` isn't precise enough
+        // NOTE: If `0 < estimatedShares < 1` but `availableShares > 1`, this will withdraw more than necessary
+        return Math.min(availableShares, estimatedShares);
+    }
+
+    /**
+     * @notice Redeems withdrawer's shares from a single vault, with the proceeds distributed to recipient.
+     * @param token The ERC20 token of the vault
+     * @param vault The vault to redeem shares from
+     * @param unit The vault's cached `10**decimals`, or 0 if it is not cached
+     * @param withdrawer Address to pull the vault shares from. SECURITY SENSITIVE.
+     * @param recipient Address to receive the withdrawn tokens
+     * @param amount Maximum number of tokens to withdraw from the vault. If `WITHDRAW_EVERYTHING`, just withdraw everything.
+     * @return The number of tokens received by recipient.
+     */
+    function _withdrawFromVault(
+        IERC20 token,
+        VaultAPI vault,
+        uint256 unit,
+        address withdrawer,
+        address recipient,
+        uint256 amount
+    ) internal returns (uint256) {
+        return
+            _withdrawFromVault(
+                token,
                 vault,
+                unit,
                 withdrawer,
-                address(this),
-                maxShares
+                vault.balanceOf(withdrawer),
+                recipient,
+                amount
             );
+    }
+
+    /**
+     * @notice Redeems withdrawer's shares from a single vault, given their share balance, with the proceeds
+     * distributed to recipient.
+     * @param token The ERC20 token of the vault
+     * @param vault The vault to redeem shares from
+     * @param unit The vault's cached `10**decimals`, or 0 if it is not cached
+     * @param withdrawer Address to pull the vault shares from. SECURITY SENSITIVE.
+     * @param shares Withdrawer's share balance of the vault
+     * @param recipient Address to receive the withdrawn tokens
+     * @param amount Maximum number of tokens to withdraw from the vault. If `WITHDRAW_EVERYTHING`, just withdraw everything.
+     * @return The number of tokens received by recipient.
+     */
+    function _withdrawFromVault(
+        IERC20 token,
+        VaultAPI vault,
+        uint256 unit,
+        address withdrawer,
+        uint256 shares,
+        address recipient,
+        uint256 amount
+    ) internal returns (uint256) {
+        uint256 maxShares = _withdrawableShares(
+            vault,
+            unit,
+            withdrawer,
+            shares,
+            amount
+        );
+        if (maxShares == 0) return 0;
 
-            withdrawn += vault.withdraw(maxShares, recipient);
+        uint256 beforeBal = vault.balanceOf(address(this));
 
-            uint256 afterWithdrawBal = vault.balanceOf(address(this));
-            if (afterWithdrawBal > beforeBal) {
-                SafeERC20.safeTransfer(
-                    vault,
-                    withdrawer,
-                    afterWithdrawBal - beforeBal
-                );
-            }
+        SafeERC20.safeTransferFrom(
+            vault,
+            withdrawer,
+            address(this),
+            maxShares
+        );
+
+        uint256 withdrawn = vault.withdraw(maxShares, recipient);
+
+        uint256 afterWithdrawBal = vault.balanceOf(address(this));
+        if (afterWithdrawBal > beforeBal) {
+            SafeERC20.safeTransfer(
+                vault,
+                withdrawer,
+                afterWithdrawBal - beforeBal
+            );
+            maxShares -= afterWithdrawBal - beforeBal;
         }
+
+        emit Withdraw(
+            address(token),
+            vault,
+            withdrawer,
+            recipient,
+            withdrawn,
+            maxShares
+        );
+        return withdrawn;
     }
 
     /**
@@ -437,6 +1419,25 @@ contract ShapeShiftDAORouter is Ownable {
             );
     }
 
+    /**
+     * @notice Called to migrate the caller's shares to the latest vault, approving this contract to use the shares
+     * with signed permits instead of a separate `approve` transaction.
+     * @dev Permits for vaults in which this contract's allowance already covers the permitted amount are skipped,
+     * so a permit that was front-run does not make the migration revert.
+     * @param token Address of the ERC20 token to migrate the vaults of
+     * @param amount Maximum number of tokens to migrate from all vaults; actual migration may be less. If `MIGRATE_EVERYTHING`, just migrate everything.
+     * @param permits Permits signed by the caller for the vaults to migrate from
+     * @return The number of tokens migrated.
+     */
+    function migrateWithPermit(
+        address token,
+        uint256 amount,
+        VaultPermit[] calldata permits
+    ) external returns (uint256) {
+        _permit(token, _msgSender(), permits);
+        return _migrate(IERC20(token), _msgSender(), amount, 0, MAX_VAULT_ID);
+    }
+
     /**
      * @notice Called to migrate migrator's shares to the latest vault.
      * @dev Migrator must approve this contract to use their vault shares or this call will revert.
@@ -454,28 +1455,37 @@ contract ShapeShiftDAORouter is Ownable {
         uint256 firstVaultId,
         uint256 lastVaultId
     ) internal returns (uint256 migrated) {
-        uint256 latestVaultId = registry.numVaults(address(token)) - 1;
-        if (amount == 0 || latestVaultId == 0) return 0; // Nothing to migrate, or nowhere to go (not a failure)
-
-        VaultAPI _latestVault = registry.vaults(address(token), latestVaultId);
-        uint256 _amount = Math.min(
-            amount,
-            _latestVault.depositLimit() - _latestVault.totalAssets()
-        );
+        uint256 latestVaultId;
+        VaultAPI _latestVault;
+        {
+            RegistryAPI _registry = registry;
+            latestVaultId = _registry.numVaults(address(token)) - 1;
+            if (amount == 0 || latestVaultId == 0) return 0; // Nothing to migrate, or nowhere to go (not a failure)
 
+            (_latestVault, ) = _vault(
+                _registry,
+                _cachedVaults[_registry][address(token)],
+                address(token),
+                latestVaultId
+            );
+        }
         uint256 beforeWithdrawBal = token.balanceOf(address(this));
-        _withdraw(
-            token,
-            migrator,
-            address(this),
-            _amount,
-            firstVaultId,
-            Math.min(lastVaultId, latestVaultId - 1)
-        );
+        {
+            // NOTE: A vault can be over its deposit limit (e.g. after the limit is lowered), so don't subtract directly
+            uint256 _amount = Math.min(amount, _depositHeadroom(_latestVault));
+            _withdraw(
+                token,
+                migrator,
+                address(this),
+                _amount,
+                firstVaultId,
+                Math.min(lastVaultId, latestVaultId - 1)
+            );
+        }
         uint256 afterWithdrawBal = token.balanceOf(address(this));
         require(afterWithdrawBal > beforeWithdrawBal, "withdraw failed");
 
-        _deposit(
+        uint256 shares = _deposit(
             token,
             address(this),
             migrator,
@@ -493,5 +1503,256 @@ contract ShapeShiftDAORouter is Ownable {
                 afterDepositBal - beforeWithdrawBal
             );
         }
+
+        emit Migrate(address(token), _latestVault, migrator, migrated, shares);
+    }
+
+    /**
+     * @notice Executes several calls to this contract in a single transaction, on behalf of the caller.
+     * @dev Each call is delegated to this contract, so every deposit, withdraw or migrate in the batch acts for the
+     * caller exactly as if it had been called directly. Reverts if any of the calls reverts.
+     * @param calls ABI-encoded calls to functions of this contract
+     * @return results The ABI-encoded return data of each call.
+     */
+    function multicall(bytes[] calldata calls)
+        external
+        returns (bytes[] memory results)
+    {
+        (, results) = _multicall(calls, new bool[](calls.length));
+    }
+
+    /**
+     * @notice Executes several calls to this contract in a single transaction, on behalf of the caller, optionally
+     * tolerating some of them reverting.
+     * @dev Each call is delegated to this contract, so every deposit, withdraw or migrate in the batch acts for the
+     * caller exactly as if it had been called directly. The effects of a tolerated reverting call are rolled back.
+     * @param calls ABI-encoded calls to functions of this contract
+     * @param allowFailure Whether the batch should continue if the call at the same index reverts
+     * @return successes Whether each call succeeded
+     * @return results The ABI-encoded return data of each call, or its revert data if it failed.
+     */
+    function multicall(bytes[] calldata calls, bool[] calldata allowFailure)
+        external
+        returns (bool[] memory successes, bytes[] memory results)
+    {
+        require(calls.length == allowFailure.length, "length mismatch");
+        return _multicall(calls, allowFailure);
+    }
+
+    function _multicall(bytes[] calldata calls, bool[] memory allowFailure)
+        internal
+        returns (bool[] memory successes, bytes[] memory results)
+    {
+        successes = new bool[](calls.length);
+        results = new bytes[](calls.length);
+        for (uint256 i = 0; i < calls.length; i++) {
+            (successes[i], results[i]) = address(this).delegatecall(calls[i]);
+            if (!successes[i] && !allowFailure[i]) {
+                bytes memory reason = results[i];
+                // Bubble up the revert data of the failed call
+                assembly {
+                    revert(add(reason, 32), mload(reason))
+                }
+            }
+        }
+    }
+
+    /**
+     * @notice The EIP-712 domain separator that intents are signed under.
+     * @return The hash of this contract's EIP-712 domain on the current chain.
+     */
+    function DOMAIN_SEPARATOR() public view returns (bytes32) {
+        return
+            keccak256(
+                abi.encode(
+                    DOMAIN_TYPEHASH,
+                    keccak256("ShapeShiftDAORouter"),
+                    keccak256("1"),
+                    block.chainid,
+                    address(this)
+                )
+            );
+    }
+
+    /**
+     * @notice Called to cancel one of the caller's intents before it is executed.
+     * @param nonce The nonce of the intent to cancel
+     */
+    function cancelIntent(uint256 nonce) external {
+        usedNonces[_msgSender()][nonce] = true;
+    }
+
+    /**
+     * @notice Executes deposits, withdrawals and migrations signed by their accounts, so that many users' actions
+     * settle in one transaction paid for by the caller.
+     * @dev Each account must have approved this contract to use its tokens or vault shares, exactly as for a direct
+     * call. Reverts if any of the intents is expired, already used, wrongly signed or fails.
+     * @param intents The intents to execute, in order
+     * @param signatures The EIP-712 signature of each intent by its account
+     * @return results The tokens deposited, withdrawn or migrated by each intent (shares minted for deposits).
+     */
+    function executeIntents(
+        Intent[] calldata intents,
+        bytes[] calldata signatures
+    ) external returns (uint256[] memory results) {
+        require(intents.length == signatures.length, "length mismatch");
+        results = new uint256[](intents.length);
+        for (uint256 i = 0; i < intents.length; i++)
+            results[i] = _executeIntent(intents[i], signatures[i]);
+    }
+
+    /**
+     * @notice Checks an intent's deadline, nonce and signature, then executes it for its account.
+     * @param intent The intent to execute
+     * @param signature The EIP-712 signature of the intent by `intent.account`
+     * @return The return value of the router action the intent authorizes.
+     */
+    function _executeIntent(Intent calldata intent, bytes calldata signature)
+        internal
+        returns (uint256)
+    {
+        require(block.timestamp <= intent.deadline, "intent expired");
+        require(!usedNonces[intent.account][intent.nonce], "intent already used");
+        usedNonces[intent.account][intent.nonce] = true;
+
+        bytes32 structHash = keccak256(
+            abi.encode(
+                INTENT_TYPEHASH,
+                intent.kind,
+                intent.account,
+                intent.token,
+                intent.recipient,
+                intent.amount,
+                intent.nonce,
+                intent.deadline
+            )
+        );
+        require(
+            ECDSA.recover(
+                ECDSA.toTypedDataHash(DOMAIN_SEPARATOR(), structHash),
+                signature
+            ) == intent.account,
+            "invalid signature"
+        );
+        emit IntentExecuted(intent.account, intent.nonce);
+
+        IERC20 token = IERC20(intent.token);
+        if (intent.kind == IntentKind.Deposit)
+            return
+                _deposit(
+                    token,
+                    intent.account,
+                    intent.recipient,
+                    intent.amount,
+                    MAX_VAULT_ID
+                );
+        if (intent.kind == IntentKind.Withdraw)
+            return
+                _withdraw(
+                    token,
+                    intent.account,
+                    intent.recipient,
+                    intent.amount,
+                    0,
+                    MAX_VAULT_ID
+                );
+        return _migrate(token, intent.account, intent.amount, 0, MAX_VAULT_ID);
+    }
+
+    /**
+     * @notice Applies permits signed by owner approving this contract to use their vault shares.
+     * @param token Address of the ERC20 token of the vaults
+     * @param owner Address that signed the permits. SECURITY SENSITIVE.
+     * @param permits Permits to apply; skipped if this contract's allowance already covers the permitted amount
+     */
+    function _permit(
+        address token,
+        address owner,
+        VaultPermit[] calldata permits
+    ) internal {
+        RegistryAPI _registry = registry;
+        CachedVault[] storage cached = _cachedVaults[_registry][token];
+        for (uint256 i = 0; i < permits.length; i++) {
+            (VaultAPI vault, ) = _vault(
+                _registry,
+                cached,
+                token,
+                permits[i].vaultId
+            );
+            if (vault.allowance(owner, address(this)) >= permits[i].amount)
+                continue;
+
+            require(
+                vault.permit(
+                    owner,
+                    address(this),
+                    permits[i].amount,
+                    permits[i].deadline,
+                    permits[i].signature
+                ),
+                "permit failed"
+            );
+        }
+    }
+
+    /**
+     * @notice Sends the native token, reverting if the recipient does not accept it.
+     * @param recipient Address to send to
+     * @param amount Amount of the native token to send
+     */
+    function _sendETH(address recipient, uint256 amount) internal {
+        (bool success, ) = recipient.call{value: amount}("");
+        require(success, "ETH transfer failed");
+    }
+
+    /**
+     * @notice Number of tokens a vault accepts before reaching its deposit limit.
+     * @param vault The vault to get the headroom of
+     * @return The vault's deposit limit minus its total assets, or 0 if it is at or over its limit.
+     */
+    function _depositHeadroom(VaultAPI vault) internal view returns (uint256) {
+        uint256 depositLimit = vault.depositLimit();
+        uint256 vaultAssets = vault.totalAssets();
+        if (depositLimit <= vaultAssets) return 0;
+        return depositLimit - vaultAssets;
+    }
+
+    /**
+     * @notice Looks up a vault, preferring the router's vault cache over the live registry.
+     * @param _registry The current registry, read once by the caller rather than once per vault
+     * @param cached The router's vault cache for `token` under the current registry
+     * @param token Address of the ERC20 token of the vault
+     * @param vaultId Id of the vault in the registry
+     * @return vault The vault with the specified id for the specified token
+     * @return unit `10**vault.decimals()` if it is cached, otherwise 0 (see `_unit`)
+     */
+    function _vault(
+        RegistryAPI _registry,
+        CachedVault[] storage cached,
+        address token,
+        uint256 vaultId
+    ) internal view returns (VaultAPI vault, uint256 unit) {
+        if (vaultId < cached.length) {
+            CachedVault storage entry = cached[vaultId];
+            return (entry.vault, entry.unit);
+        }
+
+        // Cache is stale (or was never synced), fall back to the live registry
+        vault = _registry.vaults(token, vaultId);
+    }
+
+    /**
+     * @notice Resolves `10**vault.decimals()`, only calling the vault when it was not cached.
+     * @param vault The vault to get the share unit of
+     * @param cachedUnit The unit returned by `_vault`
+     * @return The number of share base units per whole share.
+     */
+    function _unit(VaultAPI vault, uint256 cachedUnit)
+        internal
+        view
+        returns (uint256)
+    {
+        if (cachedUnit != 0) return cachedUnit;
+        return 10**vault.decimals();
     }
 }
@@ -0,0 +1,10 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.10;
+
+import {IERC20} from "../openzeppelin-contracts/contracts/token/ERC20/IERC20.sol";
+
+interface WETHAPI is IERC20 {
+    function deposit() external payable;
+
+    function withdraw(uint256 amount) external;
+}
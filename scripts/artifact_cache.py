@@ -0,0 +1,99 @@
+"""
+Content-hash keyed cache of compiled Brownie projects, so that test sessions and CI runs skip the compiler.
+
+`load_project("./yearn-vaults")` stands in for `project.load("./yearn-vaults")`. The first time it sees a given set of
+sources and compiler settings, it loads (and compiles) the project as usual and stores every contract's build
+artifact in one JSON file named after their hash. Later calls with the same sources build the contract containers
+straight from that file, without loading the project or starting a compiler, so they also work offline.
+
+Artifacts are kept under `$ARTIFACT_CACHE_DIR`, by default `~/.cache/shapeshift-router/artifacts`.
+
+    brownie run artifact_cache   # times loading the yearn-vaults project without and with the cache
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from brownie import project
+from brownie.network.contract import ContractContainer
+
+CACHE_DIR = Path(
+    os.environ.get(
+        "ARTIFACT_CACHE_DIR", Path.home() / ".cache" / "shapeshift-router" / "artifacts"
+    )
+)
+SOURCE_DIRS = ["contracts", "interfaces"]
+CONFIG_FILES = ["brownie-config.yml", "brownie-config.yaml"]
+
+
+def source_hash(path):
+    """Hash of the sources and Brownie config (which pins the compiler versions) of the project at `path`."""
+    path = Path(path)
+    files = [path / name for name in CONFIG_FILES if (path / name).exists()]
+    for directory in SOURCE_DIRS:
+        if (path / directory).exists():
+            files += sorted(
+                file for file in (path / directory).rglob("*") if file.is_file()
+            )
+
+    digest = hashlib.sha256()
+    for file in files:
+        digest.update(file.relative_to(path).as_posix().encode() + b"\0")
+        digest.update(file.read_bytes() + b"\0")
+    return digest.hexdigest()[:16]
+
+
+def load_project(path, cache_dir=CACHE_DIR):
+    """
+    Returns the contract containers of the Brownie project at `path`, as attributes (`yearn_vaults.Vault`).
+
+    Containers built from the cache belong to the active project, so they deploy and attach (`.at`) like the
+    active project's own contracts.
+    """
+    path = Path(path)
+    cache_file = Path(cache_dir) / f"{path.resolve().name}-{source_hash(path)}.json"
+    if cache_file.exists():
+        active = project.get_loaded_projects()[0]
+        builds = json.loads(cache_file.read_text())
+        return SimpleNamespace(
+            **{
+                name: ContractContainer(active, _build(build))
+                for name, build in builds.items()
+            }
+        )
+
+    loaded = project.load(path)
+    builds = {container._name: container._build for container in loaded}
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first, so that parallel test workers never read a partial file
+    with tempfile.NamedTemporaryFile("w", dir=cache_file.parent, delete=False) as file:
+        json.dump(builds, file)
+    os.replace(file.name, cache_file)
+    return loaded
+
+
+def _build(build):
+    # JSON turns the program counter keys of `pcMap` into strings, as in Brownie's own build files
+    if build.get("pcMap"):
+        build["pcMap"] = {int(pc): value for pc, value in build["pcMap"].items()}
+    return build
+
+
+def main(path="./yearn-vaults"):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        load_project(path, cache_dir)
+        uncached = time.perf_counter() - start
+
+        start = time.perf_counter()
+        containers = load_project(path, cache_dir)
+        cached = time.perf_counter() - start
+
+    print(f"{path}: {len(vars(containers))} contracts")
+    print(f"project.load:   {uncached:6.2f} s")
+    print(f"artifact cache: {cached:6.2f} s")
@@ -5,6 +5,7 @@ from eth_utils import is_checksum_address
 
 import click
 
+
 def get_address(msg: str, default: str = None) -> str:
 
     val = click.prompt(msg, default=default)
@@ -30,12 +31,13 @@ def main():
     dev = accounts.load(click.prompt("Account", type=click.Choice(accounts.load())))
     print(f"You are using: 'dev' [{dev.address}]")
     registry = get_address("Registry address,", "v2.registry.ychad.eth")
-    
+    weth = get_address("WETH address,", "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2")
 
     print(
         f"""
     ShapeShiftDAORouter Token Parameters
         registry: '{registry}'
+        weth: '{weth}'
     """
     )
 
@@ -46,6 +48,7 @@ def main():
 
     shapeShiftDAORouter = ShapeShiftDAORouter.deploy(
         registry,
+        weth,
         {"from": dev},
         publish_source=publish_source,
     )
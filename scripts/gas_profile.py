@@ -0,0 +1,150 @@
+"""
+Profiles where router transactions spend their gas, from `debug_traceTransaction` traces.
+
+Runs a deposit, a partial withdrawal and a migration on a local chain and attributes their gas to each external
+call made by the router and to each source line of `ShapeShiftDAORouter.sol`. Prints both as tables and writes
+flamegraph-compatible folded stacks (one `frame;frame;frame gas` line each) to `<out_dir>/<operation>.folded`:
+
+    brownie run gas_profile main <num_vaults> <out_dir>
+    flamegraph.pl reports/gas/withdraw.folded > withdraw.svg
+"""
+
+from collections import defaultdict
+from pathlib import Path
+
+from brownie import accounts
+
+from scripts.local_vaults import deploy_router_and_vaults
+
+AMOUNT = 10 ** 18
+ROUTER_SOURCE = "contracts/ShapeShiftDAORouter.sol"
+CALL_OPS = {"CALL", "CALLCODE", "DELEGATECALL", "STATICCALL", "CREATE", "CREATE2"}
+
+
+def _frame(step):
+    fn = step.get("fn") or "?"
+    # Brownie names functions `Contract.function`, except where it can't tell the contract
+    if "." in fn:
+        return fn
+    return f"{step.get('contractName') or step['address']}.{fn}"
+
+
+def step_costs(trace):
+    """
+    Gas used by each step of `trace`, counting only the call overhead for call opcodes.
+
+    Traces report the gas handed to a callee as part of the calling opcode's cost, so that would otherwise be
+    counted twice. Returns `(costs, inclusive)`, where `inclusive[i]` is the total gas of the call made at step `i`.
+    """
+    costs = [step["gasCost"] for step in trace]
+    inclusive = {}
+    returns = {}
+    for i, step in enumerate(trace):
+        if step["op"] in CALL_OPS:
+            j = i + 1
+            while j < len(trace) and trace[j]["depth"] > step["depth"]:
+                j += 1
+            returns[i] = j
+            if j < len(trace):
+                inclusive[i] = step["gas"] - trace[j]["gas"]
+            else:
+                inclusive[i] = step["gasCost"]
+
+    # Innermost calls first, so that nested calls are already corrected when their caller is
+    for i in sorted(returns, reverse=True):
+        costs[i] = max(inclusive[i] - sum(costs[i + 1 : returns[i]]), 0)
+    return costs, inclusive
+
+
+def profile(tx, source_lines):
+    """Returns the gas of `tx` per external call, per router source line and per call stack."""
+    trace = tx.trace
+    costs, inclusive = step_costs(trace)
+
+    calls = defaultdict(lambda: [0, 0])
+    lines = defaultdict(int)
+    stacks = defaultdict(int)
+    frames = {}
+    for i, step in enumerate(trace):
+        depth = step["depth"]
+        frames[depth] = _frame(step)
+        stack = ";".join(frames[d] for d in sorted(frames) if d <= depth)
+        stacks[stack] += costs[i]
+
+        source = step.get("source") or {}
+        line = None
+        if source.get("filename") == ROUTER_SOURCE:
+            line = source_lines(source["offset"][0])
+            lines[line] += inclusive.get(i, costs[i])
+
+        if i in inclusive and i + 1 < len(trace) and trace[i + 1]["depth"] > depth:
+            callee = _frame(trace[i + 1])
+            calls[(callee, line)][0] += 1
+            calls[(callee, line)][1] += inclusive[i]
+
+    return calls, lines, stacks, tx.gas_used
+
+
+def line_index(path):
+    text = Path(path).read_text()
+    starts = [0] + [i + 1 for i, char in enumerate(text) if char == "\n"]
+    source = text.splitlines()
+
+    def source_line(offset):
+        lo, hi = 0, len(starts) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if starts[mid] <= offset:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo + 1, source[lo].strip()
+
+    return source_line
+
+
+def report(name, calls, lines, stacks, gas_used, out_dir, top=15):
+    print(f"\n=== {name}: {gas_used} gas ===")
+    print(f"\n{'external call':<55} {'from line':>9} {'count':>5} {'gas':>9}")
+    for (callee, line), (count, gas) in sorted(
+        calls.items(), key=lambda item: -item[1][1]
+    )[:top]:
+        print(f"{callee:<55} {line[0] if line else '-':>9} {count:>5} {gas:>9}")
+
+    print(f"\n{'line':>5} {'gas':>9}  source")
+    for (number, text), gas in sorted(lines.items(), key=lambda item: -item[1])[:top]:
+        print(f"{number:>5} {gas:>9}  {text[:70]}")
+
+    path = Path(out_dir) / f"{name}.folded"
+    path.write_text("".join(f"{stack} {gas}\n" for stack, gas in stacks.items() if gas))
+    print(f"\nwrote {path}")
+
+
+def main(num_vaults=5, out_dir="reports/gas"):
+    num_vaults = int(num_vaults)
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    source_lines = line_index(ROUTER_SOURCE)
+
+    gov, user = accounts[0], accounts[1]
+    _, _, router, token, vaults = deploy_router_and_vaults(num_vaults, gov)
+
+    token.transfer(user, (num_vaults + 1) * AMOUNT, {"from": gov})
+    token.approve(router, (num_vaults + 1) * AMOUNT, {"from": user})
+    for vaultId, vault in enumerate(vaults):
+        router.deposit["address,address,uint256,uint256"](
+            token, user, AMOUNT, vaultId, {"from": user}
+        )
+        vault.approve(router, 2 ** 256 - 1, {"from": user})
+
+    transactions = {
+        "deposit": lambda: router.deposit["address,address,uint256"](
+            token, user, AMOUNT, {"from": user}
+        ),
+        # Leave part of the last position behind so that the withdrawal visits every vault
+        "withdraw": lambda: router.withdraw["address,address,uint256"](
+            token, user, num_vaults * AMOUNT - AMOUNT // 2, {"from": user}
+        ),
+        "migrate": lambda: router.migrate["address"](token, {"from": user}),
+    }
+    for name, transact in transactions.items():
+        report(name, *profile(transact(), source_lines), out_dir)
@@ -0,0 +1,140 @@
+"""
+Load and soak test of the router under randomized mixed traffic on a local chain.
+
+Funds `num_users` accounts, then replays `num_steps` random deposits, withdrawals and migrations, releasing a
+new vault every `num_steps // num_vaults` steps. After every step it checks that the router holds no tokens or
+vault shares. Reports throughput and gas percentiles per operation, grouped by how many vaults existed.
+
+Vault counts are read through a `MetadataCache`, as a service picking operations would; its hit rate is reported
+at the end.
+
+    brownie run load_test main <num_users> <num_steps> <num_vaults> <seed>
+"""
+
+import random
+import time
+from collections import defaultdict
+
+from brownie import accounts
+from brownie.exceptions import VirtualMachineError
+
+from scripts.local_vaults import (
+    deploy_router_and_vaults,
+    metadata_cache,
+    release_vaults,
+)
+
+AMOUNT = 10 ** 18
+PERCENTILES = [50, 90, 99]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, len(values) * pct // 100)]
+
+
+def check_router_holds_nothing(router, token, vaults):
+    assert token.balanceOf(router) == 0, "router holds tokens"
+    for vault in vaults:
+        assert vault.balanceOf(router) == 0, f"router holds shares of {vault}"
+
+
+def random_operation(rng, router, token, num_vaults, user):
+    """Picks an operation that makes sense for `user`, returning its name and a function sending it."""
+    balance = token.balanceOf(user)
+    positions = router.positions(token, user)
+    choices = []
+    if balance > 0:
+        choices += ["deposit", "depositToVault"]
+    if positions:
+        choices += ["withdraw", "withdrawAll"]
+    if any(vaultId < num_vaults - 1 for vaultId in positions):
+        choices += ["migrate"]
+    if not choices:
+        return None, None
+
+    operation = rng.choice(choices)
+    if operation == "deposit":
+        amount = rng.randint(1, balance)
+        send = lambda: router.deposit["address,address,uint256"](  # noqa: E731
+            token, user, amount, {"from": user}
+        )
+    elif operation == "depositToVault":
+        amount = rng.randint(1, balance)
+        vaultId = rng.randrange(num_vaults)
+        send = lambda: router.deposit["address,address,uint256,uint256"](  # noqa: E731
+            token, user, amount, vaultId, {"from": user}
+        )
+    elif operation == "withdraw":
+        vaultBalance = router.totalVaultBalance["address,address"](token, user)
+        amount = rng.randint(1, max(1, vaultBalance))
+        send = lambda: router.withdraw["address,address,uint256"](  # noqa: E731
+            token, user, amount, {"from": user}
+        )
+    elif operation == "withdrawAll":
+        send = lambda: router.withdraw["address,address"](  # noqa: E731
+            token, user, {"from": user}
+        )
+    else:
+        send = lambda: router.migrate["address"](token, {"from": user})  # noqa: E731
+    return operation, send
+
+
+def main(num_users=200, num_steps=2000, num_vaults=10, seed=0):
+    num_users, num_steps, num_vaults = int(num_users), int(num_steps), int(num_vaults)
+    rng = random.Random(int(seed))
+
+    gov = accounts[0]
+    yearn_vaults, registry, router, token, vaults = deploy_router_and_vaults(1, gov)
+    cache = metadata_cache(registry)
+
+    users = [accounts.add() for _ in range(num_users)]
+    for user in users:
+        gov.transfer(user, "1 ether")
+        token.transfer(user, 10 * AMOUNT, {"from": gov})
+        token.approve(router, 2 ** 256 - 1, {"from": user})
+        vaults[0].approve(router, 2 ** 256 - 1, {"from": user})
+
+    # gas[numVaults][operation] -> gas used by each successful transaction
+    gas = defaultdict(lambda: defaultdict(list))
+    reverts = defaultdict(int)
+    release_every = max(1, num_steps // num_vaults)
+
+    start = time.perf_counter()
+    for step in range(num_steps):
+        if step and step % release_every == 0 and len(vaults) < num_vaults:
+            (vault,) = release_vaults(yearn_vaults, registry, token, 1, gov)
+            vaults.append(vault)
+            for user in users:
+                vault.approve(router, 2 ** 256 - 1, {"from": user})
+
+        operation, send = random_operation(
+            rng, router, token, cache.num_vaults(token.address), rng.choice(users)
+        )
+        if operation is None:
+            continue
+        try:
+            tx = send()
+            gas[len(vaults)][operation].append(tx.gas_used)
+        except VirtualMachineError:
+            reverts[operation] += 1
+
+        check_router_holds_nothing(router, token, vaults)
+    elapsed = time.perf_counter() - start
+
+    transactions = sum(len(used) for ops in gas.values() for used in ops.values())
+    print(
+        f"\n{transactions} transactions in {elapsed:.1f}s ({transactions / elapsed:.1f} tx/s)"
+    )
+    print(f"reverted: {dict(reverts) or 'none'}")
+    print(f"metadata cache hit rate: {cache.hit_rate():.1%}")
+    print(
+        f"\n{'vaults':>6}  {'operation':<15} {'count':>6} "
+        + " ".join(f"{'p' + str(pct):>9}" for pct in PERCENTILES)
+    )
+    for numVaults in sorted(gas):
+        for operation, used in sorted(gas[numVaults].items()):
+            print(
+                f"{numVaults:>6}  {operation:<15} {len(used):>6} "
+                + " ".join(f"{percentile(used, pct):>9}" for pct in PERCENTILES)
+            )
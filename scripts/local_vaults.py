@@ -0,0 +1,74 @@
+"""
+Deploys a router and a token with many vault releases, mirroring the test fixtures, for the scripts that need
+router traffic on a local chain.
+
+Uses the live registry as the vault factory, so run on the default `mainnet-fork` network.
+"""
+
+from brownie import ShapeShiftDAORouter, accounts, network, web3
+
+from scripts.artifact_cache import load_project
+from yearn_router import MetadataCache
+
+LIVE_REGISTRY = "v2.registry.ychad.eth"
+LIVE_WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+
+
+def deploy_router_and_vaults(num_vaults, gov=None):
+    """Returns `(yearn_vaults, registry, router, token, vaults)` for a fresh token with `num_vaults` endorsed vaults."""
+    gov = gov or accounts[0]
+    yearn_vaults = load_project("./yearn-vaults")
+
+    registry = gov.deploy(yearn_vaults.Registry)
+    router = gov.deploy(ShapeShiftDAORouter, registry, LIVE_WETH)
+    token = gov.deploy(yearn_vaults.Token, 18)
+
+    # Register the two latest releases, so that `release_vaults` can alternate between them
+    for releaseDelta in [1, 0]:
+        registry.newRelease(
+            _new_vault(yearn_vaults, token, releaseDelta, gov), {"from": gov}
+        )
+
+    vaults = release_vaults(yearn_vaults, registry, token, num_vaults, gov)
+    return yearn_vaults, registry, router, token, vaults
+
+
+def release_vaults(yearn_vaults, registry, token, count, gov):
+    """Creates `count` vaults for `token`, endorsing each in turn as the latest vault in `registry`."""
+    vaults = []
+    for _ in range(count):
+        # The registry won't endorse two consecutive vaults of a token with the same API version,
+        # so alternate between the two latest releases
+        releaseDelta = 0
+        if registry.numVaults(token) > 0:
+            previous = yearn_vaults.Vault.at(registry.latestVault(token))
+            releaseDelta = int(previous.apiVersion() == registry.latestRelease())
+
+        vault = _new_vault(yearn_vaults, token, releaseDelta, gov)
+        registry.endorseVault(vault, releaseDelta, {"from": gov})
+        vaults.append(vault)
+    return vaults
+
+
+def _new_vault(yearn_vaults, token, releaseDelta, gov):
+    live_registry = yearn_vaults.Registry.at(LIVE_REGISTRY)
+    tx = live_registry.newExperimentalVault(
+        token, gov, gov, gov, "vault", "token", releaseDelta, {"from": gov}
+    )
+    vault = yearn_vaults.Vault.at(tx.return_value)
+    vault.setDepositLimit(2 ** 256 - 1, {"from": gov})
+    return vault
+
+
+def metadata_cache(registry, path=None):
+    """
+    Returns a `MetadataCache` of `registry` on the connected chain, like the tests' `metadata_cache` fixture.
+
+    Reads stored at `path` are scoped to the active network, so a fork doesn't share them with the chain it forks.
+    """
+    return MetadataCache(
+        web3.provider.endpoint_uri,
+        registry=registry.address,
+        path=path,
+        scope=network.show_active(),
+    )
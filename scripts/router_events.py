@@ -0,0 +1,103 @@
+"""
+Sample consumer of the router's `Deposit`/`Withdraw`/`Migrate` events.
+
+Generates router traffic on a local chain, then attributes it to the router twice: once from the router's own
+events, and once the old way, from every vault `Transfer` log plus a transaction lookup per log to check that it
+went through the router. Prints both timings.
+
+    brownie run router_events
+"""
+
+import time
+
+from brownie import accounts, web3
+from eth_utils import event_abi_to_log_topic
+
+from scripts.local_vaults import deploy_router_and_vaults
+
+NUM_VAULTS = 5
+NUM_USERS = 20
+AMOUNT = 10 ** 18
+
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+
+def generate_traffic(router, token, vaults, gov):
+    users = [accounts.add() for _ in range(NUM_USERS)]
+    for i, user in enumerate(users):
+        gov.transfer(user, "1 ether")
+        token.transfer(user, 2 * AMOUNT, {"from": gov})
+        token.approve(router, 2 * AMOUNT, {"from": user})
+        # Never the latest vault, so that every user has something to migrate
+        router.deposit["address,address,uint256,uint256"](
+            token, user, AMOUNT, i % (len(vaults) - 1), {"from": user}
+        )
+        router.deposit["address,address,uint256"](token, user, AMOUNT, {"from": user})
+        for vault in vaults:
+            vault.approve(router, 2 ** 256 - 1, {"from": user})
+
+    for i, user in enumerate(users):
+        if i % 2:
+            router.migrate["address"](token, {"from": user})
+        else:
+            router.withdraw["address,address,uint256"](
+                token, user, AMOUNT // 2, {"from": user}
+            )
+
+
+def from_router_events(router, from_block, to_block):
+    topics = [
+        "0x" + event_abi_to_log_topic(abi).hex()
+        for abi in router.abi
+        if abi["type"] == "event" and abi["name"] in ("Deposit", "Withdraw", "Migrate")
+    ]
+    logs = web3.eth.get_logs(
+        {
+            "address": router.address,
+            "topics": [topics],
+            "fromBlock": from_block,
+            "toBlock": to_block,
+        }
+    )
+    return {log["transactionHash"] for log in logs}
+
+
+def from_vault_transfers(router, vaults, from_block, to_block):
+    logs = web3.eth.get_logs(
+        {
+            "address": [vault.address for vault in vaults],
+            "topics": [TRANSFER_TOPIC],
+            "fromBlock": from_block,
+            "toBlock": to_block,
+        }
+    )
+    # Without router events, every vault transfer has to be checked for whether it went through the router
+    return {
+        log["transactionHash"]
+        for log in logs
+        if web3.eth.get_transaction(log["transactionHash"])["to"] == router.address
+    }
+
+
+def main():
+    gov = accounts[0]
+    _, _, router, token, vaults = deploy_router_and_vaults(NUM_VAULTS, gov)
+
+    from_block = web3.eth.block_number + 1
+    generate_traffic(router, token, vaults, gov)
+    to_block = web3.eth.block_number
+
+    start = time.perf_counter()
+    event_txs = from_router_events(router, from_block, to_block)
+    events_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    transfer_txs = from_vault_transfers(router, vaults, from_block, to_block)
+    transfers_time = time.perf_counter() - start
+
+    assert event_txs == transfer_txs, "the two indexing methods disagree"
+    print(f"{len(event_txs)} router transactions in blocks {from_block}-{to_block}")
+    print(f"router events:   {events_time * 1000:8.1f} ms")
+    print(f"vault transfers: {transfers_time * 1000:8.1f} ms")
+    print(f"speedup:         {transfers_time / events_time:8.1f}x")
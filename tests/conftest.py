@@ -1,62 +1,145 @@
+import json
+from pathlib import Path
+
 import pytest
 from brownie import accounts, config, project, Contract
+from brownie.network.contract import ContractContainer
 from eth_account import Account
 from eth_account.messages import encode_structured_data
 
+from scripts.artifact_cache import load_project
+
+LIVE_WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+DEPLOYMENT = (
+    Path(__file__).resolve().parent.parent / "deployment" / "ShapeShiftDAORouter.json"
+)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-gas-baseline",
+        action="store_true",
+        help="Write measured gas usage to tests/gas_baseline.json instead of checking it",
+    )
+
+
+def pytest_sessionstart(session):
+    # Measurements left behind by an interrupted update must not be merged into this one
+    if hasattr(session.config, "workerinput"):
+        return
+    if not session.config.getoption("--update-gas-baseline"):
+        return
+
+    for path in Path(__file__).parent.glob("gas_baseline.*.json"):
+        path.unlink()
+
+
+def pytest_sessionfinish(session):
+    # Only the controller merges, after every xdist worker has written its measurements
+    if hasattr(session.config, "workerinput"):
+        return
+    if not session.config.getoption("--update-gas-baseline"):
+        return
+
+    baseline_path = Path(__file__).parent / "gas_baseline.json"
+    baseline = json.loads(baseline_path.read_text())
+    for path in sorted(baseline_path.parent.glob("gas_baseline.*.json")):
+        baseline["gas"].update(json.loads(path.read_text()))
+        path.unlink()
+    baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    # Fixtures deploy once per module (or session); each test runs between a chain snapshot and a revert.
+    # NOTE: Brownie only keeps a single snapshot, so tests must use `chain.undo` rather than `chain.snapshot`.
+    pass
+
+
 @pytest.fixture(scope="session")
 def yearn_vaults():
-    yield project.load("./yearn-vaults")
+    # Compiled once per set of yearn-vaults sources, then loaded from the artifact cache
+    yield load_project("./yearn-vaults")
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
 def gov(accounts):
     yield accounts[0]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def affiliate(accounts):
     yield accounts[1]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def guardian(accounts):
     yield accounts[2]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def management(accounts):
     yield accounts[2]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def rewards(accounts):
     yield accounts[3]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def rando(accounts):
     yield accounts[3]
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
 def rando2(accounts):
     yield accounts[4]
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def token(yearn_vaults, gov):
     yield gov.deploy(yearn_vaults.Token, 18)
 
-@pytest.fixture
-def shape_shift_router(affiliate, registry,  ShapeShiftDAORouter):
-  yield affiliate.deploy(
-    ShapeShiftDAORouter,
-    registry
-  )
 
-@pytest.fixture
+@pytest.fixture(scope="module")
+def weth(gov, MockWETH):
+    yield gov.deploy(MockWETH)
+
+
+@pytest.fixture(scope="module")
+def shape_shift_router(affiliate, registry, weth, ShapeShiftDAORouter):
+    yield affiliate.deploy(ShapeShiftDAORouter, registry, weth)
+
+
+@pytest.fixture(scope="module")
+def original_router(affiliate, registry):
+    # The router as deployed on mainnet, from its build artifact, to check the current router against
+    build = json.loads(DEPLOYMENT.read_text())
+    build["contractName"] = "OriginalShapeShiftDAORouter"
+    container = ContractContainer(project.get_loaded_projects()[0], build)
+    yield container.deploy(registry, {"from": affiliate})
+
+
+@pytest.fixture(scope="session")
+def event_gas():
+    def event_gas(tx, contract):
+        # Gas of the LOG opcodes run by `contract` itself during `tx`, from its trace
+        return sum(
+            step["gasCost"]
+            for step in tx.trace
+            if step["op"].startswith("LOG") and step["address"] == contract.address
+        )
+
+    yield event_gas
+
+
+@pytest.fixture(scope="module")
 def vault(create_vault, token):
     yield create_vault(token=token)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def create_vault(yearn_vaults, live_registry, gov, rewards, guardian, management):
     def create_vault(token, releaseDelta=0, governance=gov):
         tx = live_registry.newExperimentalVault(
@@ -77,38 +160,62 @@ def create_vault(yearn_vaults, live_registry, gov, rewards, guardian, management
     yield create_vault
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
+def release_vaults(create_vault, registry, gov):
+    def release_vaults(token, count):
+        # The registry won't endorse two consecutive vaults of a token with the same API version,
+        # so alternate between the two latest releases, ending on the latest one.
+        releaseDeltas = [(count - 1 - i) % 2 for i in range(count)]
+        vaults = [
+            create_vault(token=token, releaseDelta=releaseDelta)
+            for releaseDelta in releaseDeltas
+        ]
+
+        if registry.numReleases() == 0:
+            for vault in vaults[-2:]:
+                registry.newRelease(vault, {"from": gov})
+
+        for vault, releaseDelta in zip(vaults, releaseDeltas):
+            registry.endorseVault(vault, releaseDelta, {"from": gov})
+
+        return vaults
+
+    yield release_vaults
+
+
+@pytest.fixture(scope="module")
 def registry(yearn_vaults, gov):
     yield gov.deploy(yearn_vaults.Registry)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def new_registry(yearn_vaults, gov):
     yield gov.deploy(yearn_vaults.Registry)
 
-@pytest.fixture
-def live_token(live_vault):
+
+@pytest.fixture(scope="module")
+def live_token(yearn_vaults, live_vault):
     token_address = live_vault.token()  # this will be the address of the Curve LP token
-    yield Contract(token_address)
+    # NOTE: Use a local ABI rather than fetching one from the explorer, so the live tests can be replayed offline
+    yield Contract.from_abi("LiveToken", token_address, yearn_vaults.Token.abi)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def live_vault(yearn_vaults):
     yield yearn_vaults.Vault.at("0x986b4aff588a109c09b50a03f42e4110e29d353f")  # yvseth
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def live_shape_shift_router(ShapeShiftDAORouter, affiliate, live_registry):
-    yield affiliate.deploy(
-        ShapeShiftDAORouter,
-        live_registry
-    )
+    yield affiliate.deploy(ShapeShiftDAORouter, live_registry, LIVE_WETH)
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def live_registry(yearn_vaults):
     yield yearn_vaults.Registry.at("v2.registry.ychad.eth")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def live_whale(accounts):
     whale = accounts.at(
         "0x3c0ffff15ea30c35d7a85b85c0782d6c94e1d238", force=True
@@ -116,6 +223,69 @@ def live_whale(accounts):
     yield whale
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def live_gov(live_registry):
     yield accounts.at(live_registry.governance(), force=True)
+
+
+@pytest.fixture
+def metadata_cache(registry, tmp_path):
+    from brownie import web3
+    from yearn_router import MetadataCache
+
+    # Function scoped, as reverting the chain between tests would leave a longer-lived cache ahead of it
+    cache = MetadataCache(
+        web3.provider.endpoint_uri,
+        registry=registry.address,
+        path=tmp_path / "metadata.sqlite",
+    )
+    yield cache
+    cache.close()
+
+
+@pytest.fixture(scope="module")
+def signer(accounts, gov):
+    # Local account with a known private key, so that it can sign EIP-712 messages
+    signer = accounts.add()
+    gov.transfer(signer, "1 ether")
+    yield signer
+
+
+@pytest.fixture(scope="session")
+def sign_vault_permit():
+    def sign_vault_permit(vault, owner, spender, allowance=2 ** 256 - 1, deadline=0):
+        data = {
+            "types": {
+                "EIP712Domain": [
+                    {"name": "name", "type": "string"},
+                    {"name": "version", "type": "string"},
+                    {"name": "chainId", "type": "uint256"},
+                    {"name": "verifyingContract", "type": "address"},
+                ],
+                "Permit": [
+                    {"name": "owner", "type": "address"},
+                    {"name": "spender", "type": "address"},
+                    {"name": "value", "type": "uint256"},
+                    {"name": "nonce", "type": "uint256"},
+                    {"name": "deadline", "type": "uint256"},
+                ],
+            },
+            "domain": {
+                "name": "Yearn Vault",
+                "version": vault.apiVersion(),
+                "chainId": 1,  # ganache bug https://github.com/trufflesuite/ganache/issues/1643
+                "verifyingContract": str(vault),
+            },
+            "primaryType": "Permit",
+            "message": {
+                "owner": owner.address,
+                "spender": str(spender),
+                "value": allowance,
+                "nonce": vault.nonces(owner.address),
+                "deadline": deadline,
+            },
+        }
+        permit = encode_structured_data(data)
+        return Account.from_key(owner.private_key).sign_message(permit).signature
+
+    yield sign_vault_permit
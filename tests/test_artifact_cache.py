@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+
+from scripts.artifact_cache import load_project, source_hash
+
+YEARN_VAULTS = Path("./yearn-vaults")
+
+
+def test_source_hash(tmp_path):
+    (tmp_path / "contracts").mkdir()
+    (tmp_path / "contracts" / "Token.vy").write_text("# @version 0.3.0\n")
+    (tmp_path / "brownie-config.yml").write_text(
+        "compiler:\n  vyper:\n    version: 0.3.0\n"
+    )
+    key = source_hash(tmp_path)
+    assert source_hash(tmp_path) == key
+
+    # Build outputs don't change the key, sources and compiler settings do
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "Token.json").write_text("{}")
+    assert source_hash(tmp_path) == key
+    (tmp_path / "contracts" / "Token.vy").write_text("# @version 0.3.1\n")
+    assert source_hash(tmp_path) != key
+    key = source_hash(tmp_path)
+    (tmp_path / "brownie-config.yml").write_text(
+        "compiler:\n  vyper:\n    version: 0.3.1\n"
+    )
+    assert source_hash(tmp_path) != key
+
+
+def test_loads_cached_artifacts(yearn_vaults, tmp_path, gov):
+    builds = {name: getattr(yearn_vaults, name)._build for name in ["Token", "Vault"]}
+    (tmp_path / f"yearn-vaults-{source_hash(YEARN_VAULTS)}.json").write_text(
+        json.dumps(builds)
+    )
+
+    cached = load_project(YEARN_VAULTS, tmp_path)
+    assert cached.Vault.abi == yearn_vaults.Vault.abi
+    assert cached.Vault.bytecode == yearn_vaults.Vault.bytecode
+    token = gov.deploy(cached.Token, 18)
+    assert token.decimals() == 18
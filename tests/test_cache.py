@@ -0,0 +1,61 @@
+from brownie import web3
+
+from yearn_router import MetadataCache
+
+
+def test_metadata_cache(
+    token, registry, create_vault, release_vaults, metadata_cache, gov
+):
+    vaults = release_vaults(token, 2)
+    cache = metadata_cache
+
+    assert cache.vaults(token.address) == [vault.address.lower() for vault in vaults]
+    assert cache.latest_vault(token.address) == vaults[-1].address.lower()
+    assert [cache.decimals(vault.address) for vault in vaults] == [18, 18]
+
+    # Nothing has changed, so everything is served from the cache
+    misses = sum(stats["misses"] for stats in cache.stats.values())
+    assert cache.vaults(token.address) == [vault.address.lower() for vault in vaults]
+    assert cache.latest_vault(token.address) == vaults[-1].address.lower()
+    assert [cache.decimals(vault.address) for vault in vaults] == [18, 18]
+    assert sum(stats["misses"] for stats in cache.stats.values()) == misses
+    assert cache.hit_rate("vaults") == 0.5
+
+    # The registry's NewVault log invalidates the vault count and latest vault, but not the known vaults
+    vault = create_vault(token=token, releaseDelta=1)
+    registry.endorseVault(vault, 1, {"from": gov})
+    assert cache.vaults(token.address)[-1] == vault.address.lower()
+    assert cache.latest_vault(token.address) == vault.address.lower()
+    assert cache.stats["vaults"] == {"hits": 4, "misses": 3}
+
+
+def test_metadata_cache_on_disk(
+    token, registry, new_registry, release_vaults, metadata_cache, tmp_path
+):
+    vaults = release_vaults(token, 2)
+    metadata_cache.vaults(token.address)
+    for vault in vaults:
+        metadata_cache.decimals(vault.address)
+
+    # Immutable reads are never refetched, even by a new cache
+    with MetadataCache(
+        web3.provider.endpoint_uri,
+        registry=registry.address,
+        path=tmp_path / "metadata.sqlite",
+    ) as cache:
+        assert [cache.vault(token.address, i) for i in range(2)] == [
+            vault.address.lower() for vault in vaults
+        ]
+        assert [cache.decimals(vault.address) for vault in vaults] == [18, 18]
+        assert cache.hit_rate() == 1.0
+
+    # Reads stored for another registry, or under another scope, are not served
+    for other, scope in [(new_registry, None), (registry, "mainnet-fork")]:
+        with MetadataCache(
+            web3.provider.endpoint_uri,
+            registry=other.address,
+            path=tmp_path / "metadata.sqlite",
+            scope=scope,
+        ) as cache:
+            assert [cache.decimals(vault.address) for vault in vaults] == [18, 18]
+            assert cache.hit_rate() == 0.0
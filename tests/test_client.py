@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+from brownie import web3
+
+from yearn_router.client import AsyncRouterClient, RouterClient, load_deployment
+
+AMOUNT = 10000
+
+
+@pytest.fixture
+def positions(token, release_vaults, shape_shift_router, gov, accounts):
+    vaults = release_vaults(token, 2)
+    holders = accounts[3:8]
+    for i, account in enumerate(holders):
+        token.transfer(account, (i + 1) * AMOUNT, {"from": gov})
+        token.approve(shape_shift_router, (i + 1) * AMOUNT, {"from": account})
+        shape_shift_router.deposit(
+            token, account, (i + 1) * AMOUNT, i % 2, {"from": account}
+        )
+    yield vaults, holders
+
+
+def test_load_deployment():
+    abi, address = load_deployment(1)
+    assert address == "0x6a1e73f12018D8e5f966ce794aa2921941feB17E"
+    assert any(fn.get("name") == "totalVaultBalance" for fn in abi)
+    assert load_deployment(1337)[1] is None
+
+
+def test_default_abi(token, shape_shift_router, positions):
+    vaults, holders = positions
+
+    # Without an `abi`, the client has the views that the mainnet artifact lacks
+    with RouterClient(web3.provider.endpoint_uri, shape_shift_router.address) as client:
+        assert client.total_assets(token.address) == shape_shift_router.totalAssets[
+            "address"
+        ](token)
+        (infos,) = client.vault_infos([token.address])
+        assert [v.lower() for v in infos["vaults"]] == [
+            v.address.lower() for v in vaults
+        ]
+
+        with pytest.raises(ValueError, match="no function totalAssets taking 5"):
+            client.call("totalAssets", token.address, 0, 1, 2, 3)
+
+
+def test_batched_reads(token, shape_shift_router, positions):
+    vaults, holders = positions
+
+    with RouterClient(
+        web3.provider.endpoint_uri, shape_shift_router.address, shape_shift_router.abi
+    ) as client:
+        assert client.num_vaults(token.address) == 2
+        assert [v.lower() for v in client.vaults(token.address)] == [
+            v.address.lower() for v in vaults
+        ]
+
+        balances = client.total_vault_balances(
+            [(token.address, account.address) for account in holders]
+        )
+        assert balances == [
+            shape_shift_router.totalVaultBalance(token, account) for account in holders
+        ]
+
+        # Reads split across several batches come back in order
+        client.batch_size = 2
+        assert (
+            client.total_vault_balances(
+                [(token.address, account.address) for account in holders]
+            )
+            == balances
+        )
+
+
+def test_async_batched_reads(token, shape_shift_router, positions):
+    vaults, holders = positions
+
+    async def read():
+        async with AsyncRouterClient(
+            web3.provider.endpoint_uri,
+            address=shape_shift_router.address,
+            abi=shape_shift_router.abi,
+            batch_size=2,
+        ) as client:
+            return await asyncio.gather(
+                client.num_vaults(token.address),
+                client.total_vault_balances(
+                    [(token.address, account.address) for account in holders]
+                ),
+            )
+
+    numVaults, balances = asyncio.run(read())
+    assert numVaults == 2
+    assert balances == [(i + 1) * AMOUNT for i in range(len(holders))]
+
+
+def test_paginated_reads(token, shape_shift_router, positions):
+    vaults, holders = positions
+    account = holders[-1]
+
+    with RouterClient(
+        web3.provider.endpoint_uri, shape_shift_router.address, shape_shift_router.abi
+    ) as client:
+        # A budget that stops after every vault still adds up to the unpaginated views
+        assert client.total_assets(
+            token.address, min_gas_left=2 ** 256 - 1
+        ) == shape_shift_router.totalAssets["address"](token)
+        assert client.total_vault_balance(
+            token.address, account.address, min_gas_left=2 ** 256 - 1
+        ) == shape_shift_router.totalVaultBalance["address,address"](token, account)
+
+        assert client.total_assets(token.address) == shape_shift_router.totalAssets[
+            "address"
+        ](token)
+
+
+def test_vault_infos(token, shape_shift_router, positions):
+    vaults, holders = positions
+
+    with RouterClient(
+        web3.provider.endpoint_uri, shape_shift_router.address, shape_shift_router.abi
+    ) as client:
+        (infos,) = client.vault_infos([token.address])
+
+    assert [v.lower() for v in infos["vaults"]] == [v.address.lower() for v in vaults]
+    assert infos["totalAssets"] == [vault.totalAssets() for vault in vaults]
+    assert infos["maxAvailableShares"] == [
+        vault.maxAvailableShares() for vault in vaults
+    ]
@@ -0,0 +1,50 @@
+import json
+import urllib.request
+
+from brownie import web3
+
+from yearn_router.forkproxy import ForkProxy
+
+
+def rpc(port, method, params):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}",
+        json.dumps(
+            {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+        ).encode(),
+        {"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def test_record_and_replay(tmp_path, token, gov):
+    snapshot = tmp_path / "snapshot.json"
+    block = hex(web3.eth.block_number)
+    calls = [
+        ("eth_getCode", [token.address, block]),
+        ("eth_getBalance", [gov.address, block]),
+        ("eth_getStorageAt", [token.address, "0x0", block]),
+    ]
+
+    # Port 0 lets the OS pick free ports, so that parallel test runs never collide
+    recorder = ForkProxy(snapshot, upstream=web3.provider.endpoint_uri)
+    server = recorder.serve(port=0)
+    port = server.server_address[1]
+    recorded = [rpc(port, method, params)["result"] for method, params in calls]
+    assert int(rpc(port, "eth_blockNumber", [])["result"], 16) == recorder.fork_block
+    server.shutdown()
+    server.server_close()
+    recorder.save()
+
+    replayer = ForkProxy(snapshot)
+    server = replayer.serve(port=0)
+    port = server.server_address[1]
+    assert [rpc(port, method, params)["result"] for method, params in calls] == recorded
+    assert replayer.fork_block == recorder.fork_block
+    assert (
+        "not in snapshot"
+        in rpc(port, "eth_getCode", [gov.address, block])["error"]["message"]
+    )
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,235 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+AMOUNT = 10000
+VAULT_COUNTS = [1, 2, 5, 10, 20]
+WITHDRAW_STRATEGIES = {"OldestFirst": 0, "NewestFirst": 1, "LargestFirst": 2}
+BASELINE_PATH = Path(__file__).parent / "gas_baseline.json"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def fresh_chain(module_isolation):
+    # Start from a reset chain, so that the module deploys to the same addresses (and pays the same calldata gas)
+    # whichever modules an xdist worker ran before it
+    pass
+
+
+@pytest.fixture(scope="module")
+def gas_baseline(request):
+    baseline = json.loads(BASELINE_PATH.read_text())
+    measured = {}
+    updating = request.config.getoption("--update-gas-baseline")
+
+    yield baseline, measured, updating
+
+    if updating:
+        # Each xdist worker writes its own file, which `pytest_sessionfinish` merges into the baseline once every
+        # worker is done, so that workers never overwrite each other's measurements
+        worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        path = BASELINE_PATH.with_name(f"gas_baseline.{worker}.json")
+        if path.exists():
+            measured = {**json.loads(path.read_text()), **measured}
+        path.write_text(json.dumps(measured))
+
+
+def check_gas(gas_baseline, scenario, measurements):
+    baseline, measured, updating = gas_baseline
+    measured[scenario] = measurements
+
+    expected = baseline["gas"].get(scenario, {})
+    missing = sorted(set(measurements) - set(expected))
+    regressions = {
+        operation: (expected[operation], gas)
+        for operation, gas in measurements.items()
+        if operation in expected
+        and gas > expected[operation] * (1 + baseline["tolerance"])
+    }
+    for operation, gas in measurements.items():
+        print(
+            f"{scenario:<22} {operation:<45} {gas:>9} (baseline {expected.get(operation)})"
+        )
+
+    if updating:
+        return
+    assert not missing, (
+        f"no gas baseline for {missing} in scenario {scenario!r}; "
+        "run with --update-gas-baseline and commit tests/gas_baseline.json"
+    )
+    assert (
+        not regressions
+    ), f"gas regressions over baseline (baseline, measured): {regressions}"
+
+
+@pytest.mark.parametrize("numVaults", VAULT_COUNTS)
+def test_gas_usage(
+    gas_baseline,
+    chain,
+    token,
+    release_vaults,
+    shape_shift_router,
+    event_gas,
+    gov,
+    rando,
+    rando2,
+    numVaults,
+):
+    router = shape_shift_router
+    vaults = release_vaults(token, numVaults)
+    measurements = {}
+
+    token.transfer(rando, (numVaults + 1) * AMOUNT, {"from": gov})
+    token.approve(router, (numVaults + 1) * AMOUNT, {"from": rando})
+
+    # One position in every vault, so that withdraw and migrate have to visit all of them
+    for vaultId in range(numVaults):
+        tx = router.deposit["address,address,uint256,uint256"](
+            token, rando, AMOUNT, vaultId, {"from": rando}
+        )
+    measurements["deposit(address,address,uint256,uint256)"] = tx.gas_used
+    tx = router.deposit["address,address,uint256"](
+        token, rando, AMOUNT, {"from": rando}
+    )
+    measurements["deposit(address,address,uint256)"] = tx.gas_used
+    # The part of each operation's gas spent on the router's own events
+    measurements["deposit(address,address,uint256) events"] = event_gas(tx, router)
+
+    for vault in vaults:
+        vault.approve(router, 2 ** 256 - 1, {"from": rando})
+
+    views = {
+        "numVaults(address)": router.numVaults.estimate_gas(token),
+        "vaults(address,uint256)": router.vaults.estimate_gas(token, 0),
+        "latestVault(address)": router.latestVault.estimate_gas(token),
+        "totalVaultBalance(address,address)": router.totalVaultBalance[
+            "address,address"
+        ].estimate_gas(token, rando),
+        "totalVaultBalance(address,address,uint256,uint256)": router.totalVaultBalance[
+            "address,address,uint256,uint256"
+        ].estimate_gas(token, rando, 0, numVaults - 1),
+        "totalAssets(address)": router.totalAssets["address"].estimate_gas(token),
+        "totalAssets(address,uint256,uint256)": router.totalAssets[
+            "address,uint256,uint256"
+        ].estimate_gas(token, 0, numVaults - 1),
+        "positions(address,address)": router.positions.estimate_gas(token, rando),
+        "totalVaultBalances(address[],address[])": router.totalVaultBalances.estimate_gas(
+            [token], [rando, rando2]
+        ),
+    }
+    measurements.update(views)
+
+    # Leave part of the last position behind so that partial withdrawals visit every vault
+    partial = numVaults * AMOUNT + AMOUNT // 2
+    operations = {
+        "withdraw(address,address)": lambda: router.withdraw["address,address"](
+            token, rando, {"from": rando}
+        ),
+        "withdraw(address,address,uint256)": lambda: router.withdraw[
+            "address,address,uint256"
+        ](token, rando, partial, {"from": rando}),
+        "withdraw(address,address,uint256,uint256,uint256)": lambda: router.withdraw[
+            "address,address,uint256,uint256,uint256"
+        ](token, rando, partial, 0, numVaults - 1, {"from": rando}),
+        "withdraw(address,address,uint256,uint256[])": lambda: router.withdraw[
+            "address,address,uint256,uint256[]"
+        ](token, rando, partial, list(range(numVaults)), {"from": rando}),
+        "migrate(address)": lambda: router.migrate["address"](token, {"from": rando}),
+        "migrate(address,uint256)": lambda: router.migrate["address,uint256"](
+            token, partial, {"from": rando}
+        ),
+        "migrate(address,uint256,uint256,uint256)": lambda: router.migrate[
+            "address,uint256,uint256,uint256"
+        ](token, partial, 0, numVaults - 1, {"from": rando}),
+    }
+    for operation, transact in operations.items():
+        # Measure every operation from the same starting state
+        tx = transact()
+        measurements[operation] = tx.gas_used
+        measurements[f"{operation} events"] = event_gas(tx, router)
+        chain.undo()
+
+    check_gas(gas_baseline, str(numVaults), measurements)
+
+
+def test_deposit_gas_against_original(
+    gas_baseline,
+    token,
+    release_vaults,
+    original_router,
+    shape_shift_router,
+    event_gas,
+    gov,
+    rando,
+    rando2,
+):
+    release_vaults(token, 2)
+    measurements = {}
+
+    for name, router, account in [
+        ("original", original_router, rando),
+        ("current", shape_shift_router, rando2),
+    ]:
+        token.transfer(account, 2 * AMOUNT, {"from": gov})
+        token.approve(router, 2 * AMOUNT, {"from": account})
+        # The first deposit approves the vault; measure a later one, as most deposits are
+        router.deposit["address,address,uint256"](
+            token, account, AMOUNT, {"from": account}
+        )
+        tx = router.deposit["address,address,uint256"](
+            token, account, AMOUNT, {"from": account}
+        )
+        measurements[f"deposit(address,address,uint256) {name}"] = tx.gas_used
+
+    events = event_gas(tx, shape_shift_router)
+    measurements["Deposit event"] = events
+    # Both deposit paths make the same calls, so only the Deposit event separates them
+    print(
+        f"\ndeposit: {measurements['deposit(address,address,uint256) original']} original, "
+        f"{measurements['deposit(address,address,uint256) current']} current, {events} of it events"
+    )
+    check_gas(gas_baseline, "deposit vs original", measurements)
+
+
+@pytest.mark.parametrize("numVaults", VAULT_COUNTS[1:])
+def test_withdraw_strategy_gas(
+    gas_baseline,
+    chain,
+    token,
+    release_vaults,
+    shape_shift_router,
+    gov,
+    rando,
+    numVaults,
+):
+    router = shape_shift_router
+    vaults = release_vaults(token, numVaults)
+    measurements = {}
+
+    # Small positions everywhere except for one large position in the middle, which alone covers
+    # the withdrawal that oldest-first spreads over several vaults
+    largeVaultId = numVaults // 2
+    deposits = [AMOUNT // 4] * numVaults
+    deposits[largeVaultId] = 2 * AMOUNT
+    token.transfer(rando, sum(deposits), {"from": gov})
+    token.approve(router, sum(deposits), {"from": rando})
+    for vaultId, amount in enumerate(deposits):
+        router.deposit["address,address,uint256,uint256"](
+            token, rando, amount, vaultId, {"from": rando}
+        )
+        vaults[vaultId].approve(router, 2 ** 256 - 1, {"from": rando})
+
+    for name, strategy in WITHDRAW_STRATEGIES.items():
+        tx = router.withdrawWithStrategy(
+            token, rando, AMOUNT, strategy, {"from": rando}
+        )
+        assert tx.return_value == AMOUNT
+        measurements[f"withdrawWithStrategy({name})"] = tx.gas_used
+        chain.undo()
+
+    assert (
+        measurements["withdrawWithStrategy(LargestFirst)"]
+        <= measurements["withdrawWithStrategy(OldestFirst)"]
+    )
+    check_gas(gas_baseline, f"{numVaults} withdraw strategies", measurements)
@@ -0,0 +1,79 @@
+import pytest
+from brownie import chain, web3
+
+from yearn_router.client import RouterClient
+from yearn_router.indexer import PositionIndexer
+
+AMOUNT = 10000
+
+
+@pytest.fixture
+def indexer(tmp_path, token, shape_shift_router):
+    client = RouterClient(
+        web3.provider.endpoint_uri, shape_shift_router.address, shape_shift_router.abi
+    )
+    indexer = PositionIndexer(
+        tmp_path / "positions.sqlite",
+        tokens=[token.address],
+        client=client,
+        start_block=chain.height,
+        chunk_size=3,
+        confirmations=0,
+    )
+    yield indexer
+    indexer.close()
+
+
+def assert_matches_router(indexer, token, shape_shift_router, holders):
+    indexer.refresh_prices()
+    for account in holders:
+        assert indexer.balance(token.address, account.address) == (
+            shape_shift_router.totalVaultBalance(token, account)
+        )
+
+
+def test_indexed_balances_match_router(
+    indexer, token, release_vaults, shape_shift_router, gov, rando, rando2
+):
+    vault1, vault2 = release_vaults(token, 2)
+    for account in [rando, rando2]:
+        token.transfer(account, 3 * AMOUNT, {"from": gov})
+        token.approve(shape_shift_router, 3 * AMOUNT, {"from": account})
+
+    shape_shift_router.deposit(token, rando, AMOUNT, 0, {"from": rando})
+    shape_shift_router.deposit(token, rando2, AMOUNT, 1, {"from": rando2})
+    indexer.sync()
+    assert_matches_router(indexer, token, shape_shift_router, [rando, rando2])
+
+    # Resume from the checkpoint with withdrawals and direct share transfers
+    shape_shift_router.deposit(token, rando, 2 * AMOUNT, {"from": rando})
+    vault2.transfer(rando2, AMOUNT // 2, {"from": rando})
+    vault1.approve(shape_shift_router, AMOUNT, {"from": rando})
+    shape_shift_router.withdraw(token, rando, AMOUNT // 2, {"from": rando})
+    indexer.sync()
+    assert_matches_router(indexer, token, shape_shift_router, [rando, rando2])
+    assert indexer.shares(vault2.address, rando2.address) == vault2.balanceOf(rando2)
+
+
+def test_indexer_unwinds_reorgs(
+    indexer, token, release_vaults, shape_shift_router, gov, rando, rando2
+):
+    (vault,) = release_vaults(token, 1)
+    for account in [rando, rando2]:
+        token.transfer(account, AMOUNT, {"from": gov})
+        token.approve(shape_shift_router, AMOUNT, {"from": account})
+    indexer.sync()
+
+    shape_shift_router.deposit(token, rando, AMOUNT, {"from": rando})
+    indexer.sync()
+    assert indexer.shares(vault.address, rando.address) == AMOUNT
+
+    # Replace the indexed blocks with a different history at the same heights
+    chain.undo()
+    shape_shift_router.deposit(token, rando2, AMOUNT, {"from": rando2})
+    chain.mine()
+    indexer.sync()
+
+    assert indexer.shares(vault.address, rando.address) == 0
+    assert indexer.shares(vault.address, rando2.address) == AMOUNT
+    assert_matches_router(indexer, token, shape_shift_router, [rando, rando2])
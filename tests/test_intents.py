@@ -0,0 +1,208 @@
+import brownie
+import pytest
+from brownie import chain, web3
+
+from yearn_router.client import RouterClient
+from yearn_router.relayer import IntentRelayer, intent_tuple, sign_intent
+
+AMOUNT = 10000
+
+
+@pytest.fixture(scope="module")
+def intent_signers(accounts, gov):
+    # Local accounts with known private keys, so that they can sign intents
+    signers = [accounts.add() for _ in range(4)]
+    for signer in signers:
+        gov.transfer(signer, "1 ether")
+    yield signers
+
+
+@pytest.fixture
+def make_intent(shape_shift_router, token):
+    nonces = {}
+
+    def make_intent(kind, account, amount=AMOUNT, recipient=None, **overrides):
+        nonce = nonces.get(account.address, 0)
+        nonces[account.address] = nonce + 1
+        intent = {
+            "kind": kind,
+            "account": account.address,
+            "token": token.address,
+            "recipient": (recipient or account).address,
+            "amount": amount,
+            "nonce": nonce,
+            "deadline": chain.time() + 3600,
+            **overrides,
+        }
+        # ganache bug https://github.com/trufflesuite/ganache/issues/1643
+        signature = sign_intent(intent, account.private_key, shape_shift_router, 1)
+        return intent, signature
+
+    yield make_intent
+
+
+def fund(token, shape_shift_router, gov, signers, amount=AMOUNT):
+    for signer in signers:
+        token.transfer(signer, amount, {"from": gov})
+        token.approve(shape_shift_router, amount, {"from": signer})
+
+
+def execute(shape_shift_router, signed, sender):
+    return shape_shift_router.executeIntents(
+        [intent_tuple(intent) for intent, _ in signed],
+        [signature for _, signature in signed],
+        {"from": sender},
+    )
+
+
+def test_execute_intents(
+    token, release_vaults, shape_shift_router, gov, rando, intent_signers, make_intent
+):
+    vaults = release_vaults(token, 2)
+    depositor, withdrawer, migrator = intent_signers[:3]
+    fund(token, shape_shift_router, gov, intent_signers[:3])
+    for account in [withdrawer, migrator]:
+        shape_shift_router.deposit(token, account, AMOUNT, 0, {"from": account})
+        vaults[0].approve(shape_shift_router, AMOUNT, {"from": account})
+
+    tx = execute(
+        shape_shift_router,
+        [
+            make_intent("deposit", depositor),
+            make_intent("withdraw", withdrawer, recipient=rando),
+            make_intent("migrate", migrator),
+        ],
+        rando,
+    )
+
+    assert tx.return_value == [AMOUNT, AMOUNT, AMOUNT]
+    assert vaults[1].balanceOf(depositor) == AMOUNT
+    assert token.balanceOf(rando) == AMOUNT
+    assert vaults[0].balanceOf(withdrawer) == 0
+    assert vaults[0].balanceOf(migrator) == 0
+    assert vaults[1].balanceOf(migrator) == AMOUNT
+    assert [event["account"] for event in tx.events["IntentExecuted"]] == [
+        depositor,
+        withdrawer,
+        migrator,
+    ]
+    assert shape_shift_router.usedNonces(depositor, 0)
+    assert token.balanceOf(shape_shift_router) == 0
+
+
+def test_rejected_intents(
+    token, release_vaults, shape_shift_router, gov, rando, intent_signers, make_intent
+):
+    release_vaults(token, 1)
+    signer, other = intent_signers[:2]
+    fund(token, shape_shift_router, gov, [signer], 3 * AMOUNT)
+
+    intent, signature = make_intent("deposit", signer)
+    execute(shape_shift_router, [(intent, signature)], rando)
+    with brownie.reverts("intent already used"):
+        execute(shape_shift_router, [(intent, signature)], rando)
+
+    with brownie.reverts("intent expired"):
+        execute(
+            shape_shift_router,
+            [make_intent("deposit", signer, deadline=chain.time() - 1)],
+            rando,
+        )
+
+    # Signed by someone else, or signed for a different intent
+    intent, _ = make_intent("deposit", signer)
+    _, signature = make_intent("deposit", other)
+    with brownie.reverts("invalid signature"):
+        execute(shape_shift_router, [(intent, signature)], rando)
+    intent, signature = make_intent("deposit", signer)
+    with brownie.reverts("invalid signature"):
+        execute(
+            shape_shift_router,
+            [({**intent, "recipient": rando.address}, signature)],
+            rando,
+        )
+
+    intent, signature = make_intent("deposit", signer)
+    shape_shift_router.cancelIntent(intent["nonce"], {"from": signer})
+    with brownie.reverts("intent already used"):
+        execute(shape_shift_router, [(intent, signature)], rando)
+
+    with brownie.reverts("length mismatch"):
+        shape_shift_router.executeIntents([intent_tuple(intent)], [], {"from": rando})
+
+
+def test_relayer_flushes_by_size_and_time(
+    token, release_vaults, shape_shift_router, gov, rando, intent_signers, make_intent
+):
+    vaults = release_vaults(token, 1)
+    fund(token, shape_shift_router, gov, intent_signers, 2 * AMOUNT)
+    now = [0.0]
+
+    def submit(intents, signatures):
+        return shape_shift_router.executeIntents(intents, signatures, {"from": rando})
+
+    with RouterClient(
+        web3.provider.endpoint_uri, shape_shift_router.address, shape_shift_router.abi
+    ) as client:
+        relayer = IntentRelayer(
+            submit, client=client, max_batch=3, max_delay=10, clock=lambda: now[0]
+        )
+        for signer in intent_signers[:2]:
+            assert relayer.add(*make_intent("deposit", signer)) is None
+        # A full batch settles straight away
+        tx = relayer.add(*make_intent("deposit", intent_signers[2]))
+        assert len(tx.events["IntentExecuted"]) == 3
+        assert len(relayer) == 0
+
+        # A batch that isn't full settles once its oldest intent has waited long enough
+        relayer.add(*make_intent("deposit", intent_signers[3]))
+        now[0] += 5
+        assert relayer.poll() is None
+        # An intent that would revert is dropped rather than failing the batch
+        relayer.add(
+            *make_intent("deposit", intent_signers[0], deadline=chain.time() - 1)
+        )
+        now[0] += 5
+        tx = relayer.poll()
+        assert [event["account"] for event in tx.events["IntentExecuted"]] == [
+            intent_signers[3]
+        ]
+        assert len(relayer.rejected) == 1
+        assert "intent expired" in relayer.rejected[0][-1]
+        assert relayer.settled == [relayer.settled[0], tx]
+
+    for signer in intent_signers:
+        assert vaults[0].balanceOf(signer) == AMOUNT
+
+
+@pytest.mark.parametrize("batch_size", [1, 10, 25])
+def test_intent_gas_amortization(
+    token,
+    release_vaults,
+    shape_shift_router,
+    gov,
+    rando,
+    accounts,
+    make_intent,
+    batch_size,
+):
+    release_vaults(token, 2)
+    signers = [accounts.add() for _ in range(batch_size + 1)]
+    for signer in signers:
+        gov.transfer(signer, "1 ether")
+    fund(token, shape_shift_router, gov, signers)
+
+    direct = shape_shift_router.deposit(token, signers[0], AMOUNT, {"from": signers[0]})
+    tx = execute(
+        shape_shift_router,
+        [make_intent("deposit", signer) for signer in signers[1:]],
+        rando,
+    )
+
+    per_intent = tx.gas_used / batch_size
+    print(
+        f"\n{batch_size} deposit intents: {tx.gas_used} gas, {per_intent:.0f} per intent, "
+        f"vs {direct.gas_used} for a direct deposit ({per_intent / direct.gas_used:.0%})"
+    )
+    if batch_size > 1:
+        assert per_intent < direct.gas_used
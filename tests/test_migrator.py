@@ -0,0 +1,216 @@
+import pytest
+from brownie import chain, web3
+
+from yearn_router.client import RouterClient
+from yearn_router.indexer import PositionIndexer
+from yearn_router.migrator import MigrationService, migration_intent
+from yearn_router.relayer import sign_intent
+
+AMOUNT = 10000
+
+
+@pytest.fixture
+def client(shape_shift_router):
+    with RouterClient(
+        web3.provider.endpoint_uri, shape_shift_router.address, shape_shift_router.abi
+    ) as client:
+        yield client
+
+
+@pytest.fixture
+def submit(shape_shift_router, accounts):
+    def submit(jobs, gas_price):
+        # Each holder sends its own migration, at the gas price the batch was cleared at
+        return [
+            shape_shift_router.migrate(
+                job.token,
+                job.amount,
+                job.first_vault_id,
+                job.last_vault_id,
+                {"from": accounts.at(job.account), "gas_price": gas_price},
+            )
+            for job in jobs
+        ]
+
+    yield submit
+
+
+def deposit_into_first_vault(
+    token, create_vault, registry, shape_shift_router, gov, holders
+):
+    vault1 = create_vault(releaseDelta=1, token=token)
+    registry.newRelease(vault1, {"from": gov})
+    registry.endorseVault(vault1, {"from": gov})
+    for i, account in enumerate(holders):
+        token.transfer(account, (i + 1) * AMOUNT, {"from": gov})
+        token.approve(shape_shift_router, (i + 1) * AMOUNT, {"from": account})
+        shape_shift_router.deposit(token, account, (i + 1) * AMOUNT, {"from": account})
+        vault1.approve(shape_shift_router, 2 ** 256 - 1, {"from": account})
+    return vault1
+
+
+def release_new_vault(token, create_vault, registry, gov):
+    vault2 = create_vault(releaseDelta=0, token=token)
+    registry.newRelease(vault2, {"from": gov})
+    registry.endorseVault(vault2, {"from": gov})
+    return vault2
+
+
+def test_migrates_after_new_release(
+    token,
+    create_vault,
+    registry,
+    shape_shift_router,
+    gov,
+    rando,
+    rando2,
+    client,
+    submit,
+):
+    vault1 = deposit_into_first_vault(
+        token, create_vault, registry, shape_shift_router, gov, [rando, rando2]
+    )
+    service = MigrationService(
+        submit, client, [token.address], accounts=[rando.address, rando2.address]
+    )
+    # Only one vault, so nothing to migrate to
+    assert service.poll() is None
+    assert service.pending == []
+
+    vault2 = release_new_vault(token, create_vault, registry, gov)
+    # Less headroom than both positions: the largest position is migrated first, the other only partly
+    vault2.setDepositLimit(2 * AMOUNT + AMOUNT // 2, {"from": gov})
+    token.transfer(shape_shift_router, AMOUNT, {"from": gov})
+    routerTokenBalance = token.balanceOf(shape_shift_router)
+
+    txs = service.poll()
+    assert [tx.sender for tx in txs] == [rando2, rando]
+    assert vault1.balanceOf(rando2) == 0
+    assert vault2.balanceOf(rando2) == 2 * AMOUNT
+    assert vault1.balanceOf(rando) == AMOUNT // 2
+    assert vault2.balanceOf(rando) == AMOUNT // 2
+    assert vault2.totalAssets() == vault2.depositLimit()
+    assert token.balanceOf(shape_shift_router) == routerTokenBalance
+
+    # Nothing changes until the next release
+    assert service.poll() is None
+
+
+def test_waits_for_gas_price(
+    token,
+    create_vault,
+    registry,
+    shape_shift_router,
+    gov,
+    rando,
+    rando2,
+    client,
+    submit,
+):
+    vault1 = deposit_into_first_vault(
+        token, create_vault, registry, shape_shift_router, gov, [rando, rando2]
+    )
+    service = MigrationService(
+        submit,
+        client,
+        [token.address],
+        accounts=[rando.address, rando2.address],
+        max_batch=1,
+        max_gas_price=-1,
+    )
+    service.poll()
+    release_new_vault(token, create_vault, registry, gov)
+
+    # Gas is too expensive, so the jobs stay queued
+    assert service.poll() is None
+    assert len(service.pending) == 2
+
+    service.max_gas_price = None
+    assert len(service.flush()) == 1
+    assert len(service.pending) == 1
+    service.flush()
+    assert vault1.balanceOf(rando) == vault1.balanceOf(rando2) == 0
+
+
+def test_finds_holders_with_indexer(
+    tmp_path,
+    token,
+    create_vault,
+    registry,
+    shape_shift_router,
+    gov,
+    rando,
+    rando2,
+    client,
+    submit,
+):
+    indexer = PositionIndexer(
+        tmp_path / "positions.sqlite",
+        tokens=[token.address],
+        client=client,
+        start_block=chain.height,
+        confirmations=0,
+    )
+    vault1 = deposit_into_first_vault(
+        token, create_vault, registry, shape_shift_router, gov, [rando, rando2]
+    )
+    vault2 = release_new_vault(token, create_vault, registry, gov)
+
+    service = MigrationService(submit, client, [token.address], indexer=indexer)
+    service.poll()
+    for account in [rando, rando2]:
+        assert vault1.balanceOf(account) == 0
+        assert vault2.balanceOf(account) > 0
+    indexer.close()
+
+
+def test_migrates_with_signed_intents(
+    token,
+    create_vault,
+    registry,
+    shape_shift_router,
+    gov,
+    rando,
+    accounts,
+    client,
+):
+    # Local accounts with known private keys, so that they can sign intents
+    holders = [accounts.add() for _ in range(2)]
+    for holder in holders:
+        gov.transfer(holder, "1 ether")
+    vault1 = deposit_into_first_vault(
+        token, create_vault, registry, shape_shift_router, gov, holders
+    )
+
+    private_keys = {holder.address.lower(): holder.private_key for holder in holders}
+
+    def sign(job):
+        intent = migration_intent(job, 0, chain.time() + 3600)
+        # ganache bug https://github.com/trufflesuite/ganache/issues/1643
+        signature = sign_intent(
+            intent, private_keys[job.account], shape_shift_router, 1
+        )
+        return intent, signature
+
+    def submit(intents, signatures, gas_price):
+        return shape_shift_router.executeIntents(
+            intents, signatures, {"from": rando, "gas_price": gas_price}
+        )
+
+    service = MigrationService(
+        submit,
+        client,
+        [token.address],
+        accounts=[holder.address for holder in holders],
+        sign=sign,
+    )
+    service.poll()
+    vault2 = release_new_vault(token, create_vault, registry, gov)
+
+    # Both holders migrate in one transaction, paid for by the relayer
+    tx = service.poll()
+    assert tx.sender == rando
+    assert tx.return_value == [2 * AMOUNT, AMOUNT]
+    for i, holder in enumerate(holders):
+        assert vault1.balanceOf(holder) == 0
+        assert vault2.balanceOf(holder) == (i + 1) * AMOUNT
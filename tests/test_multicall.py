@@ -0,0 +1,109 @@
+import brownie
+import pytest
+
+AMOUNT = 10000
+
+
+def test_multicall_across_tokens(
+    yearn_vaults, token, release_vaults, shape_shift_router, gov, rando
+):
+    token2 = gov.deploy(yearn_vaults.Token, 18)
+    (vault,) = release_vaults(token, 1)
+    (vault2,) = release_vaults(token2, 1)
+
+    for t in [token, token2]:
+        t.transfer(rando, AMOUNT, {"from": gov})
+        t.approve(shape_shift_router, AMOUNT, {"from": rando})
+
+    deposit = shape_shift_router.deposit["address,address,uint256"]
+    tx = shape_shift_router.multicall["bytes[]"](
+        [
+            deposit.encode_input(token, rando, AMOUNT),
+            deposit.encode_input(token2, rando, AMOUNT),
+        ],
+        {"from": rando},
+    )
+
+    assert len(tx.return_value) == 2
+    assert vault.balanceOf(rando) == vault2.balanceOf(rando) == AMOUNT
+    assert vault.balanceOf(shape_shift_router) == 0
+    assert vault2.balanceOf(shape_shift_router) == 0
+    assert token.balanceOf(shape_shift_router) == 0
+    assert token2.balanceOf(shape_shift_router) == 0
+
+    # Deposit-then-withdraw round trip, all as the caller
+    vault.approve(shape_shift_router, AMOUNT, {"from": rando})
+    vault2.approve(shape_shift_router, AMOUNT, {"from": rando})
+    withdraw = shape_shift_router.withdraw["address,address"]
+    shape_shift_router.multicall["bytes[]"](
+        [withdraw.encode_input(token, rando), withdraw.encode_input(token2, rando)],
+        {"from": rando},
+    )
+
+    assert token.balanceOf(rando) == token2.balanceOf(rando) == AMOUNT
+    assert vault.balanceOf(rando) == vault2.balanceOf(rando) == 0
+
+
+def test_multicall_revert_tolerance(
+    token, vault, registry, shape_shift_router, gov, rando
+):
+    registry.newRelease(vault, {"from": gov})
+    registry.endorseVault(vault, {"from": gov})
+    token.transfer(rando, AMOUNT, {"from": gov})
+    token.approve(shape_shift_router, AMOUNT, {"from": rando})
+
+    deposit = shape_shift_router.deposit["address,address,uint256"]
+    calls = [
+        deposit.encode_input(token, rando, AMOUNT // 2),
+        # More than rando has left, so this one reverts
+        deposit.encode_input(token, rando, AMOUNT),
+        deposit.encode_input(token, rando, AMOUNT // 2),
+    ]
+
+    with brownie.reverts():
+        shape_shift_router.multicall["bytes[]"](calls, {"from": rando})
+    with brownie.reverts():
+        shape_shift_router.multicall["bytes[],bool[]"](
+            calls, [True, False, True], {"from": rando}
+        )
+
+    tx = shape_shift_router.multicall["bytes[],bool[]"](
+        calls, [False, True, False], {"from": rando}
+    )
+    assert tx.return_value[0] == [True, False, True]
+    assert vault.balanceOf(rando) == AMOUNT
+    assert token.balanceOf(rando) == 0
+    assert token.balanceOf(shape_shift_router) == 0
+
+
+@pytest.mark.parametrize("numActions", [2, 5, 10])
+def test_multicall_gas_savings(
+    token, vault, registry, shape_shift_router, gov, rando, rando2, numActions
+):
+    registry.newRelease(vault, {"from": gov})
+    registry.endorseVault(vault, {"from": gov})
+    for account in [rando, rando2]:
+        token.transfer(account, (numActions + 1) * AMOUNT, {"from": gov})
+        token.approve(shape_shift_router, (numActions + 1) * AMOUNT, {"from": account})
+
+    # Warm up the router's vault approval so both paths start from the same state
+    shape_shift_router.deposit(token, rando, AMOUNT, {"from": rando})
+    shape_shift_router.deposit(token, rando2, AMOUNT, {"from": rando2})
+
+    separate = sum(
+        shape_shift_router.deposit(token, rando, AMOUNT, {"from": rando}).gas_used
+        for _ in range(numActions)
+    )
+
+    deposit = shape_shift_router.deposit["address,address,uint256"]
+    batched = shape_shift_router.multicall["bytes[]"](
+        [deposit.encode_input(token, rando2, AMOUNT) for _ in range(numActions)],
+        {"from": rando2},
+    ).gas_used
+
+    assert vault.balanceOf(rando) == vault.balanceOf(rando2)
+    assert batched < separate
+    print(
+        f"{numActions} deposits: {separate} gas separately, {batched} gas batched, "
+        f"{separate - batched} gas ({100 * (separate - batched) / separate:.1f}%) saved"
+    )
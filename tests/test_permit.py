@@ -0,0 +1,98 @@
+import brownie
+
+AMOUNT = 10000
+
+
+def test_withdraw_with_permit(
+    token, release_vaults, shape_shift_router, gov, signer, rando, sign_vault_permit
+):
+    vaults = release_vaults(token, 2)
+    token.transfer(signer, 2 * AMOUNT, {"from": gov})
+    token.approve(shape_shift_router, 2 * AMOUNT, {"from": signer})
+    shape_shift_router.deposit(token, signer, AMOUNT, 0, {"from": signer})
+    shape_shift_router.deposit(token, signer, AMOUNT, 1, {"from": signer})
+
+    # transfer some random tokens to the router to ensure this doesn't effect any accounting
+    # or the invariant check.
+    token.transfer(shape_shift_router, 10000, {"from": gov})
+    routerTokenBalance = token.balanceOf(shape_shift_router)
+
+    permits = [
+        (
+            vaultId,
+            AMOUNT,
+            0,
+            sign_vault_permit(vault, signer, shape_shift_router, AMOUNT),
+        )
+        for vaultId, vault in enumerate(vaults)
+    ]
+    shape_shift_router.withdrawWithPermit(
+        token, rando, 2 * AMOUNT, permits, {"from": signer}
+    )
+
+    assert token.balanceOf(rando) == 2 * AMOUNT
+    assert token.balanceOf(shape_shift_router) == routerTokenBalance
+    for vault in vaults:
+        assert vault.balanceOf(signer) == 0
+        assert vault.balanceOf(shape_shift_router) == 0
+
+
+def test_withdraw_with_front_run_permit(
+    token, vault, registry, shape_shift_router, gov, signer, rando, sign_vault_permit
+):
+    registry.newRelease(vault, {"from": gov})
+    registry.endorseVault(vault, {"from": gov})
+    token.transfer(signer, AMOUNT, {"from": gov})
+    token.approve(shape_shift_router, AMOUNT, {"from": signer})
+    shape_shift_router.deposit(token, signer, AMOUNT, {"from": signer})
+
+    signature = sign_vault_permit(vault, signer, shape_shift_router, AMOUNT)
+    # Someone else submits the permit first, which uses up its nonce
+    vault.permit(signer, shape_shift_router, AMOUNT, 0, signature, {"from": rando})
+
+    shape_shift_router.withdrawWithPermit(
+        token, signer, AMOUNT, [(0, AMOUNT, 0, signature)], {"from": signer}
+    )
+    assert token.balanceOf(signer) == AMOUNT
+
+
+def test_withdraw_with_invalid_permit(
+    token, vault, registry, shape_shift_router, gov, signer, rando, sign_vault_permit
+):
+    registry.newRelease(vault, {"from": gov})
+    registry.endorseVault(vault, {"from": gov})
+    token.transfer(signer, AMOUNT, {"from": gov})
+    token.approve(shape_shift_router, AMOUNT, {"from": signer})
+    shape_shift_router.deposit(token, signer, AMOUNT, {"from": signer})
+
+    # Permits only apply to the account that signed them
+    signature = sign_vault_permit(vault, signer, shape_shift_router, AMOUNT)
+    with brownie.reverts():
+        shape_shift_router.withdrawWithPermit(
+            token, rando, AMOUNT, [(0, AMOUNT, 0, signature)], {"from": rando}
+        )
+
+
+def test_migrate_with_permit(
+    token, release_vaults, shape_shift_router, gov, signer, sign_vault_permit
+):
+    vault1, vault2 = release_vaults(token, 2)
+    token.transfer(signer, AMOUNT, {"from": gov})
+    token.approve(shape_shift_router, AMOUNT, {"from": signer})
+    shape_shift_router.deposit(token, signer, AMOUNT, 0, {"from": signer})
+
+    # transfer some random tokens to the router to ensure this doesn't effect any accounting
+    # or the invariant check.
+    token.transfer(shape_shift_router, 10000, {"from": gov})
+    routerTokenBalance = token.balanceOf(shape_shift_router)
+
+    signature = sign_vault_permit(vault1, signer, shape_shift_router, AMOUNT)
+    shape_shift_router.migrateWithPermit(
+        token, AMOUNT, [(0, AMOUNT, 0, signature)], {"from": signer}
+    )
+
+    assert vault1.balanceOf(signer) == 0
+    assert vault2.balanceOf(signer) == AMOUNT
+    assert vault1.balanceOf(shape_shift_router) == 0
+    assert vault2.balanceOf(shape_shift_router) == 0
+    assert token.balanceOf(shape_shift_router) == routerTokenBalance
@@ -0,0 +1,102 @@
+import pytest
+
+from yearn_router import quoting
+
+WITHDRAW_EVERYTHING = 2 ** 256 - 1
+
+
+@pytest.fixture
+def positions(token, release_vaults, shape_shift_router, gov, accounts):
+    vaults = release_vaults(token, 3)
+    holders = accounts[3:9]
+    for i, account in enumerate(holders):
+        token.transfer(account, 60000, {"from": gov})
+        token.approve(shape_shift_router, 60000, {"from": account})
+        for vaultId, vault in enumerate(vaults):
+            amount = (i + 1) * (vaultId + 2) * 1000 if (i + vaultId) % 3 else 0
+            if amount:
+                shape_shift_router.deposit(
+                    token, account, amount, vaultId, {"from": account}
+                )
+            # Some accounts only partially approve the router
+            vault.approve(
+                shape_shift_router,
+                amount // 2 if i % 2 else 2 ** 256 - 1,
+                {"from": account},
+            )
+    yield vaults, holders
+
+
+def quote_inputs(vaults, holders, shape_shift_router):
+    shares = [[vault.balanceOf(account) for vault in vaults] for account in holders]
+    allowances = [
+        [vault.allowance(account, shape_shift_router) for vault in vaults]
+        for account in holders
+    ]
+    metadata = {
+        "price_per_share": [vault.pricePerShare() for vault in vaults],
+        "unit": [10 ** vault.decimals() for vault in vaults],
+        "max_available_shares": [vault.maxAvailableShares() for vault in vaults],
+    }
+    return shares, allowances, metadata
+
+
+def test_total_balances(token, shape_shift_router, positions):
+    vaults, holders = positions
+    shares, _, metadata = quote_inputs(vaults, holders, shape_shift_router)
+
+    assert list(
+        quoting.total_balances(shares, metadata["price_per_share"], metadata["unit"])
+    ) == [shape_shift_router.totalVaultBalance(token, account) for account in holders]
+
+
+@pytest.mark.parametrize("amount", [1, 2500, 9000, WITHDRAW_EVERYTHING])
+def test_withdraw_allocations(token, shape_shift_router, positions, amount):
+    vaults, holders = positions
+    shares, allowances, metadata = quote_inputs(vaults, holders, shape_shift_router)
+
+    redeemed, withdrawn = quoting.withdraw_allocations(
+        [amount] * len(holders), shares, allowances, **metadata
+    )
+    for i, account in enumerate(holders):
+        assert shape_shift_router.previewWithdraw(
+            token, account, amount, 0, 2 ** 256 - 1
+        ) == (list(redeemed[i]), withdrawn[i])
+
+
+@pytest.mark.parametrize("depositLimit", [2 ** 256 - 1, 60000])
+def test_migration_amounts(token, shape_shift_router, positions, gov, depositLimit):
+    vaults, holders = positions
+    vaults[-1].setDepositLimit(depositLimit, {"from": gov})
+    shares, allowances, metadata = quote_inputs(vaults, holders, shape_shift_router)
+
+    amount = 2 ** 256 - 1
+    redeemed, migrated, newShares = quoting.migration_amounts(
+        [amount] * len(holders),
+        shares,
+        allowances,
+        deposit_limit=[vault.depositLimit() for vault in vaults],
+        total_assets=[vault.totalAssets() for vault in vaults],
+        **metadata,
+    )
+    for i, account in enumerate(holders):
+        assert shape_shift_router.previewMigrate(
+            token, account, amount, 0, 2 ** 256 - 1
+        ) == (list(redeemed[i]), migrated[i], newShares[i])
+
+    # The quote matches what actually happens
+    account = holders[1]
+    shape_shift_router.migrate(token, {"from": account})
+    assert vaults[-1].balanceOf(account) == shares[1][-1] + newShares[1]
+
+
+def test_matches_per_account_loop():
+    amounts, shares, allowances, *vaults = quoting._random_inputs(200, 7, seed=1)
+
+    redeemed, withdrawn = quoting.withdraw_allocations(
+        amounts, shares, allowances, *vaults
+    )
+    for i, amount in enumerate(amounts):
+        assert quoting.withdraw_allocation(
+            amount, shares[i], allowances[i], *vaults
+        ) == (list(redeemed[i]), withdrawn[i])
@@ -5,6 +5,7 @@ from eth_account import Account
 
 AMOUNT = 100
 
+
 def test_config(gov, token, vault, registry, shape_shift_router, interface):
     # No vault added to the registry yet, so these methods should fail
     assert registry.numVaults(token) == 0
@@ -12,7 +13,7 @@ def test_config(gov, token, vault, registry, shape_shift_router, interface):
     with brownie.reverts():
         interface.RegistryAPI(shape_shift_router.registry()).latestVault(token)
         shape_shift_router.latestVault(token)
-  
+
     # This won't revert though, there's no Vaults yet
     assert interface.RegistryAPI(shape_shift_router.registry()).numVaults(token) == 0
     assert shape_shift_router.numVaults(token) == 0
@@ -20,11 +21,15 @@ def test_config(gov, token, vault, registry, shape_shift_router, interface):
     # Now they work when we have a Vault
     registry.newRelease(vault, {"from": gov})
     registry.endorseVault(vault, {"from": gov})
-    
+
     assert registry.numVaults(token) == 1
-    assert interface.RegistryAPI(shape_shift_router.registry()).latestVault(token) == vault
+    assert (
+        interface.RegistryAPI(shape_shift_router.registry()).latestVault(token) == vault
+    )
     assert interface.RegistryAPI(shape_shift_router.registry()).numVaults(token) == 1
-    assert interface.RegistryAPI(shape_shift_router.registry()).vaults(token, 0) == vault
+    assert (
+        interface.RegistryAPI(shape_shift_router.registry()).vaults(token, 0) == vault
+    )
     assert shape_shift_router.latestVault(token) == vault
     assert shape_shift_router.numVaults(token) == 1
     assert shape_shift_router.vaults(token, 0) == vault
@@ -37,7 +42,7 @@ def test_setRegistry(rando, affiliate, gov, shape_shift_router, new_registry):
     # Cannot set to an invalid registry
     with brownie.reverts():
         shape_shift_router.setRegistry(rando, {"from": affiliate})
-    
+
     with brownie.reverts():
         shape_shift_router.setRegistry(rando, {"from": gov})
 
@@ -51,13 +56,14 @@ def test_setRegistry(rando, affiliate, gov, shape_shift_router, new_registry):
 
     shape_shift_router.setRegistry(new_registry, {"from": affiliate})
 
+
 def test_transfer_ownership(rando, affiliate, shape_shift_router, new_registry):
     assert shape_shift_router.owner() == affiliate
     with brownie.reverts():
         shape_shift_router.setRegistry(rando, {"from": rando})
 
     with brownie.reverts():
-      shape_shift_router.transferOwnership(rando, {"from": rando})
+        shape_shift_router.transferOwnership(rando, {"from": rando})
 
     shape_shift_router.transferOwnership(rando, {"from": affiliate})
 
@@ -65,6 +71,7 @@ def test_transfer_ownership(rando, affiliate, shape_shift_router, new_registry):
     assert shape_shift_router.owner() == rando
     shape_shift_router.setRegistry(new_registry, {"from": rando})
 
+
 def test_deposit(token, registry, vault, shape_shift_router, gov, rando):
     registry.newRelease(vault, {"from": gov})
     registry.endorseVault(vault, {"from": gov})
@@ -79,31 +86,33 @@ def test_deposit(token, registry, vault, shape_shift_router, gov, rando):
 
     token.approve(shape_shift_router, 10000, {"from": rando})
     shape_shift_router.deposit(token, rando, 10000, {"from": rando})
-    
+
     assert vault.balanceOf(rando) == 10000
     assert vault.balanceOf(shape_shift_router) == 0
     assert token.balanceOf(rando) == 0
     assert token.balanceOf(shape_shift_router) == routerTokenBalance
 
 
-def test_deposit_with_recipient(token, registry, vault, shape_shift_router, gov, rando, rando2):
+def test_deposit_with_recipient(
+    token, registry, vault, shape_shift_router, gov, rando, rando2
+):
     registry.newRelease(vault, {"from": gov})
     registry.endorseVault(vault, {"from": gov})
     token.transfer(rando, 10000, {"from": gov})
     assert vault.balanceOf(rando) == vault.balanceOf(shape_shift_router) == 0
-    
+
     # transfer some random tokens to the router to ensure this doesn't effect any accounting
     # or the invariant check.
     token.transfer(shape_shift_router, 10000, {"from": gov})
     routerTokenBalance = token.balanceOf(shape_shift_router)
     assert routerTokenBalance == 10000
-    
+
     token.approve(shape_shift_router, 10000, {"from": rando})
     shape_shift_router.deposit(token, rando2, 10000, {"from": rando})
 
     assert vault.balanceOf(rando2) == 10000
     assert vault.balanceOf(rando) == 0
-    
+
     assert vault.balanceOf(shape_shift_router) == 0
     assert token.balanceOf(rando) == 0
     assert token.balanceOf(shape_shift_router) == routerTokenBalance
@@ -114,23 +123,26 @@ def test_withdraw_all(token, registry, vault, shape_shift_router, gov, rando):
     registry.endorseVault(vault, {"from": gov})
     token.transfer(rando, 1000000, {"from": gov})
     token.approve(shape_shift_router, 1000000, {"from": rando})
-    
+
     # transfer some random tokens to the router to ensure this doesn't effect any accounting
     # or the invariant check.
     token.transfer(shape_shift_router, 10000, {"from": gov})
     routerTokenBalance = token.balanceOf(shape_shift_router)
-    assert routerTokenBalance == 10000    
-    
+    assert routerTokenBalance == 10000
+
     shape_shift_router.deposit(token, rando, 1000000, {"from": rando})
 
     vault.approve(shape_shift_router, vault.balanceOf(rando), {"from": rando})
     shape_shift_router.withdraw(token, rando, 1000000, {"from": rando})
-    
+
     assert token.balanceOf(shape_shift_router) == routerTokenBalance
     assert vault.balanceOf(shape_shift_router) == 0
     assert token.balanceOf(rando) == 1000000
 
-def test_withdraw_all_with_recipient(token, registry, vault, shape_shift_router, gov, rando, rando2):
+
+def test_withdraw_all_with_recipient(
+    token, registry, vault, shape_shift_router, gov, rando, rando2
+):
     registry.newRelease(vault, {"from": gov})
     registry.endorseVault(vault, {"from": gov})
     token.transfer(rando, 1000000, {"from": gov})
@@ -146,12 +158,13 @@ def test_withdraw_all_with_recipient(token, registry, vault, shape_shift_router,
 
     vault.approve(shape_shift_router, vault.balanceOf(rando), {"from": rando})
     shape_shift_router.withdraw(token, rando2, 1000000, {"from": rando})
-    
+
     assert token.balanceOf(shape_shift_router) == routerTokenBalance
     assert vault.balanceOf(shape_shift_router) == 0
     assert token.balanceOf(rando) == 0
     assert token.balanceOf(rando2) == 1000000
 
+
 def test_withdraw_max(token, registry, vault, shape_shift_router, gov, rando):
     registry.newRelease(vault, {"from": gov})
     registry.endorseVault(vault, {"from": gov})
@@ -168,12 +181,15 @@ def test_withdraw_max(token, registry, vault, shape_shift_router, gov, rando):
 
     vault.approve(shape_shift_router, vault.balanceOf(rando), {"from": rando})
     shape_shift_router.withdraw(token, rando, {"from": rando})
-    
+
     assert token.balanceOf(shape_shift_router) == routerTokenBalance
     assert vault.balanceOf(shape_shift_router) == 0
     assert token.balanceOf(rando) == 10000
 
-def test_withdraw_max_with_recipient(token, registry, vault, shape_shift_router, gov, rando, rando2):
+
+def test_withdraw_max_with_recipient(
+    token, registry, vault, shape_shift_router, gov, rando, rando2
+):
     registry.newRelease(vault, {"from": gov})
     registry.endorseVault(vault, {"from": gov})
     token.transfer(rando, 10000, {"from": gov})
@@ -189,12 +205,13 @@ def test_withdraw_max_with_recipient(token, registry, vault, shape_shift_router,
 
     vault.approve(shape_shift_router, vault.balanceOf(rando), {"from": rando})
     shape_shift_router.withdraw(token, rando2, {"from": rando})
-    
+
     assert token.balanceOf(shape_shift_router) == routerTokenBalance
     assert vault.balanceOf(shape_shift_router) == 0
     assert token.balanceOf(rando) == 0
     assert token.balanceOf(rando2) == 10000
 
+
 def test_withdraw_half(token, registry, vault, shape_shift_router, gov, rando):
     registry.newRelease(vault, {"from": gov})
     registry.endorseVault(vault, {"from": gov})
@@ -210,16 +227,19 @@ def test_withdraw_half(token, registry, vault, shape_shift_router, gov, rando):
 
     vault.approve(shape_shift_router, vault.balanceOf(rando), {"from": rando})
     shape_shift_router.withdraw(token, rando, 500000, {"from": rando})
-    
+
     assert token.balanceOf(rando) == 500000
     assert token.balanceOf(shape_shift_router) == routerTokenBalance
     assert vault.balanceOf(shape_shift_router) == 0
 
-def test_withdraw_multiple_vaults(token, registry, create_vault, shape_shift_router, gov, rando, interface):
+
+def test_withdraw_multiple_vaults(
+    token, registry, create_vault, shape_shift_router, gov, rando, interface
+):
     vault1 = create_vault(releaseDelta=1, token=token)
     registry.newRelease(vault1, {"from": gov})
     registry.endorseVault(vault1, {"from": gov})
-    
+
     token.transfer(rando, 20000, {"from": gov})
     token.approve(shape_shift_router, 20000, {"from": rando})
 
@@ -230,14 +250,17 @@ def test_withdraw_multiple_vaults(token, registry, create_vault, shape_shift_rou
     assert routerTokenBalance == 10000
 
     shape_shift_router.deposit(token, rando, 10000, {"from": rando})
-    
+
     assert vault1.balanceOf(rando) == 10000
 
     vault2 = create_vault(releaseDelta=0, token=token)
     registry.newRelease(vault2, {"from": gov})
     registry.endorseVault(vault2, {"from": gov})
 
-    assert interface.RegistryAPI(shape_shift_router.registry()).latestVault(token) == vault2
+    assert (
+        interface.RegistryAPI(shape_shift_router.registry()).latestVault(token)
+        == vault2
+    )
     assert shape_shift_router.latestVault(token) == vault2
 
     shape_shift_router.deposit(token, rando, 10000, {"from": rando})
@@ -258,11 +281,13 @@ def test_withdraw_multiple_vaults(token, registry, create_vault, shape_shift_rou
     assert vault2.balanceOf(shape_shift_router) == 0
 
 
-def test_migrate(token, registry, create_vault, shape_shift_router, gov, rando, interface):
+def test_migrate(
+    token, registry, create_vault, shape_shift_router, gov, rando, interface
+):
     vault1 = create_vault(releaseDelta=1, token=token)
     registry.newRelease(vault1, {"from": gov})
     registry.endorseVault(vault1, {"from": gov})
-    
+
     # transfer some random tokens to the router to ensure this doesn't effect any accounting
     # or the invariant check.
     token.transfer(shape_shift_router, 10000, {"from": gov})
@@ -272,30 +297,36 @@ def test_migrate(token, registry, create_vault, shape_shift_router, gov, rando,
     token.transfer(rando, 10000, {"from": gov})
     token.approve(shape_shift_router, 10000, {"from": rando})
     shape_shift_router.deposit(token, rando, 10000, {"from": rando})
-    
+
     assert vault1.balanceOf(rando) == 10000
 
     vault2 = create_vault(releaseDelta=0, token=token)
     registry.newRelease(vault2, {"from": gov})
     registry.endorseVault(vault2, {"from": gov})
 
-    assert interface.RegistryAPI(shape_shift_router.registry()).latestVault(token) == vault2
+    assert (
+        interface.RegistryAPI(shape_shift_router.registry()).latestVault(token)
+        == vault2
+    )
     assert shape_shift_router.latestVault(token) == vault2
-   
+
     vault1.approve(shape_shift_router, vault1.balanceOf(rando), {"from": rando})
     shape_shift_router.migrate(token, {"from": rando})
-    
+
     assert vault1.balanceOf(rando) == 0
     assert vault2.balanceOf(rando) == 10000
     assert vault1.balanceOf(shape_shift_router) == 0
     assert vault2.balanceOf(shape_shift_router) == 0
     assert token.balanceOf(shape_shift_router) == routerTokenBalance
 
-def test_migrate_half(token, registry, create_vault, shape_shift_router, gov, rando, interface):
+
+def test_migrate_half(
+    token, registry, create_vault, shape_shift_router, gov, rando, interface
+):
     vault1 = create_vault(releaseDelta=1, token=token)
     registry.newRelease(vault1, {"from": gov})
     registry.endorseVault(vault1, {"from": gov})
-    
+
     token.transfer(rando, 10000, {"from": gov})
     token.approve(shape_shift_router, 10000, {"from": rando})
 
@@ -306,19 +337,22 @@ def test_migrate_half(token, registry, create_vault, shape_shift_router, gov, ra
     assert routerTokenBalance == 10000
 
     shape_shift_router.deposit(token, rando, 10000, {"from": rando})
-    
+
     assert vault1.balanceOf(rando) == 10000
 
     vault2 = create_vault(releaseDelta=0, token=token)
     registry.newRelease(vault2, {"from": gov})
     registry.endorseVault(vault2, {"from": gov})
 
-    assert interface.RegistryAPI(shape_shift_router.registry()).latestVault(token) == vault2
+    assert (
+        interface.RegistryAPI(shape_shift_router.registry()).latestVault(token)
+        == vault2
+    )
     assert shape_shift_router.latestVault(token) == vault2
-   
+
     vault1.approve(shape_shift_router, vault1.balanceOf(rando), {"from": rando})
     shape_shift_router.migrate(token, 5000, {"from": rando})
-    
+
     assert vault1.balanceOf(rando) == 5000
     assert vault2.balanceOf(rando) == 5000
     assert vault1.balanceOf(shape_shift_router) == 0
@@ -326,41 +360,420 @@ def test_migrate_half(token, registry, create_vault, shape_shift_router, gov, ra
     assert token.balanceOf(shape_shift_router) == routerTokenBalance
 
 
-
-def test_withdraw_with_direct_deposit(gov, token, create_vault, registry, shape_shift_router, rando):
+def test_withdraw_with_direct_deposit(
+    gov, token, create_vault, registry, shape_shift_router, rando
+):
     # this test is meant to mimic a scenario where a user
     # deposits tokens directly into a vault (without our router)
     # and then attempts to withdraw through our router.
     # the tests specifically creates a new vault to ensure this would work
-    # with any vault, even ones our router has never used / approved. 
+    # with any vault, even ones our router has never used / approved.
     vault1 = create_vault(releaseDelta=1, token=token)
     registry.newRelease(vault1, {"from": gov})
     registry.endorseVault(vault1, {"from": gov})
-        
+
     token.transfer(rando, 10000, {"from": gov})
     token.approve(vault1, 10000, {"from": rando})
-    vault1.deposit(10000, {"from": rando});
+    vault1.deposit(10000, {"from": rando})
 
     assert vault1.balanceOf(rando) == 10000
     assert token.balanceOf(rando) == 0
 
     # rando deposited directly to the vault and now attempts to use our router to withdraw
     vault1.approve(shape_shift_router, vault1.balanceOf(rando), {"from": rando})
-    
+
     # transfer some random tokens to the router to ensure this doesn't effect any accounting
     # or the invariant check.
     token.transfer(shape_shift_router, 10000, {"from": gov})
     routerTokenBalance = token.balanceOf(shape_shift_router)
     assert routerTokenBalance == 10000
-    
+
     shape_shift_router.withdraw(token, rando, 10000, {"from": rando})
 
     # NOTE: based on this test no approval is required for the yearn vault to move the
     # vault tokens on a user's behalf.
-    
-    # rando should have his tokens back 
+
+    # rando should have his tokens back
     assert vault1.balanceOf(rando) == 0
     assert token.balanceOf(rando) == 10000
     assert vault1.balanceOf(shape_shift_router) == 0
     assert token.balanceOf(shape_shift_router) == routerTokenBalance
-    assert vault1.allowance(shape_shift_router, vault1) == 0
\ No newline at end of file
+    assert vault1.allowance(shape_shift_router, vault1) == 0
+
+
+def test_total_vault_balances(
+    token, registry, create_vault, shape_shift_router, gov, rando, rando2
+):
+    vault1 = create_vault(releaseDelta=1, token=token)
+    registry.newRelease(vault1, {"from": gov})
+    registry.endorseVault(vault1, {"from": gov})
+
+    token.transfer(rando, 10000, {"from": gov})
+    token.approve(shape_shift_router, 10000, {"from": rando})
+    shape_shift_router.deposit(token, rando, 10000, {"from": rando})
+
+    vault2 = create_vault(releaseDelta=0, token=token)
+    registry.newRelease(vault2, {"from": gov})
+    registry.endorseVault(vault2, {"from": gov})
+
+    token.transfer(rando2, 5000, {"from": gov})
+    token.approve(shape_shift_router, 5000, {"from": rando2})
+    shape_shift_router.deposit(token, rando2, 5000, {"from": rando2})
+
+    accounts = [rando, rando2, gov]
+    balances = shape_shift_router.totalVaultBalances([token], accounts)
+
+    assert balances == [[10000, 5000, 0]]
+    for i, account in enumerate(accounts):
+        assert balances[0][i] == shape_shift_router.totalVaultBalance(token, account)
+
+    vaults, vaultBalances = shape_shift_router.vaultBalances(token, accounts)
+    assert vaults == [vault1, vault2]
+    assert vaultBalances == [[10000, 0, 0], [0, 5000, 0]]
+
+
+def test_withdraw_vault_ids(token, release_vaults, shape_shift_router, gov, rando):
+    vaults = release_vaults(token, 4)
+
+    token.transfer(rando, 20000, {"from": gov})
+    token.approve(shape_shift_router, 20000, {"from": rando})
+    shape_shift_router.deposit(token, rando, 10000, 1, {"from": rando})
+    shape_shift_router.deposit(token, rando, 10000, 3, {"from": rando})
+
+    vaultIds = shape_shift_router.positions(token, rando)
+    assert vaultIds == [1, 3]
+
+    for vaultId in vaultIds:
+        vaults[vaultId].approve(shape_shift_router, 10000, {"from": rando})
+
+    # transfer some random tokens to the router to ensure this doesn't effect any accounting
+    # or the invariant check.
+    token.transfer(shape_shift_router, 10000, {"from": gov})
+    routerTokenBalance = token.balanceOf(shape_shift_router)
+
+    # Pull from the newest position first
+    shape_shift_router.withdraw(token, rando, 15000, [3, 1], {"from": rando})
+
+    assert token.balanceOf(rando) == 15000
+    assert vaults[3].balanceOf(rando) == 0
+    assert vaults[1].balanceOf(rando) == 5000
+    assert shape_shift_router.positions(token, rando) == [1]
+    assert token.balanceOf(shape_shift_router) == routerTokenBalance
+    for vault in vaults:
+        assert vault.balanceOf(shape_shift_router) == 0
+
+
+def test_deposit_up_to_deposit_limit(
+    token, registry, vault, shape_shift_router, gov, rando
+):
+    registry.newRelease(vault, {"from": gov})
+    registry.endorseVault(vault, {"from": gov})
+    vault.setDepositLimit(6000, {"from": gov})
+    token.transfer(rando, 10000, {"from": gov})
+    token.approve(shape_shift_router, 10000, {"from": rando})
+
+    # transfer some random tokens to the router to ensure this doesn't effect any accounting
+    # or the invariant check.
+    token.transfer(shape_shift_router, 10000, {"from": gov})
+    routerTokenBalance = token.balanceOf(shape_shift_router)
+
+    # Fits under the limit, so the router skips the refund check
+    shape_shift_router.deposit(token, rando, 4000, {"from": rando})
+
+    # Over the limit, so the router checks for a refund, and the vault refuses it outright
+    with brownie.reverts():
+        shape_shift_router.deposit(token, rando, 6000, {"from": rando})
+
+    # Exactly up to the limit
+    shape_shift_router.deposit(token, rando, 2000, {"from": rando})
+
+    assert vault.balanceOf(rando) == 6000
+    assert token.balanceOf(rando) == 4000
+    assert vault.balanceOf(shape_shift_router) == 0
+    assert token.balanceOf(shape_shift_router) == routerTokenBalance
+
+
+def test_preview_withdraw(token, release_vaults, shape_shift_router, gov, rando):
+    vaults = release_vaults(token, 3)
+
+    token.transfer(rando, 20000, {"from": gov})
+    token.approve(shape_shift_router, 20000, {"from": rando})
+    shape_shift_router.deposit(token, rando, 10000, 0, {"from": rando})
+    shape_shift_router.deposit(token, rando, 10000, 2, {"from": rando})
+    vaults[0].approve(shape_shift_router, 10000, {"from": rando})
+    vaults[2].approve(shape_shift_router, 4000, {"from": rando})
+
+    # Capped by the allowance given on the newest vault
+    shares, withdrawn = shape_shift_router.previewWithdraw(
+        token, rando, 2 ** 256 - 1, 0, 2 ** 256 - 1
+    )
+    assert shares == [10000, 0, 4000]
+    assert withdrawn == 14000
+
+    shares, withdrawn = shape_shift_router.previewWithdraw(
+        token, rando, 12000, 0, 2 ** 256 - 1
+    )
+    assert shares == [10000, 0, 2000]
+    assert withdrawn == 12000
+
+    shape_shift_router.withdraw(token, rando, 12000, {"from": rando})
+    assert token.balanceOf(rando) == withdrawn
+    assert vaults[0].balanceOf(rando) == 0
+    assert vaults[2].balanceOf(rando) == 8000
+
+
+def test_preview_migrate(token, release_vaults, shape_shift_router, gov, rando):
+    vaults = release_vaults(token, 2)
+    vaults[1].setDepositLimit(15000, {"from": gov})
+
+    token.transfer(rando, 20000, {"from": gov})
+    token.approve(shape_shift_router, 20000, {"from": rando})
+    shape_shift_router.deposit(token, rando, 10000, 0, {"from": rando})
+    shape_shift_router.deposit(token, rando, 10000, 1, {"from": rando})
+    vaults[0].approve(shape_shift_router, 10000, {"from": rando})
+
+    # Only 5000 fits under the latest vault's deposit limit
+    shares, migrated, newShares = shape_shift_router.previewMigrate(
+        token, rando, 2 ** 256 - 1, 0, 2 ** 256 - 1
+    )
+    assert shares == [5000]
+    assert migrated == 5000
+    assert newShares == 5000
+
+    shape_shift_router.migrate(token, {"from": rando})
+    assert vaults[0].balanceOf(rando) == 10000 - shares[0]
+    assert vaults[1].balanceOf(rando) == 10000 + newShares
+
+
+def test_migrate_into_vault_over_its_limit(
+    token, release_vaults, shape_shift_router, gov, rando
+):
+    vaults = release_vaults(token, 2)
+
+    token.transfer(rando, 20000, {"from": gov})
+    token.approve(shape_shift_router, 20000, {"from": rando})
+    shape_shift_router.deposit(token, rando, 10000, 0, {"from": rando})
+    shape_shift_router.deposit(token, rando, 10000, 1, {"from": rando})
+    vaults[0].approve(shape_shift_router, 10000, {"from": rando})
+    vaults[1].setDepositLimit(5000, {"from": gov})
+
+    # No headroom left in the latest vault, so nothing is withdrawn rather than the headroom underflowing
+    with brownie.reverts("withdraw failed"):
+        shape_shift_router.migrate(token, {"from": rando})
+    assert vaults[0].balanceOf(rando) == 10000
+
+
+def test_preview_deposit(token, registry, vault, shape_shift_router, gov, rando):
+    registry.newRelease(vault, {"from": gov})
+    registry.endorseVault(vault, {"from": gov})
+    vault.setDepositLimit(6000, {"from": gov})
+
+    assert shape_shift_router.previewDeposit(token, 10000, 2 ** 256 - 1) == (
+        10000,
+        6000,
+    )
+
+    token.transfer(rando, 4000, {"from": gov})
+    token.approve(shape_shift_router, 4000, {"from": rando})
+    shares, depositable = shape_shift_router.previewDeposit(token, 4000, 0)
+    assert depositable == 4000
+    shape_shift_router.deposit(token, rando, 4000, {"from": rando})
+    assert vault.balanceOf(rando) == shares
+
+    assert shape_shift_router.previewDeposit(token, 10000, 0) == (10000, 2000)
+
+
+@pytest.mark.parametrize(
+    "strategy,balances",
+    [
+        (0, [0, 8000, 3000]),  # OldestFirst
+        (1, [2000, 9000, 0]),  # NewestFirst
+        (2, [2000, 6000, 3000]),  # LargestFirst
+    ],
+)
+def test_withdraw_with_strategy(
+    token, release_vaults, shape_shift_router, gov, rando, strategy, balances
+):
+    vaults = release_vaults(token, 3)
+
+    token.transfer(rando, 15000, {"from": gov})
+    token.approve(shape_shift_router, 15000, {"from": rando})
+    for vaultId, amount in enumerate([2000, 10000, 3000]):
+        shape_shift_router.deposit(token, rando, amount, vaultId, {"from": rando})
+        vaults[vaultId].approve(shape_shift_router, amount, {"from": rando})
+
+    # transfer some random tokens to the router to ensure this doesn't effect any accounting
+    # or the invariant check.
+    token.transfer(shape_shift_router, 10000, {"from": gov})
+    routerTokenBalance = token.balanceOf(shape_shift_router)
+
+    shape_shift_router.withdrawWithStrategy(
+        token, rando, 4000, strategy, {"from": rando}
+    )
+
+    assert token.balanceOf(rando) == 4000
+    assert [vault.balanceOf(rando) for vault in vaults] == balances
+    assert token.balanceOf(shape_shift_router) == routerTokenBalance
+    for vault in vaults:
+        assert vault.balanceOf(shape_shift_router) == 0
+
+
+def test_paginated_views(token, release_vaults, shape_shift_router, gov, rando):
+    vaults = release_vaults(token, 3)
+
+    token.transfer(rando, 6000, {"from": gov})
+    token.approve(shape_shift_router, 6000, {"from": rando})
+    for vaultId in range(3):
+        shape_shift_router.deposit(
+            token, rando, (vaultId + 1) * 1000, vaultId, {"from": rando}
+        )
+
+    # No gas to spare, so every page includes exactly one vault
+    assert shape_shift_router.totalAssetsPaginated(token, 0, 2 ** 256 - 1) == (1000, 1)
+    assert shape_shift_router.totalAssetsPaginated(token, 2, 2 ** 256 - 1) == (3000, 3)
+    assert shape_shift_router.totalVaultBalancePaginated(
+        token, rando, 1, 2 ** 256 - 1
+    ) == (2000, 2)
+
+    # Enough gas for everything in one page
+    assert shape_shift_router.totalAssetsPaginated(token, 0, 0) == (6000, 3)
+    assert shape_shift_router.totalVaultBalancePaginated(token, rando, 0, 0) == (
+        6000,
+        3,
+    )
+    assert shape_shift_router.totalVaultBalancePaginated(token, rando, 3, 0) == (0, 3)
+
+
+def test_events(token, release_vaults, shape_shift_router, gov, rando):
+    vaults = release_vaults(token, 2)
+
+    token.transfer(rando, 20000, {"from": gov})
+    token.approve(shape_shift_router, 20000, {"from": rando})
+    tx = shape_shift_router.deposit(token, rando, 10000, 0, {"from": rando})
+    assert tx.events["Deposit"].values() == [
+        token,
+        vaults[0],
+        rando,
+        rando,
+        10000,
+        10000,
+    ]
+
+    vaults[0].approve(shape_shift_router, 10000, {"from": rando})
+    tx = shape_shift_router.migrate(token, 4000, {"from": rando})
+    assert tx.events["Withdraw"].values() == [
+        token,
+        vaults[0],
+        rando,
+        shape_shift_router,
+        4000,
+        4000,
+    ]
+    assert tx.events["Deposit"].values() == [
+        token,
+        vaults[1],
+        rando,
+        shape_shift_router,
+        4000,
+        4000,
+    ]
+    assert tx.events["Migrate"].values() == [token, vaults[1], rando, 4000, 4000]
+
+    tx = shape_shift_router.withdraw(token, rando, {"from": rando})
+    assert tx.events["Withdraw"].values() == [
+        token,
+        vaults[0],
+        rando,
+        rando,
+        6000,
+        6000,
+    ]
+    assert "Deposit" not in tx.events
+
+
+def test_vault_infos(token, release_vaults, shape_shift_router, gov, rando):
+    vaults = release_vaults(token, 3)
+    vaults[2].setDepositLimit(50000, {"from": gov})
+
+    token.transfer(rando, 6000, {"from": gov})
+    token.approve(shape_shift_router, 6000, {"from": rando})
+    for vaultId in range(3):
+        shape_shift_router.deposit(
+            token, rando, (vaultId + 1) * 1000, vaultId, {"from": rando}
+        )
+
+    infos = shape_shift_router.vaultInfos["address"](token)
+    assert infos == (
+        vaults,
+        [18, 18, 18],
+        [vault.pricePerShare() for vault in vaults],
+        [1000, 2000, 3000],
+        [2 ** 256 - 1, 2 ** 256 - 1, 50000],
+        [vault.maxAvailableShares() for vault in vaults],
+    )
+
+    # A page of the vault list is a slice of every array
+    page = shape_shift_router.vaultInfos["address,uint256,uint256"](token, 1, 2)
+    assert page == tuple(values[1:] for values in infos)
+
+
+def test_deposit_eth(weth, create_vault, registry, shape_shift_router, gov, rando):
+    vault = create_vault(token=weth)
+    registry.newRelease(vault, {"from": gov})
+    registry.endorseVault(vault, {"from": gov})
+
+    # transfer some random weth to the router to ensure this doesn't effect any accounting
+    # or the invariant check.
+    weth.deposit({"from": gov, "value": 10000})
+    weth.transfer(shape_shift_router, 10000, {"from": gov})
+    routerTokenBalance = weth.balanceOf(shape_shift_router)
+
+    # Wrap and deposit in a single transaction, with no approval
+    tx = shape_shift_router.depositETH(rando, {"from": rando, "value": 10000})
+    assert vault.balanceOf(rando) == 10000
+    assert tx.events["Deposit"]["depositor"] == rando
+    assert weth.balanceOf(shape_shift_router) == routerTokenBalance
+    assert shape_shift_router.balance() == 0
+
+    # Value over the deposit limit is refunded
+    vault.setDepositLimit(15000, {"from": gov})
+    balance = rando.balance()
+    tx = shape_shift_router.depositETH(rando, {"from": rando, "value": 10000})
+    assert vault.balanceOf(rando) == 15000
+    assert rando.balance() == balance - 5000 - tx.gas_used * tx.gas_price
+    assert weth.balanceOf(shape_shift_router) == routerTokenBalance
+    assert shape_shift_router.balance() == 0
+
+    # Nothing fits once the vault is at its limit
+    with brownie.reverts("deposit limit reached"):
+        shape_shift_router.depositETH(rando, {"from": rando, "value": 10000})
+
+
+def test_withdraw_eth(weth, release_vaults, shape_shift_router, gov, rando, rando2):
+    vaults = release_vaults(weth, 2)
+    weth.deposit({"from": rando, "value": 10000})
+    weth.approve(shape_shift_router, 10000, {"from": rando})
+    shape_shift_router.deposit(weth, rando, 10000, 0, {"from": rando})
+    shape_shift_router.depositETH(rando, {"from": rando, "value": 10000})
+    for vault in vaults:
+        vault.approve(shape_shift_router, 2 ** 256 - 1, {"from": rando})
+
+    weth.deposit({"from": gov, "value": 10000})
+    weth.transfer(shape_shift_router, 10000, {"from": gov})
+    routerTokenBalance = weth.balanceOf(shape_shift_router)
+
+    balance = rando2.balance()
+    tx = shape_shift_router.withdrawETH(rando2, 15000, {"from": rando})
+    assert tx.return_value == 15000
+    assert rando2.balance() == balance + 15000
+    assert weth.balanceOf(shape_shift_router) == routerTokenBalance
+    assert shape_shift_router.balance() == 0
+
+    shape_shift_router.withdrawETH(rando2, 2 ** 256 - 1, {"from": rando})
+    assert rando2.balance() == balance + 20000
+    assert weth.balanceOf(shape_shift_router) == routerTokenBalance
+
+
+def test_rejects_direct_eth(shape_shift_router, rando):
+    with brownie.reverts("not weth"):
+        rando.transfer(shape_shift_router, 10000)
@@ -0,0 +1,102 @@
+import brownie
+import pytest
+
+AMOUNT = 10000
+
+
+def deposit_into_vaults(token, vaults, gov, account):
+    for vault in vaults:
+        token.transfer(account, AMOUNT, {"from": gov})
+        token.approve(vault, AMOUNT, {"from": account})
+        vault.deposit(AMOUNT, {"from": account})
+
+
+def test_sync_vaults(token, release_vaults, shape_shift_router, rando):
+    vaults = release_vaults(token, 3)
+    assert shape_shift_router.numCachedVaults(token) == 0
+
+    tx = shape_shift_router.syncVaults(token, {"from": rando})
+    assert tx.return_value == 3
+    assert shape_shift_router.numCachedVaults(token) == 3
+
+    # Syncing again only appends what is new, which is nothing
+    tx = shape_shift_router.syncVaults(token, {"from": rando})
+    assert tx.return_value == 0
+    assert shape_shift_router.numCachedVaults(token) == 3
+
+    for i, vault in enumerate(vaults):
+        assert shape_shift_router.vaults(token, i) == vault
+
+
+def test_stale_cache_falls_back_to_registry(
+    token, registry, create_vault, shape_shift_router, gov, rando
+):
+    vault1 = create_vault(releaseDelta=1, token=token)
+    registry.newRelease(vault1, {"from": gov})
+    registry.endorseVault(vault1, {"from": gov})
+    shape_shift_router.syncVaults(token, {"from": rando})
+
+    vault2 = create_vault(releaseDelta=0, token=token)
+    registry.newRelease(vault2, {"from": gov})
+    registry.endorseVault(vault2, {"from": gov})
+    assert shape_shift_router.numCachedVaults(token) == 1
+
+    deposit_into_vaults(token, [vault1, vault2], gov, rando)
+    assert shape_shift_router.totalVaultBalance(token, rando) == 2 * AMOUNT
+    assert shape_shift_router.totalAssets(token) == 2 * AMOUNT
+
+    vault1.approve(shape_shift_router, AMOUNT, {"from": rando})
+    vault2.approve(shape_shift_router, AMOUNT, {"from": rando})
+    shape_shift_router.withdraw(token, rando, {"from": rando})
+
+    assert token.balanceOf(rando) == 2 * AMOUNT
+    assert vault1.balanceOf(rando) == vault2.balanceOf(rando) == 0
+
+
+def test_set_registry_uses_new_cache(
+    token, release_vaults, shape_shift_router, new_registry, affiliate, rando
+):
+    release_vaults(token, 2)
+    shape_shift_router.syncVaults(token, {"from": rando})
+    assert shape_shift_router.numCachedVaults(token) == 2
+
+    shape_shift_router.setRegistry(new_registry, {"from": affiliate})
+    assert shape_shift_router.numCachedVaults(token) == 0
+
+
+@pytest.mark.parametrize("numVaults", [2, 5])
+def test_synced_withdraw_uses_less_gas(
+    token,
+    release_vaults,
+    shape_shift_router,
+    affiliate,
+    registry,
+    ShapeShiftDAORouter,
+    weth,
+    gov,
+    rando,
+    rando2,
+    numVaults,
+):
+    vaults = release_vaults(token, numVaults)
+    synced_router = affiliate.deploy(ShapeShiftDAORouter, registry, weth)
+    synced_router.syncVaults(token, {"from": rando})
+
+    deposit_into_vaults(token, vaults, gov, rando)
+    deposit_into_vaults(token, vaults, gov, rando2)
+    for vault in vaults:
+        vault.approve(shape_shift_router, AMOUNT, {"from": rando})
+        vault.approve(synced_router, AMOUNT, {"from": rando2})
+
+    # Leave a little in the last vault so every vault takes the `decimals`/`pricePerShare` path
+    amount = numVaults * AMOUNT - AMOUNT // 2
+    live_tx = shape_shift_router.withdraw(token, rando, amount, {"from": rando})
+    cached_tx = synced_router.withdraw(token, rando2, amount, {"from": rando2})
+
+    assert token.balanceOf(rando) == token.balanceOf(rando2) == amount
+    # Each cached vault skips a `registry.vaults` and a `vault.decimals` call
+    assert cached_tx.gas_used < live_tx.gas_used
+    print(
+        f"{numVaults} vaults: {live_tx.gas_used} gas live, {cached_tx.gas_used} gas cached, "
+        f"{(live_tx.gas_used - cached_tx.gas_used) // numVaults} gas saved per vault"
+    )
@@ -0,0 +1,28 @@
+"""
+Brownie-free tooling for reading from and operating the ShapeShift DAO Yearn router.
+
+Submodules are imported on first use so that ``import yearn_router`` stays cheap.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "AsyncRouterClient": "client",
+    "ForkProxy": "forkproxy",
+    "IntentRelayer": "relayer",
+    "MetadataCache": "cache",
+    "MigrationService": "migrator",
+    "PositionIndexer": "indexer",
+    "RouterClient": "client",
+    "RPCError": "client",
+    "load_deployment": "client",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f"{__name__}.{_EXPORTS[name]}")
+    return getattr(module, name)
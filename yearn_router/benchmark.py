@@ -0,0 +1,70 @@
+"""
+Benchmarks `RouterClient` start-up time and batched read throughput against a JSON-RPC node.
+
+    python -m yearn_router.benchmark http://127.0.0.1:8545 --router 0x... --token 0x... --accounts 0x... 0x...
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+
+STARTUP_SNIPPET = "import yearn_router; yearn_router.RouterClient"
+
+
+def measure_startup(runs=5):
+    """Returns the best wall-clock time, in seconds, to import the client in a fresh interpreter."""
+    baseline = min(_time_subprocess("pass") for _ in range(runs))
+    return min(_time_subprocess(STARTUP_SNIPPET) for _ in range(runs)) - baseline
+
+
+def _time_subprocess(code):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True)
+    return time.perf_counter() - start
+
+
+def measure_reads(client, calls, rounds=5):
+    """Returns the number of router reads per second when sending `calls` as batches."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        client.call_many(calls)
+    return rounds * len(calls) / (time.perf_counter() - start)
+
+
+async def measure_async_reads(client, calls, rounds=5):
+    start = time.perf_counter()
+    await asyncio.gather(*(client.call_many(calls) for _ in range(rounds)))
+    return rounds * len(calls) / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    from yearn_router.client import AsyncRouterClient, RouterClient
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("rpc_url")
+    parser.add_argument(
+        "--router", help="router address; defaults to the mainnet deployment"
+    )
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--accounts", nargs="+", required=True)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"startup: {measure_startup() * 1000:.1f} ms")
+
+    calls = [("totalVaultBalance", (args.token, account)) for account in args.accounts]
+    for batch_size in [1, 10, 100]:
+        with RouterClient(args.rpc_url, args.router, batch_size=batch_size) as client:
+            rate = measure_reads(client, calls, args.rounds)
+        print(f"sync, batches of {batch_size:>3}: {rate:,.0f} reads/s")
+
+    client = AsyncRouterClient(args.rpc_url, address=args.router)
+    rate = asyncio.run(measure_async_reads(client, calls, args.rounds))
+    client.close()
+    print(f"async, concurrent batches: {rate:,.0f} reads/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Block-aware cache of registry and vault metadata, with an in-memory LRU and an optional SQLite store.
+
+Immutable reads (the vault at a registry id, a vault's decimals) are cached forever, and persisted when a path is
+given. Mutable reads (``numVaults``, ``latestVault``, ``pricePerShare``) are cached with the block they were read
+at. They stay valid for later blocks until ``advance`` sees a registry ``NewVault``/``NewRelease`` or a vault
+``StrategyReported`` log that changes them.
+
+``pricePerShare`` also drifts between reports as locked profit unlocks, so by default it is only reused at the
+block it was read at; raise ``price_ttl`` to accept a price up to that many blocks old.
+
+Persisted reads are keyed by chain id and registry, so one file can be shared between chains and registries. A fork
+reports the chain id of the chain it forks, so give it its own ``scope`` to keep its reads apart.
+"""
+
+import sqlite3
+from collections import OrderedDict, defaultdict
+
+from yearn_router.client import HTTPTransport
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    scope TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (scope, kind, key)
+);
+"""
+
+# Reads that never change once they have been made
+IMMUTABLE = {"vaults", "decimals"}
+ADDRESS_READS = {"vaults", "latestVault"}
+
+REGISTRY_EVENTS = [
+    "NewVault(address,uint256,address,string)",
+    "NewRelease(uint256,address,string)",
+]
+VAULT_EVENTS = [
+    # StrategyReported of API versions 0.3.x and 0.4.x
+    "StrategyReported(address,uint256,uint256,uint256,uint256,uint256,uint256,uint256)",
+    "StrategyReported(address,uint256,uint256,uint256,uint256,uint256,uint256,uint256,uint256)",
+]
+
+SIGNATURES = {
+    "numVaults": "numVaults(address)",
+    "vaults": "vaults(address,uint256)",
+    "latestVault": "latestVault(address)",
+    "decimals": "decimals()",
+    "pricePerShare": "pricePerShare()",
+}
+
+
+def _keccak_hex(text):
+    from eth_utils import keccak
+
+    return "0x" + keccak(text=text).hex()
+
+
+def _word(value):
+    if isinstance(value, str):
+        value = int(value, 16)
+    return f"{value:064x}"
+
+
+def _address(word):
+    return "0x" + word[-40:]
+
+
+class MetadataCache:
+    """
+    Caches the registry and vault reads that services repeat for every account.
+
+    Reads take a block number (or "latest"). `stats` counts hits and misses per read, see `hit_rate`.
+
+    `scope` is added to the chain id and registry that key the reads stored at `path`, e.g. a network name, to keep
+    a fork's reads apart from those of the chain it forks.
+    """
+
+    def __init__(
+        self,
+        rpc_url=None,
+        registry=None,
+        client=None,
+        path=None,
+        max_entries=4096,
+        price_ttl=0,
+        scope=None,
+    ):
+        self.transport = client.transport if client else HTTPTransport(rpc_url)
+        self.registry = (registry or client.call("registry")).lower()
+        self.max_entries = max_entries
+        self.price_ttl = price_ttl
+        self.stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+        # (kind, key) -> (value, first valid block, last valid block or None while still current)
+        self._entries = OrderedDict()
+        self._scanned_block = None
+        self._vaults_seen = set()
+        self._selectors = {
+            kind: _keccak_hex(signature)[:10] for kind, signature in SIGNATURES.items()
+        }
+        self._registry_topics = [_keccak_hex(event) for event in REGISTRY_EVENTS]
+        self._vault_topics = [_keccak_hex(event) for event in VAULT_EVENTS]
+
+        self.db = None
+        if path is not None:
+            (chain_id,) = self._rpc([("eth_chainId", [])])
+            self.scope = ":".join(
+                [str(int(chain_id, 16)), self.registry] + ([scope] if scope else [])
+            )
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.executescript(SCHEMA)
+
+    def num_vaults(self, token, block="latest"):
+        return self._read("numVaults", self.registry, (token,), block)
+
+    def vault(self, token, vault_id):
+        return self._read("vaults", self.registry, (token, vault_id), "latest")
+
+    def vaults(self, token, block="latest"):
+        """Returns every endorsed vault of `token`, in vault id order."""
+        return [self.vault(token, i) for i in range(self.num_vaults(token, block))]
+
+    def latest_vault(self, token, block="latest"):
+        return self._read("latestVault", self.registry, (token,), block)
+
+    def decimals(self, vault):
+        return self._read("decimals", vault, (), "latest")
+
+    def price_per_share(self, vault, block="latest"):
+        return self._read("pricePerShare", vault, (), block)
+
+    def hit_rate(self, kind=None):
+        """Fraction of reads (of `kind`, or of any kind) served from the cache."""
+        stats = [self.stats[kind]] if kind else list(self.stats.values())
+        hits = sum(s["hits"] for s in stats)
+        total = hits + sum(s["misses"] for s in stats)
+        return hits / total if total else 0.0
+
+    def advance(self, block="latest"):
+        """
+        Scans the registry and every vault read so far for changes up to `block`, invalidating what they change.
+
+        Reads call this themselves when they ask for a block past the last one scanned.
+        """
+        block = self._block_number(block)
+        if self._scanned_block is None:
+            # Nothing was cached before now, so there is nothing to invalidate
+            self._scanned_block = block
+            return block
+        if block <= self._scanned_block:
+            return self._scanned_block
+
+        from_block = hex(self._scanned_block + 1)
+        requests = [
+            (
+                "eth_getLogs",
+                [
+                    {
+                        "address": self.registry,
+                        "topics": [self._registry_topics],
+                        "fromBlock": from_block,
+                        "toBlock": hex(block),
+                    }
+                ],
+            )
+        ]
+        if self._vaults_seen:
+            requests.append(
+                (
+                    "eth_getLogs",
+                    [
+                        {
+                            "address": sorted(self._vaults_seen),
+                            "topics": [self._vault_topics],
+                            "fromBlock": from_block,
+                            "toBlock": hex(block),
+                        }
+                    ],
+                )
+            )
+
+        for logs in self._rpc(requests):
+            for log in logs:
+                self._invalidate(log)
+        self._scanned_block = block
+        return block
+
+    def _invalidate(self, log):
+        changed_at = int(log["blockNumber"], 16)
+        if log["address"].lower() == self.registry:
+            if log["topics"][0] == self._registry_topics[0]:
+                # NewVault is indexed by token
+                token = _address(log["topics"][1])
+                stale = [("numVaults", token), ("latestVault", token)]
+            else:
+                stale = [
+                    key
+                    for key in self._entries
+                    if key[0] in ("numVaults", "latestVault")
+                ]
+        else:
+            stale = [("pricePerShare", log["address"].lower())]
+
+        for key in stale:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            value, first_block, last_block = entry
+            if first_block >= changed_at:
+                continue
+            if last_block is None or last_block >= changed_at:
+                self._entries[key] = (value, first_block, changed_at - 1)
+
+    def _read(self, kind, address, args, block):
+        address = address.lower()
+        if args:
+            key = (kind, ":".join(str(arg).lower() for arg in args))
+        else:
+            key = (kind, address)
+            self._vaults_seen.add(address)
+
+        if kind in IMMUTABLE:
+            block_number = "latest"
+            value = self._get_immutable(key)
+        else:
+            block_number = self._block_number(block)
+            if self._scanned_block is None or block_number > self._scanned_block:
+                self.advance(block_number)
+            value = self._get_mutable(key, block_number)
+        if value is not None:
+            self.stats[kind]["hits"] += 1
+            return value
+
+        self.stats[kind]["misses"] += 1
+        data = self._selectors[kind] + "".join(_word(arg) for arg in args)
+        if block_number != "latest":
+            block_number = hex(block_number)
+        (result,) = self._rpc(
+            [("eth_call", [{"to": address, "data": data}, block_number])]
+        )
+        value = _address(result) if kind in ADDRESS_READS else int(result, 16)
+
+        if kind in IMMUTABLE:
+            # A vault id past the end reads as the zero address until that vault is endorsed
+            if kind != "vaults" or int(value, 16):
+                self._put_immutable(key, value)
+        else:
+            block_number = int(block_number, 16)
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= block_number:
+                # Only a read at the last scanned block is known to hold until the next change
+                current = block_number == self._scanned_block
+                self._put(key, (value, block_number, None if current else block_number))
+        return value
+
+    def _get_mutable(self, key, block):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, first_block, last_block = entry
+        if block < first_block or (last_block is not None and block > last_block):
+            return None
+        if key[0] == "pricePerShare" and block - first_block > self.price_ttl:
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _get_immutable(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry[0]
+        if self.db is None:
+            return None
+        row = self.db.execute(
+            "SELECT value FROM metadata WHERE scope = ? AND kind = ? AND key = ?",
+            (self.scope, *key),
+        ).fetchone()
+        if row is None:
+            return None
+        value = row[0] if key[0] == "vaults" else int(row[0])
+        self._put(key, (value, 0, None))
+        return value
+
+    def _put_immutable(self, key, value):
+        self._put(key, (value, 0, None))
+        if self.db is not None:
+            with self.db:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)",
+                    (self.scope, *key, str(value)),
+                )
+
+    def _put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _block_number(self, block):
+        if block == "latest":
+            (head,) = self._rpc([("eth_blockNumber", [])])
+            return int(head, 16)
+        return int(block)
+
+    def _rpc(self, requests):
+        return self.transport.batch(requests)
+
+    def close(self):
+        self.transport.close()
+        if self.db is not None:
+            self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
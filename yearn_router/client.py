@@ -0,0 +1,371 @@
+"""
+JSON-RPC client for the router's views that batches many reads into a single HTTP request.
+
+Only the standard library is imported up front; ``eth_abi``/``eth_utils`` are loaded on the first encode.
+"""
+
+import asyncio
+import http.client
+import itertools
+import json
+import queue
+from functools import partial
+from pathlib import Path
+from urllib.parse import urlsplit
+
+DEPLOYMENT_DIR = Path(__file__).resolve().parent.parent / "deployment"
+BUILD_DIR = DEPLOYMENT_DIR.parent / "build" / "contracts"
+
+# Gas limit of each page of a paginated view, and the gas each page keeps back to return its result
+PAGE_GAS = 10_000_000
+PAGE_MIN_GAS_LEFT = 100_000
+
+
+class RPCError(Exception):
+    def __init__(self, error):
+        super().__init__(error.get("message", error))
+        self.code = error.get("code")
+        self.data = error.get("data")
+
+
+def load_deployment(chain_id=1):
+    """
+    Returns the router ABI and the address of its latest deployment on `chain_id`, if any.
+
+    The ABI is that of the compiled sources (`brownie compile`) when there is a build, as the artifact of the
+    mainnet deployment predates views such as `totalAssetsPaginated` and `vaultInfos`.
+    """
+    abi_path = BUILD_DIR / "ShapeShiftDAORouter.json"
+    if not abi_path.exists():
+        abi_path = DEPLOYMENT_DIR / "ShapeShiftDAORouter.json"
+    abi = json.loads(abi_path.read_text())["abi"]
+    deployments = json.loads((DEPLOYMENT_DIR / "map.json").read_text())
+    addresses = deployments.get(str(chain_id), {}).get("ShapeShiftDAORouter", [])
+    return abi, addresses[-1] if addresses else None
+
+
+class HTTPTransport:
+    """
+    Sends JSON-RPC batches over a pool of persistent HTTP connections.
+    """
+
+    def __init__(self, url, pool_size=4, timeout=30):
+        parts = urlsplit(url)
+        self._connection_class = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self._host = parts.netloc
+        self._path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self._timeout = timeout
+        self._pool = queue.LifoQueue()
+        for _ in range(pool_size):
+            self._pool.put(None)
+        self._ids = itertools.count()
+
+    def batch(self, requests):
+        """
+        Sends `(method, params)` requests as one JSON-RPC batch and returns their results in order.
+
+        Raises `RPCError` for the first request that failed.
+        """
+        if not requests:
+            return []
+
+        ids = [next(self._ids) for _ in requests]
+        payload = [
+            {"jsonrpc": "2.0", "id": id_, "method": method, "params": params}
+            for id_, (method, params) in zip(ids, requests)
+        ]
+        responses = self._post(payload)
+        if isinstance(responses, dict):
+            # Nodes answer a batch they reject outright with a single error object
+            raise RPCError(responses.get("error", responses))
+
+        by_id = {response["id"]: response for response in responses}
+        results = []
+        for id_ in ids:
+            response = by_id[id_]
+            if "error" in response:
+                raise RPCError(response["error"])
+            results.append(response["result"])
+        return results
+
+    def _post(self, payload):
+        body = json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json"}
+        connection = self._pool.get()
+        try:
+            # Retry once on a fresh connection if the server closed the pooled one
+            for attempt in range(2):
+                if connection is None:
+                    connection = self._connection_class(
+                        self._host, timeout=self._timeout
+                    )
+                try:
+                    connection.request("POST", self._path, body, headers)
+                    response = connection.getresponse()
+                    data = response.read()
+                    break
+                except (http.client.HTTPException, ConnectionError):
+                    connection.close()
+                    connection = None
+                    if attempt:
+                        raise
+            if response.status != 200:
+                raise RPCError({"code": response.status, "message": data.decode()})
+            return json.loads(data)
+        finally:
+            self._pool.put(connection)
+
+    def close(self):
+        while not self._pool.empty():
+            connection = self._pool.get_nowait()
+            if connection is not None:
+                connection.close()
+
+
+class RouterClient:
+    """
+    Reads the router's views, grouping many calls into single JSON-RPC batch requests.
+
+    Calls are `(name, args)` pairs, e.g. `("totalVaultBalance", (token, account))`; overloads are
+    picked by the number of arguments.
+    """
+
+    def __init__(
+        self,
+        rpc_url,
+        address=None,
+        abi=None,
+        chain_id=1,
+        batch_size=100,
+        pool_size=4,
+        timeout=30,
+    ):
+        deployed_abi, deployed_address = load_deployment(chain_id)
+        self.address = address or deployed_address
+        if self.address is None:
+            raise ValueError(f"no router deployment on chain {chain_id}")
+        self.batch_size = batch_size
+        self.transport = HTTPTransport(rpc_url, pool_size=pool_size, timeout=timeout)
+        self._functions = {}
+        for fn in abi or deployed_abi:
+            if fn["type"] == "function":
+                self._functions[(fn["name"], len(fn["inputs"]))] = fn
+        self._codecs = {}
+
+    def call(self, name, *args, block="latest", gas=None):
+        return self.call_many([(name, args)], block=block, gas=gas)[0]
+
+    def call_many(self, calls, block="latest", gas=None):
+        """
+        Executes `(name, args)` view calls with as few JSON-RPC requests as possible.
+
+        Returns the decoded results in order; single-output functions return a bare value.
+        `gas` limits each call, instead of the node's own gas cap.
+        """
+        calls = list(calls)
+        results = []
+        for start in range(0, len(calls), self.batch_size):
+            results += self._call_batch(
+                calls[start : start + self.batch_size], block, gas
+            )
+        return results
+
+    def _call_batch(self, calls, block, gas=None):
+        codecs = [self._codec(name, len(args)) for name, args in calls]
+        tx = {"to": self.address}
+        if gas is not None:
+            tx["gas"] = hex(gas)
+        requests = [
+            ("eth_call", [{**tx, "data": encode(args)}, block])
+            for (_, args), (encode, _) in zip(calls, codecs)
+        ]
+        return [
+            decode(result)
+            for result, (_, decode) in zip(self.transport.batch(requests), codecs)
+        ]
+
+    def _codec(self, name, num_args):
+        key = (name, num_args)
+        if key not in self._codecs:
+            try:
+                fn = self._functions[key]
+            except KeyError:
+                raise ValueError(
+                    f"router ABI has no function {name} taking {num_args} arguments; "
+                    "pass the `abi` of a router build that has it, or run `brownie compile`"
+                )
+            self._codecs[key] = _make_codec(fn)
+        return self._codecs[key]
+
+    def num_vaults(self, token, block="latest"):
+        return self.call("numVaults", token, block=block)
+
+    def vaults(self, token, num_vaults=None, block="latest"):
+        """Returns every vault of `token`, in vault id order."""
+        if num_vaults is None:
+            num_vaults = self.num_vaults(token, block=block)
+        return self.call_many(
+            [("vaults", (token, i)) for i in range(num_vaults)], block=block
+        )
+
+    def total_vault_balances(self, pairs, block="latest"):
+        """Returns `totalVaultBalance(token, account)` for every `(token, account)` pair."""
+        return self.call_many(
+            [("totalVaultBalance", (token, account)) for token, account in pairs],
+            block=block,
+        )
+
+    def vault_infos(self, tokens, block="latest"):
+        """
+        Returns `vaultInfos(token)` of every token with a single batch request.
+
+        Each token's metadata is a dict of parallel lists, keyed by the `VaultInfos` field names.
+        """
+        self._codec("vaultInfos", 1)
+        outputs = self._functions[("vaultInfos", 1)]["outputs"][0]["components"]
+        fields = [field["name"] for field in outputs]
+        return [
+            dict(zip(fields, infos))
+            for infos in self.call_many(
+                [("vaultInfos", (token,)) for token in tokens], block=block
+            )
+        ]
+
+    def paginate(
+        self, name, *args, gas=PAGE_GAS, min_gas_left=PAGE_MIN_GAS_LEFT, block="latest"
+    ):
+        """
+        Drives a gas-bounded `*Paginated(token, ..., firstVaultId, minGasLeft)` view to completion.
+
+        Each page is a separate `eth_call` limited to `gas`, so large aggregations never hit the node's gas cap.
+        `args` start with the token. Every page reads the same block; returns the sum of the partial results.
+        """
+        if block == "latest":
+            (block,) = self.transport.batch([("eth_blockNumber", [])])
+        num_vaults = self.num_vaults(args[0], block=block)
+
+        total, next_vault_id = 0, 0
+        while next_vault_id < num_vaults:
+            partial_sum, next_vault_id = self.call(
+                name, *args, next_vault_id, min_gas_left, block=block, gas=gas
+            )
+            total += partial_sum
+        return total
+
+    def total_assets(self, token, **kwargs):
+        """Returns `totalAssets(token)`, paginated with `totalAssetsPaginated`."""
+        return self.paginate("totalAssetsPaginated", token, **kwargs)
+
+    def total_vault_balance(self, token, account, **kwargs):
+        """Returns `totalVaultBalance(token, account)`, paginated with `totalVaultBalancePaginated`."""
+        return self.paginate("totalVaultBalancePaginated", token, account, **kwargs)
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncRouterClient:
+    """
+    asyncio interface to `RouterClient`.
+
+    Batches run on the default executor, so concurrent awaits use separate pooled connections.
+    """
+
+    def __init__(self, rpc_url, **kwargs):
+        self._client = RouterClient(rpc_url, **kwargs)
+        self.address = self._client.address
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(fn, *args, **kwargs))
+
+    async def call(self, name, *args, block="latest", gas=None):
+        return await self._run(self._client.call, name, *args, block=block, gas=gas)
+
+    async def call_many(self, calls, block="latest", gas=None):
+        calls = list(calls)
+        batch_size = self._client.batch_size
+        batches = await asyncio.gather(
+            *(
+                self._run(
+                    self._client._call_batch,
+                    calls[start : start + batch_size],
+                    block,
+                    gas,
+                )
+                for start in range(0, len(calls), batch_size)
+            )
+        )
+        return [result for batch in batches for result in batch]
+
+    async def num_vaults(self, token, block="latest"):
+        return await self.call("numVaults", token, block=block)
+
+    async def vaults(self, token, num_vaults=None, block="latest"):
+        if num_vaults is None:
+            num_vaults = await self.num_vaults(token, block=block)
+        return await self.call_many(
+            [("vaults", (token, i)) for i in range(num_vaults)], block=block
+        )
+
+    async def total_vault_balances(self, pairs, block="latest"):
+        return await self.call_many(
+            [("totalVaultBalance", (token, account)) for token, account in pairs],
+            block=block,
+        )
+
+    async def total_assets(self, token, **kwargs):
+        return await self._run(self._client.total_assets, token, **kwargs)
+
+    async def total_vault_balance(self, token, account, **kwargs):
+        return await self._run(
+            self._client.total_vault_balance, token, account, **kwargs
+        )
+
+    def close(self):
+        self._client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+def _abi_type(param):
+    if param["type"].startswith("tuple"):
+        components = ",".join(_abi_type(component) for component in param["components"])
+        return f"({components}){param['type'][len('tuple'):]}"
+    return param["type"]
+
+
+def _make_codec(fn):
+    import eth_abi
+    from eth_utils import function_abi_to_4byte_selector
+
+    # eth-abi renamed `encode_abi`/`decode_abi` to `encode`/`decode` in v4
+    encode_abi = getattr(eth_abi, "encode", None) or eth_abi.encode_abi
+    decode_abi = getattr(eth_abi, "decode", None) or eth_abi.decode_abi
+
+    selector = "0x" + function_abi_to_4byte_selector(fn).hex()
+    input_types = [_abi_type(param) for param in fn["inputs"]]
+    output_types = [_abi_type(param) for param in fn["outputs"]]
+
+    def encode(args):
+        return selector + encode_abi(input_types, list(args)).hex()
+
+    def decode(data):
+        values = decode_abi(output_types, bytes.fromhex(data[2:]))
+        return values[0] if len(values) == 1 else values
+
+    return encode, decode
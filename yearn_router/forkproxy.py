@@ -0,0 +1,162 @@
+"""
+JSON-RPC proxy that records what a forking node reads from its upstream, and replays it offline.
+
+Point a forking node (e.g. `ganache-cli --fork http://127.0.0.1:8546`) at the proxy. In `record` mode the proxy
+forwards requests to the real upstream and saves every response to a snapshot file. In `replay` mode it answers
+from that file only, so the same tests run without network access. The fork block is pinned by answering
+`eth_blockNumber` with the snapshot's block.
+
+    python -m yearn_router.forkproxy record tests/snapshots/live_vault.json --upstream https://... -- brownie test ...
+    python -m yearn_router.forkproxy replay tests/snapshots/live_vault.json -- brownie test ...
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Number of blocks behind the upstream head to fork from when recording, so the fork block is final
+FORK_DEPTH = 16
+
+
+def _key(request):
+    return json.dumps([request["method"], request.get("params", [])], sort_keys=True)
+
+
+class ForkProxy:
+    def __init__(self, snapshot_path, upstream=None, fork_block=None):
+        self.snapshot_path = Path(snapshot_path)
+        self.upstream = upstream
+        self._lock = threading.Lock()
+
+        if upstream is None:
+            snapshot = json.loads(self.snapshot_path.read_text())
+            self.fork_block = snapshot["fork_block"]
+            self.responses = snapshot["responses"]
+        else:
+            if fork_block is None:
+                head = self._forward({"method": "eth_blockNumber", "params": []})
+                fork_block = int(head["result"], 16) - FORK_DEPTH
+            self.fork_block = fork_block
+            self.responses = {}
+
+    @property
+    def recording(self):
+        return self.upstream is not None
+
+    def _forward(self, request):
+        payload = {"jsonrpc": "2.0", "id": 0, **request}
+        http_request = urllib.request.Request(
+            self.upstream,
+            json.dumps(payload).encode(),
+            {"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(http_request) as response:
+            response = json.loads(response.read())
+        response.pop("id", None)
+        response.pop("jsonrpc", None)
+        return response
+
+    def handle(self, request):
+        if request["method"] == "eth_blockNumber":
+            response = {"result": hex(self.fork_block)}
+        else:
+            key = _key(request)
+            with self._lock:
+                response = self.responses.get(key)
+            if response is None:
+                if not self.recording:
+                    response = {
+                        "error": {
+                            "code": -32000,
+                            "message": f"not in snapshot {self.snapshot_path}: {key}",
+                        }
+                    }
+                else:
+                    response = self._forward(request)
+                    with self._lock:
+                        self.responses[key] = response
+        return {"jsonrpc": "2.0", "id": request.get("id"), **response}
+
+    def save(self):
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        snapshot = {"fork_block": self.fork_block, "responses": self.responses}
+        self.snapshot_path.write_text(
+            json.dumps(snapshot, indent=1, sort_keys=True) + "\n"
+        )
+
+    def serve(self, host="127.0.0.1", port=8546):
+        """Starts serving in a background thread and returns the server."""
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if isinstance(body, list):
+                    response = [proxy.handle(request) for request in body]
+                else:
+                    response = proxy.handle(body)
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("snapshot")
+    parser.add_argument("--upstream", help="upstream JSON-RPC URL to record from")
+    parser.add_argument("--block", type=int, help="block to fork from when recording")
+    parser.add_argument("--port", type=int, default=8546)
+    parser.add_argument(
+        "command", nargs=argparse.REMAINDER, help="command to run against the proxy"
+    )
+    args = parser.parse_args(argv)
+
+    if args.mode == "record" and not args.upstream:
+        parser.error("record needs --upstream")
+    proxy = ForkProxy(
+        args.snapshot,
+        upstream=args.upstream if args.mode == "record" else None,
+        fork_block=args.block,
+    )
+    server = proxy.serve(port=args.port)
+
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    returncode = 0
+    try:
+        if command:
+            returncode = subprocess.run(command).returncode
+        else:
+            print(
+                f"Serving block {proxy.fork_block} on port {server.server_address[1]}, Ctrl-C to stop"
+            )
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        if proxy.recording:
+            proxy.save()
+            print(
+                f"Recorded {len(proxy.responses)} responses at block {proxy.fork_block} to {args.snapshot}"
+            )
+    sys.exit(returncode)
+
+
+if __name__ == "__main__":
+    main()
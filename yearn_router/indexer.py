@@ -0,0 +1,314 @@
+"""
+Indexes vault share balances from `Transfer` logs into SQLite, so that balance queries are local lookups.
+
+Only blocks at least `confirmations` deep are indexed, and every vault's checkpoint records the hash of the
+block it was indexed up to. If a checkpoint's block is no longer canonical on resume, the vault's transfers are
+unwound back to `reorg_depth` blocks before it and re-indexed.
+"""
+
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from yearn_router.client import RouterClient
+
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+ZERO_ADDRESS = "0x" + "00" * 20
+
+DECIMALS_SELECTOR = "0x313ce567"  # decimals()
+PRICE_PER_SHARE_SELECTOR = "0x99530b06"  # pricePerShare()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vaults (
+    address TEXT PRIMARY KEY,
+    token TEXT NOT NULL,
+    vault_id INTEGER NOT NULL,
+    decimals INTEGER NOT NULL,
+    price_per_share TEXT,
+    checkpoint_block INTEGER NOT NULL,
+    checkpoint_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS transfers (
+    vault TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    sender TEXT NOT NULL,
+    receiver TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (vault, block_number, log_index)
+);
+CREATE TABLE IF NOT EXISTS balances (
+    vault TEXT NOT NULL,
+    account TEXT NOT NULL,
+    shares TEXT NOT NULL,
+    PRIMARY KEY (vault, account)
+);
+"""
+
+
+def _topic_address(topic):
+    return "0x" + topic[-40:]
+
+
+class PositionIndexer:
+    """
+    Keeps per-account vault share balances for every vault of `tokens` in a SQLite database.
+
+    Addresses are stored lower-cased. Share balances are stored as decimal strings, as they don't fit in
+    SQLite integers.
+    """
+
+    def __init__(
+        self,
+        db_path,
+        rpc_url=None,
+        tokens=(),
+        client=None,
+        start_block=0,
+        chunk_size=2000,
+        confirmations=12,
+        reorg_depth=64,
+        workers=4,
+    ):
+        self.client = client or RouterClient(rpc_url, pool_size=workers)
+        self.tokens = [token.lower() for token in tokens]
+        self.start_block = start_block
+        self.chunk_size = chunk_size
+        self.confirmations = confirmations
+        self.reorg_depth = reorg_depth
+        self.workers = workers
+
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+
+    def _rpc(self, requests):
+        return self.client.transport.batch(requests)
+
+    def sync(self, to_block=None):
+        """
+        Indexes every vault of the tracked tokens up to `to_block` (by default the latest confirmed block).
+
+        Returns the block indexed up to. Safe to call repeatedly and across restarts.
+        """
+        if to_block is None:
+            (head,) = self._rpc([("eth_blockNumber", [])])
+            to_block = int(head, 16) - self.confirmations
+
+        self._unwind_reorgs()
+        self._discover_vaults()
+
+        checkpoints = {}
+        for address, checkpoint in self.db.execute(
+            "SELECT address, checkpoint_block FROM vaults"
+        ):
+            checkpoints.setdefault(checkpoint, []).append(address)
+
+        for checkpoint, vaults in sorted(checkpoints.items()):
+            self._index(vaults, checkpoint + 1, to_block)
+
+        return to_block
+
+    def _discover_vaults(self):
+        for token in self.tokens:
+            (known,) = self.db.execute(
+                "SELECT COUNT(*) FROM vaults WHERE token = ?", (token,)
+            ).fetchone()
+            numVaults = self.client.num_vaults(token)
+            if numVaults == known:
+                continue
+
+            vaults = [
+                vault.lower()
+                for vault in self.client.call_many(
+                    [("vaults", (token, i)) for i in range(known, numVaults)]
+                )
+            ]
+            decimals = self._rpc(
+                [
+                    ("eth_call", [{"to": vault, "data": DECIMALS_SELECTOR}, "latest"])
+                    for vault in vaults
+                ]
+            )
+            with self.db:
+                self.db.executemany(
+                    "INSERT INTO vaults (address, token, vault_id, decimals, checkpoint_block) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            vault,
+                            token,
+                            known + i,
+                            int(decimal, 16),
+                            self.start_block - 1,
+                        )
+                        for i, (vault, decimal) in enumerate(zip(vaults, decimals))
+                    ],
+                )
+
+    def _index(self, vaults, from_block, to_block):
+        chunks = [
+            (start, min(start + self.chunk_size - 1, to_block))
+            for start in range(from_block, to_block + 1, self.chunk_size)
+        ]
+
+        def fetch(chunk):
+            start, end = chunk
+            logs, block = self._rpc(
+                [
+                    (
+                        "eth_getLogs",
+                        [
+                            {
+                                "address": vaults,
+                                "topics": [TRANSFER_TOPIC],
+                                "fromBlock": hex(start),
+                                "toBlock": hex(end),
+                            }
+                        ],
+                    ),
+                    ("eth_getBlockByNumber", [hex(end), False]),
+                ]
+            )
+            return end, block["hash"], logs
+
+        # Fetch chunks concurrently, but apply them in block order so that checkpoints only move forwards
+        with ThreadPoolExecutor(self.workers) as executor:
+            for end, block_hash, logs in executor.map(fetch, chunks):
+                with self.db:
+                    self._apply(logs)
+                    self.db.executemany(
+                        "UPDATE vaults SET checkpoint_block = ?, checkpoint_hash = ? WHERE address = ?",
+                        [(end, block_hash, vault) for vault in vaults],
+                    )
+
+    def _apply(self, logs):
+        for log in sorted(
+            logs,
+            key=lambda log: (int(log["blockNumber"], 16), int(log["logIndex"], 16)),
+        ):
+            if log.get("removed"):
+                continue
+            vault = log["address"].lower()
+            sender = _topic_address(log["topics"][1])
+            receiver = _topic_address(log["topics"][2])
+            value = int(log["data"], 16)
+
+            self.db.execute(
+                "INSERT INTO transfers VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    vault,
+                    int(log["blockNumber"], 16),
+                    int(log["logIndex"], 16),
+                    sender,
+                    receiver,
+                    str(value),
+                ),
+            )
+            self._credit(vault, sender, -value)
+            self._credit(vault, receiver, value)
+
+    def _credit(self, vault, account, delta):
+        if account == ZERO_ADDRESS or delta == 0:
+            return
+        shares = self.shares(vault, account) + delta
+        self.db.execute(
+            "INSERT OR REPLACE INTO balances VALUES (?, ?, ?)",
+            (vault, account, str(shares)),
+        )
+
+    def _unwind_reorgs(self):
+        checkpoints = self.db.execute(
+            "SELECT DISTINCT checkpoint_block, checkpoint_hash FROM vaults "
+            "WHERE checkpoint_hash IS NOT NULL"
+        ).fetchall()
+        if not checkpoints:
+            return
+
+        blocks = self._rpc(
+            [
+                ("eth_getBlockByNumber", [hex(number), False])
+                for number, _ in checkpoints
+            ]
+        )
+        for (number, block_hash), block in zip(checkpoints, blocks):
+            if block is not None and block["hash"] == block_hash:
+                continue
+            self._unwind(number, max(number - self.reorg_depth, self.start_block - 1))
+
+    def _unwind(self, checkpoint, to_block):
+        """Reverts the transfers of the vaults checkpointed at `checkpoint` past `to_block`."""
+        vaults = [
+            address
+            for (address,) in self.db.execute(
+                "SELECT address FROM vaults WHERE checkpoint_block = ?", (checkpoint,)
+            )
+        ]
+        block_hash = None
+        if to_block >= 0:
+            (block,) = self._rpc([("eth_getBlockByNumber", [hex(to_block), False])])
+            block_hash = block["hash"]
+
+        with self.db:
+            for vault in vaults:
+                transfers = self.db.execute(
+                    "SELECT sender, receiver, value FROM transfers "
+                    "WHERE vault = ? AND block_number > ? "
+                    "ORDER BY block_number DESC, log_index DESC",
+                    (vault, to_block),
+                ).fetchall()
+                for sender, receiver, value in transfers:
+                    self._credit(vault, sender, int(value))
+                    self._credit(vault, receiver, -int(value))
+                self.db.execute(
+                    "DELETE FROM transfers WHERE vault = ? AND block_number > ?",
+                    (vault, to_block),
+                )
+                self.db.execute(
+                    "UPDATE vaults SET checkpoint_block = ?, checkpoint_hash = ? WHERE address = ?",
+                    (to_block, block_hash, vault),
+                )
+
+    def refresh_prices(self, block="latest"):
+        """Caches every vault's `pricePerShare` at `block` for `balance`."""
+        vaults = [
+            address for (address,) in self.db.execute("SELECT address FROM vaults")
+        ]
+        prices = self._rpc(
+            [
+                ("eth_call", [{"to": vault, "data": PRICE_PER_SHARE_SELECTOR}, block])
+                for vault in vaults
+            ]
+        )
+        with self.db:
+            self.db.executemany(
+                "UPDATE vaults SET price_per_share = ? WHERE address = ?",
+                [(str(int(price, 16)), vault) for vault, price in zip(vaults, prices)],
+            )
+
+    def shares(self, vault, account):
+        row = self.db.execute(
+            "SELECT shares FROM balances WHERE vault = ? AND account = ?",
+            (vault.lower(), account.lower()),
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    def balance(self, token, account):
+        """
+        Value, in token base units, of the shares held by `account` across all the vaults for `token`.
+
+        Matches `ShapeShiftDAORouter.totalVaultBalance` as of the indexed block and the last `refresh_prices`.
+        """
+        balance = 0
+        for shares, price_per_share, decimals in self.db.execute(
+            "SELECT balances.shares, vaults.price_per_share, vaults.decimals "
+            "FROM balances JOIN vaults ON balances.vault = vaults.address "
+            "WHERE vaults.token = ? AND balances.account = ?",
+            (token.lower(), account.lower()),
+        ):
+            if price_per_share is None:
+                raise ValueError("call refresh_prices() before querying balances")
+            balance += int(shares) * int(price_per_share) // 10**decimals
+        return balance
+
+    def close(self):
+        self.db.close()
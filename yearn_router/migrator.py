@@ -0,0 +1,189 @@
+"""
+Watches the registry for new vaults and migrates accounts' older positions into them in batches.
+
+Every position left behind in an older vault costs its holder gas on each later ``withdraw``, which visits the vaults
+in id order. When ``numVaults`` of a tracked token grows, the service finds the accounts with shares in the older
+vaults, quotes each one with the router's ``previewMigrate`` and queues ``migrate(token, amount, firstVaultId,
+lastVaultId)`` jobs, largest first. The jobs of a token together never exceed the latest vault's ``depositLimit -
+totalAssets`` headroom, which ``_migrate`` clamps every migration to.
+
+Queued jobs are handed to a ``submit`` callback in batches of at most ``max_batch``, and only while the node's gas
+price is at most ``max_gas_price``, so migrations wait out gas spikes instead of paying for them. Given a ``sign``
+callback, each batch becomes migrate intents signed by their accounts, settled together in one ``executeIntents``
+transaction; without one, ``submit`` gets the jobs and sends them however it likes.
+"""
+
+import time
+from collections import namedtuple
+
+from yearn_router.relayer import intent_tuple
+
+MIGRATE_EVERYTHING = 2**256 - 1
+
+# A `migrate(token, amount, first_vault_id, last_vault_id)` call to make from `account`
+MigrationJob = namedtuple(
+    "MigrationJob", "token account amount first_vault_id last_vault_id"
+)
+
+
+def migration_intent(job, nonce, deadline):
+    """
+    The migrate intent `job.account` signs to have `job` executed through `executeIntents`.
+
+    Intents carry no vault id range, so the migration visits every vault older than the latest one.
+    """
+    return {
+        "kind": "migrate",
+        "account": job.account,
+        "token": job.token,
+        "recipient": job.account,
+        "amount": job.amount,
+        "nonce": nonce,
+        "deadline": deadline,
+    }
+
+
+class MigrationService:
+    """
+    Queues and submits migrations of the positions of `accounts` (or of every holder `indexer` knows of) into the
+    latest vault of each of `tokens`.
+
+    With `sign(job)`, which returns a `migration_intent` of the job and its signature by `job.account`,
+    `submit(intents, signatures, gas_price)` sends the batch as one `executeIntents` transaction. Without it,
+    `submit(jobs, gas_price)` executes a batch of `MigrationJob`s, e.g. by sending each `migrate` from the account
+    that holds its shares. Either way `submit` returns whatever the caller wants recorded in `submitted`.
+
+    Accounts must have approved the router to use their shares of the older vaults; `previewMigrate` accounts for
+    those allowances, so accounts that haven't are skipped.
+    """
+
+    def __init__(
+        self,
+        submit,
+        client,
+        tokens,
+        accounts=(),
+        indexer=None,
+        max_batch=20,
+        max_gas_price=None,
+        min_amount=1,
+        sign=None,
+    ):
+        self.submit = submit
+        self.sign = sign
+        self.client = client
+        self.tokens = [token.lower() for token in tokens]
+        self.accounts = [account.lower() for account in accounts]
+        self.indexer = indexer
+        self.max_batch = max_batch
+        self.max_gas_price = max_gas_price
+        self.min_amount = min_amount
+        self.submitted = []
+        self.pending = []
+        self._num_vaults = {}
+
+    def poll(self):
+        """Queues migrations for any new vaults, then submits a batch if gas is cheap enough; call periodically."""
+        self.scan()
+        return self.flush()
+
+    def run(self, interval=60):
+        while True:
+            self.poll()
+            time.sleep(interval)
+
+    def scan(self):
+        """
+        Queues migrations for every tracked token whose `numVaults` changed since the last scan (or for every token
+        on the first scan). Returns the tokens that changed.
+        """
+        counts = self.client.call_many(
+            [("numVaults", (token,)) for token in self.tokens]
+        )
+        changed = [
+            (token, num_vaults)
+            for token, num_vaults in zip(self.tokens, counts)
+            if self._num_vaults.get(token) != num_vaults
+        ]
+        if changed and self.indexer is not None:
+            self.indexer.sync()
+
+        for token, num_vaults in changed:
+            # Jobs queued for the previous latest vault would now leave shares behind in it
+            self.pending = [job for job in self.pending if job.token != token]
+            if num_vaults > 1:
+                self.pending += self._jobs(token, num_vaults)
+            self._num_vaults[token] = num_vaults
+        return [token for token, _ in changed]
+
+    def _jobs(self, token, num_vaults):
+        latest_vault_id = num_vaults - 1
+        holders = self._holders(token, latest_vault_id)
+        if not holders:
+            return []
+
+        # Quote every holder against the same state, in one batch, along with the latest vault's headroom
+        quotes = self.client.call_many(
+            [
+                (
+                    "previewMigrate",
+                    (token, account, MIGRATE_EVERYTHING, first, latest_vault_id - 1),
+                )
+                for account, first in holders
+            ]
+            + [("vaultInfos", (token, latest_vault_id, latest_vault_id))]
+        )
+        infos = quotes.pop()
+        total_assets, deposit_limit = infos[3][0], infos[4][0]
+        headroom = max(deposit_limit - total_assets, 0)
+
+        jobs = []
+        for (account, first), (_, migrated, _) in sorted(
+            zip(holders, quotes), key=lambda item: -item[1][1]
+        ):
+            amount = min(migrated, headroom)
+            if amount < self.min_amount:
+                continue
+            headroom -= amount
+            jobs.append(
+                MigrationJob(token, account, amount, first, latest_vault_id - 1)
+            )
+        return jobs
+
+    def _holders(self, token, latest_vault_id):
+        """`(account, first vault id)` of every account with shares in a vault older than the latest one."""
+        if self.indexer is None:
+            return [(account, 0) for account in self.accounts]
+
+        return self.indexer.db.execute(
+            "SELECT balances.account, MIN(vaults.vault_id) "
+            "FROM balances JOIN vaults ON balances.vault = vaults.address "
+            "WHERE vaults.token = ? AND vaults.vault_id < ? AND balances.shares != '0' "
+            "GROUP BY balances.account ORDER BY balances.account",
+            (token, latest_vault_id),
+        ).fetchall()
+
+    def flush(self):
+        """Submits up to `max_batch` queued jobs, unless the gas price is over `max_gas_price`."""
+        if not self.pending:
+            return None
+        (gas_price,) = self.client.transport.batch([("eth_gasPrice", [])])
+        gas_price = int(gas_price, 16)
+        if self.max_gas_price is not None and gas_price > self.max_gas_price:
+            return None
+
+        batch, self.pending = (
+            self.pending[: self.max_batch],
+            self.pending[self.max_batch :],
+        )
+        if self.sign is None:
+            result = self.submit(batch, gas_price)
+        else:
+            signed = [self.sign(job) for job in batch]
+            result = self.submit(
+                [intent_tuple(intent) for intent, _ in signed],
+                [bytes(signature) for _, signature in signed],
+                gas_price,
+            )
+        self.submitted.append(result)
+        return result
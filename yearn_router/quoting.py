@@ -0,0 +1,178 @@
+"""
+Replays the router's math for whole sets of accounts in one batched pass.
+
+Share balances and allowances are ``(accounts, vaults)`` arrays, with the vaults of a token in vault id order;
+vault metadata are ``(vaults,)`` arrays. Everything is computed on ``object`` arrays of Python ints, so results
+match the router's uint256 arithmetic exactly instead of overflowing or rounding like ``int64``/``float64``.
+
+Each account is quoted as if it were the only one transacting, as with the router's ``preview*`` views.
+
+    python -m yearn_router.quoting --accounts 10000 --vaults 20
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+WITHDRAW_EVERYTHING = MIGRATE_EVERYTHING = 2**256 - 1
+
+
+def _uint(values):
+    return np.array(values, dtype=object)
+
+
+def balances(shares, price_per_share, unit):
+    """Value in token base units of every position: ``shares * pricePerShare / 10**decimals``."""
+    return _uint(shares) * _uint(price_per_share) // _uint(unit)
+
+
+def total_balances(shares, price_per_share, unit):
+    """`totalVaultBalance` of every account."""
+    return balances(shares, price_per_share, unit).sum(axis=1)
+
+
+def withdraw_allocations(
+    amounts, shares, allowances, price_per_share, unit, max_available_shares
+):
+    """
+    Replays `withdraw(token, recipient, amount)` for every account, pulling from the oldest vault first.
+
+    `amounts` may be `WITHDRAW_EVERYTHING`. Returns the ``(accounts, vaults)`` shares redeemed from each vault and
+    the estimated tokens each account receives, as `previewWithdraw` does.
+    """
+    amounts, shares, allowances = _uint(amounts), _uint(shares), _uint(allowances)
+    price_per_share, unit = _uint(price_per_share), _uint(unit)
+    max_available_shares = _uint(max_available_shares)
+
+    redeemed = np.zeros(shares.shape, dtype=object)
+    withdrawn = np.zeros(len(amounts), dtype=object)
+    partial = amounts != WITHDRAW_EVERYTHING
+    for j in range(shares.shape[1]):
+        # Only the accounts the router would pull from: a position and an allowance, and not yet done
+        rows = np.flatnonzero((shares[:, j] != 0) & (allowances[:, j] != 0))
+        rows = rows[withdrawn[rows] + 1 < amounts[rows]]
+
+        vault_shares = np.minimum(
+            np.minimum(shares[rows, j], max_available_shares[j]), allowances[rows, j]
+        )
+        capped = partial[rows]
+        estimated = (
+            (amounts[rows[capped]] - withdrawn[rows[capped]])
+            * unit[j]
+            // price_per_share[j]
+        )
+        vault_shares[capped] = np.minimum(vault_shares[capped], estimated)
+
+        redeemed[rows, j] = vault_shares
+        withdrawn[rows] += vault_shares * price_per_share[j] // unit[j]
+    return redeemed, withdrawn
+
+
+def migration_amounts(
+    amounts,
+    shares,
+    allowances,
+    price_per_share,
+    unit,
+    max_available_shares,
+    deposit_limit,
+    total_assets,
+):
+    """
+    Replays `migrate(token, amount)` for every account, into the last vault.
+
+    `amounts` may be `MIGRATE_EVERYTHING`. Returns the ``(accounts, vaults - 1)`` shares redeemed from each older
+    vault, the estimated tokens migrated and the estimated new shares of the last vault, as `previewMigrate` does.
+    """
+    amounts = _uint(amounts)
+    price_per_share, unit = _uint(price_per_share), _uint(unit)
+    if len(unit) < 2:
+        zeros = np.zeros(len(amounts), dtype=object)
+        return np.zeros((len(amounts), 0), dtype=object), zeros, zeros
+
+    headroom = max(int(deposit_limit[-1]) - int(total_assets[-1]), 0)
+    redeemed, migrated = withdraw_allocations(
+        np.minimum(amounts, headroom),
+        _uint(shares)[:, :-1],
+        _uint(allowances)[:, :-1],
+        price_per_share[:-1],
+        unit[:-1],
+        _uint(max_available_shares)[:-1],
+    )
+    return redeemed, migrated, migrated * unit[-1] // price_per_share[-1]
+
+
+def withdraw_allocation(
+    amount, shares, allowances, price_per_share, unit, max_available_shares
+):
+    """Per-account reference for `withdraw_allocations`, for a single account's rows."""
+    redeemed = []
+    withdrawn = 0
+    for j in range(len(shares)):
+        vault_shares = 0
+        if withdrawn + 1 < amount:
+            vault_shares = min(shares[j], max_available_shares[j], allowances[j])
+            if amount != WITHDRAW_EVERYTHING:
+                estimated = (amount - withdrawn) * unit[j] // price_per_share[j]
+                vault_shares = min(vault_shares, estimated)
+        redeemed.append(vault_shares)
+        withdrawn += vault_shares * price_per_share[j] // unit[j]
+    return redeemed, withdrawn
+
+
+def _random_inputs(num_accounts, num_vaults, seed=0):
+    rng = random.Random(seed)
+    unit = [10**18] * num_vaults
+    price_per_share = [rng.randint(10**18, 2 * 10**18) for _ in range(num_vaults)]
+    max_available_shares = [rng.randint(10**24, 10**27) for _ in range(num_vaults)]
+    shares = [
+        [rng.choice([0, rng.randint(1, 10**24)]) for _ in range(num_vaults)]
+        for _ in range(num_accounts)
+    ]
+    allowances = [
+        [
+            rng.choice([WITHDRAW_EVERYTHING, rng.randint(0, 10**24)])
+            for _ in range(num_vaults)
+        ]
+        for _ in range(num_accounts)
+    ]
+    amounts = [
+        rng.choice([WITHDRAW_EVERYTHING, rng.randint(1, 10**24)])
+        for _ in range(num_accounts)
+    ]
+    return amounts, shares, allowances, price_per_share, unit, max_available_shares
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmarks batched withdraw quotes against a per-account loop."
+    )
+    parser.add_argument("--accounts", type=int, default=10000)
+    parser.add_argument("--vaults", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    amounts, shares, allowances, *vaults = _random_inputs(args.accounts, args.vaults)
+
+    start = time.perf_counter()
+    looped = [
+        withdraw_allocation(amount, shares[i], allowances[i], *vaults)
+        for i, amount in enumerate(amounts)
+    ]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    redeemed, withdrawn = withdraw_allocations(amounts, shares, allowances, *vaults)
+    batch_time = time.perf_counter() - start
+
+    assert [w for _, w in looped] == list(withdrawn)
+    assert [r for r, _ in looped] == redeemed.tolist()
+    print(f"{args.accounts} accounts, {args.vaults} vaults")
+    print(f"per-account loop: {loop_time * 1000:8.1f} ms")
+    print(f"batched:          {batch_time * 1000:8.1f} ms")
+    print(f"speedup:          {loop_time / batch_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
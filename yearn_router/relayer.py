@@ -0,0 +1,154 @@
+"""
+Signs router intents and pools them into batched ``executeIntents`` transactions.
+
+An intent is a deposit, withdrawal or migration signed (EIP-712) by the account it is for, so that a relayer can
+execute it and pay its gas. ``IntentRelayer`` collects intents and settles them in one transaction once enough have
+arrived or the oldest has waited long enough, amortizing the base transaction cost across every intent in the batch.
+
+``eth_account`` is only imported when an intent is signed.
+"""
+
+import time
+
+from yearn_router.client import RPCError
+
+INTENT_KINDS = {"deposit": 0, "withdraw": 1, "migrate": 2}
+
+INTENT_FIELDS = [
+    {"name": "kind", "type": "uint8"},
+    {"name": "account", "type": "address"},
+    {"name": "token", "type": "address"},
+    {"name": "recipient", "type": "address"},
+    {"name": "amount", "type": "uint256"},
+    {"name": "nonce", "type": "uint256"},
+    {"name": "deadline", "type": "uint256"},
+]
+
+DOMAIN_FIELDS = [
+    {"name": "name", "type": "string"},
+    {"name": "version", "type": "string"},
+    {"name": "chainId", "type": "uint256"},
+    {"name": "verifyingContract", "type": "address"},
+]
+
+
+def intent_typed_data(intent, router, chain_id=1):
+    """EIP-712 typed data of `intent`, a dict with the `INTENT_FIELDS` keys, for the router at `router`."""
+    message = dict(intent)
+    if isinstance(message["kind"], str):
+        message["kind"] = INTENT_KINDS[message["kind"]]
+    return {
+        "types": {"EIP712Domain": DOMAIN_FIELDS, "Intent": INTENT_FIELDS},
+        "domain": {
+            "name": "ShapeShiftDAORouter",
+            "version": "1",
+            "chainId": chain_id,
+            "verifyingContract": str(router),
+        },
+        "primaryType": "Intent",
+        "message": message,
+    }
+
+
+def sign_intent(intent, private_key, router, chain_id=1):
+    """Signs `intent` with `private_key`, returning the signature bytes `executeIntents` expects."""
+    from eth_account import Account
+    from eth_account import messages
+
+    # eth-account renamed `encode_structured_data` to `encode_typed_data` in v0.10
+    encode = getattr(messages, "encode_typed_data", None)
+    typed_data = intent_typed_data(intent, router, chain_id)
+    if encode is not None:
+        signable = encode(full_message=typed_data)
+    else:
+        signable = messages.encode_structured_data(typed_data)
+    return Account.from_key(private_key).sign_message(signable).signature
+
+
+def intent_tuple(intent):
+    """`intent` as the `Intent` struct tuple the router's ABI takes."""
+    kind = intent["kind"]
+    return (
+        INTENT_KINDS[kind] if isinstance(kind, str) else kind,
+        *(str(intent[field["name"]]) for field in INTENT_FIELDS[1:4]),
+        *(int(intent[field["name"]]) for field in INTENT_FIELDS[4:]),
+    )
+
+
+class IntentRelayer:
+    """
+    Pools signed intents and settles them with `executeIntents` in batches.
+
+    `submit(intents, signatures)` sends one `executeIntents` transaction and returns whatever the caller wants
+    recorded in `settled`. A batch is flushed when it reaches `max_batch` intents, or by `poll` once its oldest
+    intent has waited `max_delay` seconds.
+
+    `executeIntents` reverts as a whole if any intent fails, so when a `RouterClient` of the router is given, each
+    batch is simulated first and intents that would fail (used nonce, expired, bad signature, missing allowance)
+    are moved to `rejected` instead of being submitted.
+    """
+
+    def __init__(
+        self, submit, client=None, max_batch=50, max_delay=30.0, clock=time.monotonic
+    ):
+        self.submit = submit
+        self.client = client
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.clock = clock
+        self.settled = []
+        self.rejected = []
+        self._pending = []
+        self._oldest = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, intent, signature):
+        """Queues a signed intent, flushing the batch if it is full."""
+        if not self._pending:
+            self._oldest = self.clock()
+        self._pending.append((intent_tuple(intent), bytes(signature)))
+        if len(self._pending) >= self.max_batch:
+            return self.flush()
+        return None
+
+    def poll(self):
+        """Flushes the batch if its oldest intent has waited `max_delay` seconds; call this periodically."""
+        if self._pending and self.clock() - self._oldest >= self.max_delay:
+            return self.flush()
+        return None
+
+    def flush(self):
+        """Submits every pending intent that would succeed, returning the result of `submit` (None if none would)."""
+        batch, self._pending, self._oldest = self._pending, [], None
+        if self.client is not None:
+            batch = self._executable(batch)
+        if not batch:
+            return None
+
+        intents, signatures = (list(column) for column in zip(*batch))
+        result = self.submit(intents, signatures)
+        self.settled.append(result)
+        return result
+
+    def _executable(self, batch):
+        try:
+            self._simulate(batch)
+            return batch
+        except RPCError:
+            pass
+
+        # Find the failing intents one at a time, in order, as earlier intents can change what later ones see
+        executable = []
+        for item in batch:
+            try:
+                self._simulate(executable + [item])
+                executable.append(item)
+            except RPCError as error:
+                self.rejected.append((*item, str(error)))
+        return executable
+
+    def _simulate(self, batch):
+        intents, signatures = (list(column) for column in zip(*batch))
+        self.client.call("executeIntents", intents, signatures)